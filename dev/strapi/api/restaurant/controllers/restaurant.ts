@@ -4,4 +4,15 @@
 
 import { factories } from '@strapi/strapi'
 
-export default factories.createCoreController('api::restaurant.restaurant');
+export default factories.createCoreController('api::restaurant.restaurant', ({ strapi }) => ({
+  // Wycofanie z publikacji (np. zamknieta restauracja) - REST API Strapi 5 nie ma takiego endpointu
+  async unpublish(ctx) {
+    const { id } = ctx.params;
+    const document = await strapi.documents('api::restaurant.restaurant').findOne({ documentId: id });
+    if (!document) {
+      return ctx.notFound();
+    }
+    await strapi.documents('api::restaurant.restaurant').unpublish({ documentId: id });
+    ctx.body = { data: { documentId: id } };
+  },
+}));
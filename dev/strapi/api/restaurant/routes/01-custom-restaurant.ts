@@ -0,0 +1,13 @@
+/**
+ * restaurant custom routes
+ */
+
+export default {
+  routes: [
+    {
+      method: 'POST',
+      path: '/restaurants/:id/unpublish',
+      handler: 'restaurant.unpublish',
+    },
+  ],
+};
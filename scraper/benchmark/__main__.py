@@ -0,0 +1,170 @@
+"""
+Benchmark potoku danych bez dostepu do sieci.
+
+Scrapery, import do Strapi i seed_data.py sa uruchamiane na lokalnych zamiennikach
+API (benchmark/standins.py), z ustalonym opoznieniem i odsetkiem bledow, dzieki czemu
+wyniki kolejnych zmian mozna porownywac ze soba.
+
+Uzycie (z katalogu scraper/):
+    python -m benchmark --places 2000 --latency 0.02 --error-rate 0.01 --json bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmark.standins import StandInServer, make_places
+from scrapers.google_places import GooglePlaces
+from scrapers.strapi import StrapiImporter
+from scrapers.tile_planner import BoundingBox
+from scrapers.trip_advisor import TripAdvisorScraper
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts"
+BOUNDS = (50.00, 19.85, 50.12, 20.05)
+
+
+def measure(name, server, fn):
+    """Uruchamia etap i zwraca czas, liczbe rekordow, zapytania i szczyt pamieci."""
+    server.reset_counters()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "stage": name,
+        "records": records,
+        "seconds": round(elapsed, 3),
+        "per_second": round(records / elapsed, 1) if elapsed else 0.0,
+        "requests": sum(server.state.requests.values()),
+        "by_endpoint": dict(server.state.requests),
+        "bytes": server.state.bytes_sent,
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def bench_google(server, args):
+    scraper = GooglePlaces(
+        max_workers=args.workers,
+        area=BoundingBox(*BOUNDS),
+        tile_workers=args.tile_workers,
+        requests_per_second=args.rps,
+    )
+    scraper.base_url = server.url
+    scraper.page_token_delay = args.token_delay
+    scraper.run("restaurant")
+    return len(scraper.data)
+
+
+def bench_tripadvisor(server, args):
+    scraper = TripAdvisorScraper(requests_per_second=args.rps)
+    scraper.base_url = server.url
+    scraper.run("restaurants in Krakow")
+    return len(scraper.data)
+
+
+def bench_import(server, args):
+    records = [
+        {
+            "place_id": p["id"],
+            "name": p["name"],
+            "address": f"{p['street']}, {p['postal']} Kraków, Poland",
+            "lat": p["lat"],
+            "lng": p["lng"],
+        }
+        for p in server.state.places
+    ]
+    importer = StrapiImporter(base_url=server.url, token="benchmark", workers=args.workers)
+    summary = importer.run(records, retry_path="import_failed.jsonl")
+    return summary["created"] + summary["updated"]
+
+
+def bench_seed(server, args):
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    env = {**os.environ, "NEXT_PUBLIC_STRAPI_URL": server.url,
+           "NEXT_PUBLIC_STRAPI_KEY": "benchmark", "STRAPI_KEY": "benchmark"}
+    subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "seed_data.py"), "--workers", str(args.workers),
+         "--limit", str(args.seed_limit)],
+        env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    bench_seed.child_rss_mb = round(max(before, after) / 1024, 1)
+    return sum(len(server.state.strapi.get(c, {})) for c in ("dishes", "dish-attributes", "reviews", "review-details"))
+
+
+STAGES = {
+    "google": bench_google,
+    "tripadvisor": bench_tripadvisor,
+    "import": bench_import,
+    "seed": bench_seed,
+}
+
+
+def print_table(results):
+    print(f"{'etap':<12} {'rekordy':>8} {'czas [s]':>9} {'rek/s':>8} {'zapytania':>10} {'pamięć [MB]':>12}")
+    for r in results:
+        print(f"{r['stage']:<12} {r['records']:>8} {r['seconds']:>9} {r['per_second']:>8} "
+              f"{r['requests']:>10} {r['peak_mb']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraperow i importu na lokalnych zamiennikach API")
+    parser.add_argument("--places", type=int, default=1000, help="liczba syntetycznych miejsc")
+    parser.add_argument("--latency", type=float, default=0.01, help="srednie opoznienie odpowiedzi [s]")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="odsetek odpowiedzi HTTP 500")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="odsetek odpowiedzi HTTP 429")
+    parser.add_argument("--token-delay", type=float, default=0.2, help="po ilu sekundach aktywny jest next_page_token")
+    parser.add_argument("--rps", type=float, default=1000, help="limit zapytan na sekunde dla scraperow")
+    parser.add_argument("--workers", type=int, default=8, help="liczba rownoleglych zapytan")
+    parser.add_argument("--tile-workers", type=int, default=4, help="liczba rownolegle przeszukiwanych kafelkow")
+    parser.add_argument("--seed-limit", type=int, default=50, help="liczba restauracji dla seed_data.py")
+    parser.add_argument("--stages", default=",".join(STAGES), help="etapy oddzielone przecinkami")
+    parser.add_argument("--json", help="zapisuje raport do pliku JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.disable(logging.INFO)
+    os.environ.update(GOOGLE_PLACE_API_KEY="benchmark", TRIPADVISOR_API_KEY="benchmark")
+
+    places = make_places(args.places, BOUNDS)
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, StandInServer(
+        places, latency=args.latency, error_rate=args.error_rate,
+        rate_429=args.rate_429, token_delay=args.token_delay,
+    ) as server:
+        # Scrapery zapisuja snapshoty w katalogu roboczym - nie smiecimy w repozytorium
+        os.chdir(tmp)
+        try:
+            for name in args.stages.split(","):
+                result = measure(name, server, lambda: STAGES[name](server, args))
+                if name == "seed":
+                    result["child_rss_mb"] = bench_seed.child_rss_mb
+                results.append(result)
+        finally:
+            os.chdir(cwd)
+
+    print_table(results)
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "options": vars(args),
+            "stages": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Raport zapisano w {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Generator obciazenia sciezki zapisu opinii w Strapi.
+
+Odtwarza ruch uzytkownikow wg modelu danych z scripts/seed_data.py: opinia o daniu
+(POST /reviews), jej szczegoly dla atrybutow (POST /review-details, zalezne od
+documentId opinii) oraz ciezkie odczyty menu restauracji z
+populate[dish_attributes][populate][attribute] (jak w scripts/test_populate.py).
+Obciazenie jest zadawane jako stala liczba operacji na sekunde (--rate, petla otwarta)
+albo liczba rownoleglych uzytkownikow bez przerw (--concurrency, petla zamknieta).
+Raport zawiera p50/p95/p99 i odsetek bledow dla kazdego endpointu.
+
+Narzedzie tworzy prawdziwe wpisy, wiec dziala tylko z lokalnym zamiennikiem
+(--stand-in) albo lokalnym Strapi; --cleanup usuwa utworzone wpisy po tescie.
+
+Uzycie (z katalogu scraper/):
+    python -m benchmark.load_reviews --stand-in --concurrency 16 --duration 20
+    python -m benchmark.load_reviews --url http://localhost:1337 --rate 50 --duration 60 --cleanup
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from benchmark.standins import StandInServer, make_places
+from scrapers.metrics import RunMetrics
+from scrapers.strapi import load_env
+
+# Wspolny klient skryptow (stronicowanie i budowa zapytan) - nie jest pakietem, wiec przez sciezke
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from strapi_client import StrapiClient, build_query
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", "0.0.0.0")
+
+COMMENTS = [
+    "Bardzo smaczne, polecam!",
+    "Danie świeże i dobrze przyprawione.",
+    "Porcja duża, smak wyśmienity.",
+    "Trochę za słone, ale ogólnie ok.",
+    "Średnio, mogło być lepiej.",
+    "Świetna jakość za tę cenę.",
+]
+STAND_IN_ATTRIBUTES = ["mieso", "sos", "Smak", "Porcja", "Swiezosc"]
+STAND_IN_DISHES = ["Pizza Margherita", "Pierogi z mięsem", "Zupa pomidorowa", "Kotlet schabowy", "Ramen"]
+
+# Domyslny udzial operacji: na jedna opinie przypadaja trzy odczyty menu
+DEFAULT_MIX = "review=1,menu=3"
+# Ksztalt odczytu menu jak w scripts/test_populate.py
+MENU_POPULATE = {"dish_attributes": {"populate": {"attribute": {"fields": ["id", "documentId", "name"]}}}}
+MENU_PAGE_SIZE = 25
+
+
+def parse_mix(text):
+    """"review=1,menu=3" -> {"review": 1.0, "menu": 3.0}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("review", "menu"):
+            raise argparse.ArgumentTypeError(f"Nieznana operacja {name!r} (dostepne: review, menu)")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Catalogue:
+    """documentId restauracji (z daniami) i atrybutow, na ktorych operuje obciazenie."""
+
+    def __init__(self, dishes, attributes):
+        # restauracja -> lista dan
+        self.dishes = dishes
+        self.restaurants = list(dishes)
+        self.attributes = attributes
+
+    @classmethod
+    def fetch(cls, client):
+        """Czyta katalog z lokalnego Strapi przez StrapiClient (scripts/strapi_client.py)."""
+        dishes = {}
+        for dish in client.iter("dishes", fields=["documentId"], populate={"restaurant": {"fields": ["documentId"]}}):
+            restaurant = dish.get("restaurant") or {}
+            if restaurant.get("documentId"):
+                dishes.setdefault(restaurant["documentId"], []).append(dish["documentId"])
+        attributes = [a["documentId"] for a in client.iter("attributes", fields=["documentId"])]
+        return cls(dishes, attributes)
+
+    @classmethod
+    def seed_stand_in(cls, server, restaurants, dishes_per_restaurant, seed=1):
+        """Wypelnia zamiennik Strapi restauracjami, daniami i atrybutami (jak seed_data.py)."""
+        rng = random.Random(seed)
+        table = server.seed_strapi("restaurants", [{"name": p["name"], "place_id": p["id"]}
+                                                   for p in make_places(restaurants, seed=seed)])
+        attributes = list(server.seed_strapi("attributes", [{"name": n} for n in STAND_IN_ATTRIBUTES]))
+        for restaurant_id in table:
+            server.seed_strapi("dishes", [
+                {"name": name, "restaurant": restaurant_id}
+                for name in rng.sample(STAND_IN_DISHES, min(dishes_per_restaurant, len(STAND_IN_DISHES)))
+            ])
+        dishes = {}
+        for document_id, dish in server.state.strapi["dishes"].items():
+            dishes.setdefault(dish["restaurant"], []).append(document_id)
+        for document_id in dishes:
+            server.seed_strapi("dish-attributes", [
+                {"dish": dish_id, "attribute": rng.choice(attributes)} for dish_id in dishes[document_id]
+            ])
+        return cls(dishes, attributes)
+
+
+class LoadGenerator:
+    """
+    Wykonuje operacje obciazenia w puli watkow i zapisuje czasy odpowiedzi w RunMetrics
+    (endpoint = metoda + sciezka). Zapytania nie sa ponawiane - kazdy blad jest liczony.
+    """
+
+    def __init__(self, api, token, catalogue, mix, pool_size=16, seed=1):
+        self.api = api
+        self.catalogue = catalogue
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.metrics = RunMetrics("load_reviews")
+        self.created = {"reviews": [], "review-details": []}
+        self.skipped = 0
+        self._seed = seed
+        self._local = threading.local()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
+
+    @property
+    def rng(self):
+        # Osobny generator na watek - random.Random nie jest bezpieczny przy wspolnym uzyciu
+        if not hasattr(self._local, "rng"):
+            self._local.rng = random.Random(f"{self._seed}-{threading.get_ident()}")
+        return self._local.rng
+
+    def call(self, method, path, **kwargs):
+        """Wykonuje zapytanie i zapisuje jego czas; zwraca odpowiedz albo None przy bledzie polaczenia."""
+        url = f"{self.api}/{path}"
+        label = f"{method} {urlparse(url).path}"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=30, **kwargs)
+        except requests.RequestException:
+            self.metrics.record_request(label, time.perf_counter() - start, None)
+            return None
+        self.metrics.record_request(label, time.perf_counter() - start, response.status_code, len(response.content))
+        return response
+
+    def review(self):
+        """Opinia o losowym daniu i 1-2 szczegoly ocen atrybutow (zalezne od documentId opinii)."""
+        rng = self.rng
+        restaurant = rng.choice(self.catalogue.restaurants)
+        response = self.call("POST", "reviews", json={"data": {
+            "dish": rng.choice(self.catalogue.dishes[restaurant]),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "comment": rng.choice(COMMENTS),
+        }})
+        if response is None or response.status_code not in (200, 201):
+            return
+        review_id = response.json()["data"]["documentId"]
+        self.created["reviews"].append(review_id)
+        for attribute in rng.sample(self.catalogue.attributes, min(rng.randint(1, 2), len(self.catalogue.attributes))):
+            detail = self.call("POST", "review-details", json={"data": {
+                "review": review_id, "attribute": attribute, "rating": rng.randint(3, 5),
+            }})
+            if detail is not None and detail.status_code in (200, 201):
+                self.created["review-details"].append(detail.json()["data"]["documentId"])
+
+    def menu(self):
+        """Menu restauracji z atrybutami dan - najciezszy odczyt strony restauracji."""
+        params = build_query(
+            populate=MENU_POPULATE,
+            filters={"restaurant": {"documentId": {"$eq": self.rng.choice(self.catalogue.restaurants)}}},
+        )
+        params["pagination[pageSize]"] = MENU_PAGE_SIZE
+        self.call("GET", "dishes", params=params)
+
+    def operation(self):
+        getattr(self, self.rng.choices(self.operations, self.weights)[0])()
+
+    def run_closed(self, concurrency, duration=None, operations=None):
+        """Petla zamknieta: concurrency uzytkownikow wykonuje operacje jedna po drugiej."""
+        deadline = time.perf_counter() + duration if duration else None
+        remaining = [operations]
+        lock = threading.Lock()
+
+        def user():
+            while deadline is None or time.perf_counter() < deadline:
+                if operations is not None:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self.operation()
+
+        self.metrics.reset()
+        threads = [threading.Thread(target=user) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.metrics.finish()
+
+    def run_open(self, rate, duration=None, operations=None, max_in_flight=64):
+        """
+        Petla otwarta: operacje startuja co 1/rate s niezaleznie od czasu odpowiedzi.
+        Jesli w locie jest juz max_in_flight operacji, kolejna jest pomijana (skipped) -
+        to znak, ze serwer nie nadaza za zadanym tempem.
+        """
+        limit = operations or int(rate * duration)
+        slots = threading.BoundedSemaphore(max_in_flight)
+
+        def run_one():
+            try:
+                self.operation()
+            finally:
+                slots.release()
+
+        self.metrics.reset()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for i in range(limit):
+                delay = start + i / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if not slots.acquire(blocking=False):
+                    self.skipped += 1
+                    continue
+                executor.submit(run_one)
+        self.metrics.finish()
+
+    def cleanup(self, workers=8):
+        """Usuwa wpisy utworzone podczas testu (szczegoly przed opiniami); nie wlicza sie do metryk."""
+        deleted = 0
+        for collection in ("review-details", "reviews"):
+            def delete(document_id, collection=collection):
+                try:
+                    response = self.session.delete(f"{self.api}/{collection}/{document_id}", timeout=30)
+                    return response.status_code in (200, 204)
+                except requests.RequestException:
+                    return False
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                deleted += sum(executor.map(delete, self.created[collection]))
+        return deleted
+
+    def report(self):
+        """Zestawienie per endpoint: liczba zapytan, zapytania/s, p50/p95/p99 i odsetek bledow."""
+        raw = self.metrics.report()
+        endpoints = {}
+        for name, e in raw["endpoints"].items():
+            failed = e["connection_errors"] + sum(v for k, v in e["statuses"].items() if not k.startswith("2"))
+            endpoints[name] = {
+                "requests": e["requests"],
+                "per_second": round(e["requests"] / raw["wall_seconds"], 1) if raw["wall_seconds"] else 0.0,
+                "latency_ms": e["latency_ms"],
+                "error_rate": round(failed / e["requests"], 4) if e["requests"] else 0.0,
+                "statuses": e["statuses"],
+            }
+        return {"wall_seconds": raw["wall_seconds"], "skipped": self.skipped, "endpoints": endpoints}
+
+
+def print_report(report):
+    print(f"{'endpoint':<24} {'zapytania':>10} {'zap/s':>8} {'p50 [ms]':>9} {'p95 [ms]':>9} "
+          f"{'p99 [ms]':>9} {'błędy':>7}")
+    for name, e in report["endpoints"].items():
+        latency = e["latency_ms"]
+        print(f"{name:<24} {e['requests']:>10} {e['per_second']:>8} {latency['p50']:>9} {latency['p95']:>9} "
+              f"{latency['p99']:>9} {e['error_rate']:>7.2%}")
+    print(f"Czas: {report['wall_seconds']}s" + (f", pominięte operacje: {report['skipped']}" if report["skipped"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test obciazenia zapisu opinii w Strapi")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="adres lokalnego Strapi (domyslnie NEXT_PUBLIC_STRAPI_URL)")
+    target.add_argument("--stand-in", action="store_true", help="uruchamia lokalny zamiennik Strapi")
+    load = parser.add_mutually_exclusive_group(required=True)
+    load.add_argument("--rate", type=float, help="operacje na sekunde (petla otwarta)")
+    load.add_argument("--concurrency", type=int, help="liczba rownoleglych uzytkownikow (petla zamknieta)")
+    parser.add_argument("--duration", type=float, default=30, help="czas testu [s]")
+    parser.add_argument("--operations", type=int, help="liczba operacji zamiast czasu testu")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"udzial operacji, domyslnie {DEFAULT_MIX}")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="limit operacji w locie przy --rate")
+    parser.add_argument("--seed", type=int, default=1, help="ziarno generatora losowego")
+    parser.add_argument("--cleanup", action="store_true", help="usuwa utworzone opinie po tescie")
+    parser.add_argument("--restaurants", type=int, default=50, help="restauracje w zamienniku (--stand-in)")
+    parser.add_argument("--latency", type=float, default=0.005, help="opoznienie zamiennika [s] (--stand-in)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="odsetek bledow 500 zamiennika (--stand-in)")
+    parser.add_argument("--allow-remote", action="store_true", help="pozwala na adres inny niz lokalny")
+    parser.add_argument("--json", help="zapisuje raport do pliku JSON")
+    args = parser.parse_args()
+
+    pool_size = args.concurrency or args.max_in_flight
+    if not args.stand_in:
+        load_env()
+        url = args.url or os.environ["NEXT_PUBLIC_STRAPI_URL"]
+        if urlparse(url).hostname not in LOCAL_HOSTS and not args.allow_remote:
+            parser.error(f"{url} nie jest adresem lokalnym - test tworzy prawdziwe opinie (--allow-remote)")
+
+    stand_in = StandInServer([], latency=args.latency, error_rate=args.error_rate) if args.stand_in else None
+    with stand_in or contextlib.nullcontext():
+        if stand_in:
+            url, token = stand_in.url, "benchmark"
+            catalogue = Catalogue.seed_stand_in(stand_in, args.restaurants, 3, args.seed)
+        else:
+            token, catalogue = os.environ["STRAPI_KEY"], None
+        generator = LoadGenerator(url.rstrip("/") + "/api", token, catalogue, args.mix, pool_size, args.seed)
+        if catalogue is None:
+            generator.catalogue = Catalogue.fetch(StrapiClient(url, token))
+        if not generator.catalogue.restaurants or not generator.catalogue.attributes:
+            parser.error("Brak dan lub atrybutow - najpierw uruchom scripts/seed_data.py")
+        print(f"API: {generator.api}, restauracje z daniami: {len(generator.catalogue.restaurants)}, "
+              f"atrybuty: {len(generator.catalogue.attributes)}")
+
+        duration = None if args.operations else args.duration
+        if args.rate:
+            generator.run_open(args.rate, duration, args.operations, args.max_in_flight)
+        else:
+            generator.run_closed(args.concurrency, duration, args.operations)
+        report = generator.report()
+        print_report(report)
+        if args.cleanup:
+            print(f"Usunięto {generator.cleanup()} utworzonych wpisów")
+
+    if args.json:
+        report["options"] = vars(args)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Raport zapisano w {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+Lokalne zamienniki API Google Places, TripAdvisor i Strapi do testow wydajnosci.
+
+Jeden serwer HTTP obsluguje wszystkie trzy API (rozroznione po sciezce).
+Opoznienie, odsetek bledow 5xx i odpowiedzi 429 (z naglowkiem Retry-After)
+sa konfigurowalne; liczniki zapytan sa prowadzone osobno dla kazdego endpointu.
+"""
+import json
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scrapers.tile_planner import haversine_m
+
+STREETS = ["Floriańska", "Grodzka", "Długa", "Karmelicka", "Starowiślna", "Dietla", "Kijowska", "Lea"]
+WORDS = ["Pizzeria", "Bistro", "Kebab", "Sushi", "Pierogarnia", "Ramen", "Grill", "Smak", "Stara", "Nowa"]
+
+# Relacje, ktore Strapi moze rozwinac parametrem populate: pole -> kolekcja
+STRAPI_RELATIONS = {
+    "restaurant": "restaurants",
+    "dish": "dishes",
+    "attribute": "attributes",
+    "review": "reviews",
+}
+# Relacje odwrotne (oneToMany): pole -> (kolekcja, pole relacji wskazujace na wpis)
+STRAPI_REVERSE_RELATIONS = {
+    "dishes": ("dishes", "restaurant"),
+    "dish_attributes": ("dish-attributes", "dish"),
+    "reviews": ("reviews", "dish"),
+}
+
+
+def make_places(count, bounds=(50.00, 19.85, 50.12, 20.05), seed=1):
+    """Generuje syntetyczne miejsca rozrzucone po prostokacie (south, west, north, east)."""
+    rng = random.Random(seed)
+    south, west, north, east = bounds
+    places = []
+    for i in range(count):
+        places.append({
+            "id": f"place{i:06d}",
+            "location_id": str(100000 + i),
+            "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+            "street": f"{rng.choice(STREETS)} {rng.randint(1, 120)}",
+            "postal": f"3{rng.randint(0, 1)}-{rng.randint(0, 999):03d}",
+            "lat": rng.uniform(south, north),
+            "lng": rng.uniform(west, east),
+            "phone": f"+48 12 {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+        })
+    return places
+
+
+def fake_image(seed, width=64, height=48):
+    """Jednolity obrazek BMP w kolorze zaleznym od seed (te same seed -> te same bajty)."""
+    color = bytes(((seed * 67) % 256, (seed * 131) % 256, (seed * 197) % 256))
+    row = color * width + b"\0" * ((4 - width * 3 % 4) % 4)
+    pixels = row * height
+    header = struct.pack("<2sIHHI", b"BM", 54 + len(pixels), 0, 0, 54)
+    info = struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, len(pixels), 2835, 2835, 0, 0)
+    return header + info + pixels
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class StandInState:
+    """Dane i konfiguracja wspolne dla wszystkich watkow serwera."""
+
+    def __init__(self, places, latency=0.0, error_rate=0.0, rate_429=0.0, token_delay=2.0, seed=1):
+        self.places = places
+        self.by_id = {p["id"]: p for p in places}
+        self.by_location = {p["location_id"]: p for p in places}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.token_delay = token_delay
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.tokens = {}
+        self.strapi = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+
+    def roll(self):
+        with self.lock:
+            return self.rng.random()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Naglowki i tresc sa wysylane osobno - bez tego Nagle dodaje ~40 ms do odpowiedzi
+    disable_nagle_algorithm = True
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    # --- wspolne ---
+
+    def send_json(self, body, status=200, headers=None):
+        # 204 nie moze miec tresci - klient jej nie czyta i psuje sie polaczenie keep-alive
+        data = b"" if status == 204 else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.state.lock:
+            self.state.bytes_sent += len(data)
+
+    def send_bytes(self, data, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with self.state.lock:
+            self.state.bytes_sent += len(data)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if raw and self.headers.get("Content-Type", "").startswith("application/json"):
+            return json.loads(raw)
+        return {}
+
+    def dispatch(self, method):
+        # Tresc trzeba przeczytac takze przy symulowanym bledzie, inaczej zostanie
+        # w polaczeniu keep-alive i zepsuje nastepne zapytanie
+        self.body = self.read_body()
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        route = self.route_name(method, url.path)
+        with self.state.lock:
+            self.state.requests[route] += 1
+
+        if self.state.latency:
+            time.sleep(self.state.latency * (0.5 + self.state.roll()))
+        roll = self.state.roll()
+        if roll < self.state.rate_429:
+            return self.send_json({"error": "Too Many Requests"}, 429, {"Retry-After": "1"})
+        if roll < self.state.rate_429 + self.state.error_rate:
+            return self.send_json({"error": "Internal Server Error"}, 500)
+
+        path = url.path
+        if path.startswith("/media/"):
+            place = self.state.by_location.get(path.rsplit("/", 1)[-1].split(".")[0])
+            if place is None:
+                return self.send_json({"error": "Not Found"}, 404)
+            return self.send_bytes(fake_image(int(place["location_id"]) % 50), "image/bmp")
+        if path.startswith("/maps/api/"):
+            return self.google(path, query)
+        if path.startswith("/api/v1/location/"):
+            return self.tripadvisor(path, query)
+        if path.startswith("/api/"):
+            return self.strapi(method, path, query)
+        self.send_json({"error": "Not Found"}, 404)
+
+    @staticmethod
+    def route_name(method, path):
+        if path.startswith("/media/"):
+            return "media"
+        if path.startswith("/maps/api/"):
+            parts = path.split("/")
+            return "google:" + (parts[-1] if parts[-1] == "photo" else parts[-2])
+        if path.startswith("/api/v1/location/"):
+            parts = path.strip("/").split("/")
+            return "tripadvisor:" + ("search" if parts[-1] == "search" else parts[-1])
+        return f"strapi:{method} {path.split('/')[2] if path.count('/') >= 2 else path}"
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    # --- Google Places ---
+
+    def google_result(self, place):
+        return {
+            "place_id": place["id"],
+            "name": place["name"],
+            "formatted_address": f"{place['street']}, {place['postal']} Kraków, Poland",
+            "geometry": {"location": {"lat": place["lat"], "lng": place["lng"]}},
+        }
+
+    def google_page(self, results, offset):
+        """Zwraca strone 20 wynikow (maks. 60) i token kolejnej, aktywny po token_delay."""
+        page = results[offset:offset + 20]
+        body = {"status": "OK", "results": [self.google_result(p) for p in page]}
+        if offset + 20 < min(len(results), 60):
+            token = uuid.uuid4().hex
+            with self.state.lock:
+                self.state.tokens[token] = (results, offset + 20, time.monotonic() + self.state.token_delay)
+            body["next_page_token"] = token
+        return body
+
+    def google(self, path, query):
+        endpoint = path.split("/")[-2]
+        if path.endswith("/place/photo"):
+            place = self.state.by_id.get(query.get("photo_reference", "").removeprefix("ref-"))
+            if place is None:
+                return self.send_json({"status": "INVALID_REQUEST"}, 400)
+            # Jak w prawdziwym API czesc miejsc dzieli to samo zdjecie
+            return self.send_bytes(fake_image(int(place["location_id"]) % 50), "image/bmp")
+        if "pagetoken" in query:
+            entry = self.state.tokens.get(query["pagetoken"])
+            if entry is None or time.monotonic() < entry[2]:
+                return self.send_json({"status": "INVALID_REQUEST", "results": []})
+            return self.send_json(self.google_page(entry[0], entry[1]))
+
+        if endpoint == "textsearch":
+            return self.send_json(self.google_page(self.state.places, 0))
+        if endpoint == "nearbysearch":
+            lat, lng = (float(x) for x in query["location"].split(","))
+            radius = float(query["radius"])
+            inside = [p for p in self.state.places if haversine_m(lat, lng, p["lat"], p["lng"]) <= radius]
+            return self.send_json(self.google_page(inside, 0))
+        if endpoint == "details":
+            place = self.state.by_id.get(query.get("place_id"))
+            if place is None:
+                return self.send_json({"status": "NOT_FOUND"})
+            result = self.google_result(place)
+            result["international_phone_number"] = place["phone"]
+            result["photos"] = [{"photo_reference": "ref-" + place["id"]}]
+            return self.send_json({"status": "OK", "result": result})
+        if endpoint == "geocode":
+            lats = [p["lat"] for p in self.state.places]
+            lngs = [p["lng"] for p in self.state.places]
+            viewport = {
+                "southwest": {"lat": min(lats), "lng": min(lngs)},
+                "northeast": {"lat": max(lats), "lng": max(lngs)},
+            }
+            return self.send_json({"status": "OK", "results": [{"geometry": {"viewport": viewport}}]})
+        self.send_json({"status": "INVALID_REQUEST"}, 400)
+
+    # --- TripAdvisor ---
+
+    def tripadvisor(self, path, query):
+        parts = path.strip("/").split("/")
+        if parts[-1] == "search":
+            limit = int(query.get("limit", 10))
+            data = [{"location_id": p["location_id"], "name": p["name"],
+                     "address_obj": {"address_string": f"{p['street']}, Krakow, Poland"}}
+                    for p in self.state.places[:limit]]
+            return self.send_json({"data": data})
+
+        place = self.state.by_location.get(parts[-2])
+        if place is None:
+            return self.send_json({"error": "Not Found"}, 404)
+        if parts[-1] == "details":
+            return self.send_json({
+                "location_id": place["location_id"],
+                "name": place["name"],
+                "address_obj": {"street1": place["street"], "city": "Krakow", "country": "Poland"},
+                "phone": place["phone"],
+                "latitude": str(place["lat"]),
+                "longitude": str(place["lng"]),
+                "rating": str(place["rating"]),
+                "price_level": "$$",
+            })
+        if parts[-1] == "photos":
+            url = f"http://{self.headers['Host']}/media/{place['location_id']}.bmp"
+            return self.send_json({"data": [{"images": {"large": {"url": url}}}]})
+        self.send_json({"error": "Not Found"}, 404)
+
+    # --- Strapi ---
+
+    def populate(self, entry, query, prefix="populate"):
+        def requested(field):
+            return any(k.startswith(f"{prefix}[{field}]") for k in query) or (
+                prefix == "populate" and query.get("populate") in ("*", field)
+            )
+
+        out = dict(entry)
+        for field, collection in STRAPI_RELATIONS.items():
+            key = out.get(field)
+            if isinstance(key, str) and requested(field):
+                related = self.state.strapi.get(collection, {}).get(key)
+                out[field] = self.populate(related, query, f"{prefix}[{field}][populate]") if related else None
+        for field, (collection, back) in STRAPI_REVERSE_RELATIONS.items():
+            if field not in out and requested(field):
+                out[field] = [
+                    self.populate(e, query, f"{prefix}[{field}][populate]")
+                    for e in self.state.strapi.get(collection, {}).values()
+                    if e.get(back) == entry.get("documentId")
+                ]
+        return out
+
+    def resolve(self, entry, path):
+        """Wartosc pola po sciezce filtra, np. ["restaurant", "documentId"] przechodzi przez relacje."""
+        value = entry
+        for i, field in enumerate(path):
+            if isinstance(value, str) and i > 0 and path[i - 1] in STRAPI_RELATIONS:
+                value = self.state.strapi.get(STRAPI_RELATIONS[path[i - 1]], {}).get(value)
+            if not isinstance(value, dict):
+                return None
+            value = value.get(field)
+        return value
+
+    def matches(self, entry, query):
+        for key, value in query.items():
+            if not key.startswith("filters["):
+                continue
+            path = re.findall(r"\[([^\]]+)\]", key)
+            op = path.pop()
+            # $or/$and i indeksy tablic nie sa obslugiwane - taki filtr jest pomijany
+            if not op.startswith("$") or any(p.startswith("$") or p.isdigit() for p in path):
+                continue
+            current = self.resolve(entry, path)
+            if op == "$notNull" and current is None:
+                return False
+            if op == "$eq" and str(current) != value:
+                return False
+            if op == "$gte" and (current is None or str(current) < value):
+                return False
+        return True
+
+    def strapi(self, method, path, query):
+        parts = path.strip("/").split("/")
+        collection = parts[1]
+        document_id = parts[2] if len(parts) > 2 else None
+        table = self.state.strapi.setdefault(collection, {})
+
+        if collection == "upload" and method == "POST":
+            with self.state.lock:
+                media_id = len(table) + 1
+                table[str(media_id)] = {"id": media_id, "size": int(self.headers.get("Content-Length") or 0)}
+            return self.send_json([{"id": media_id, "name": f"{media_id}.webp"}], 201)
+
+        if method == "GET":
+            # Domyslnie tylko opublikowane, status=draft zwraca wszystkie dokumenty
+            rows = [
+                e for e in table.values()
+                if self.matches(e, query) and (query.get("status") == "draft" or e.get("publishedAt", True))
+            ]
+            rows.sort(key=lambda e: (e.get("updatedAt", ""), e["id"]))
+            page = int(query.get("pagination[page]", 1))
+            size = int(query.get("pagination[pageSize]", 25))
+            page_count = max(1, -(-len(rows) // size))
+            data = [self.populate(e, query) for e in rows[(page - 1) * size:page * size]]
+            meta = {"pagination": {"page": page, "pageSize": size, "pageCount": page_count, "total": len(rows)}}
+            return self.send_json({"data": data, "meta": meta})
+
+        if method == "POST" and document_id is None:
+            data = self.body.get("data", {})
+            with self.state.lock:
+                data.update(id=len(table) + 1, documentId=uuid.uuid4().hex[:24], updatedAt=now_iso())
+                data["publishedAt"] = data["updatedAt"]
+                table[data["documentId"]] = data
+            return self.send_json({"data": data}, 201)
+
+        if document_id not in table:
+            return self.send_json({"error": "Not Found"}, 404)
+        if method == "POST" and parts[-1] == "unpublish":
+            with self.state.lock:
+                table[document_id].update(publishedAt=None, updatedAt=now_iso())
+            return self.send_json({"data": {"documentId": document_id}})
+        if method == "PUT":
+            data = self.body.get("data", {})
+            with self.state.lock:
+                # Aktualizacja przez REST publikuje dokument ponownie
+                table[document_id].update(data, updatedAt=now_iso())
+                table[document_id]["publishedAt"] = table[document_id]["updatedAt"]
+            return self.send_json({"data": table[document_id]})
+        if method == "DELETE":
+            with self.state.lock:
+                table.pop(document_id)
+            return self.send_json({}, 204)
+
+
+class StandInServer:
+    """
+    Uruchamia zamienniki API w watku w tle.
+    Adres bazowy (url) nalezy podac jako base_url scraperow lub adres Strapi.
+    """
+
+    def __init__(self, places, host="127.0.0.1", port=0, **options):
+        self.state = StandInState(places, **options)
+        handler = type("Handler", (StandInHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def seed_strapi(self, collection, entries):
+        table = self.state.strapi.setdefault(collection, {})
+        for entry in entries:
+            entry = {"id": len(table) + 1, "documentId": uuid.uuid4().hex[:24], "updatedAt": now_iso(), **entry}
+            table[entry["documentId"]] = entry
+        return table
+
+    def reset_counters(self):
+        with self.state.lock:
+            self.state.requests.clear()
+            self.state.bytes_sent = 0
@@ -0,0 +1,41 @@
+import argparse
+import logging
+
+from scrapers.photo_enrichment import PhotoEnricher
+from scrapers.response_cache import ResponseCache
+from scrapers.snapshots import load_snapshot, save_snapshot
+from scrapers.trip_advisor import TripAdvisorScraper
+
+
+parser = argparse.ArgumentParser(description="Uzupelnia brakujace zdjecia w snapshocie TripAdvisor")
+parser.add_argument("snapshot", help="snapshot TripAdvisorScraper (.json albo .snap)")
+parser.add_argument("-o", "--output", help="plik wynikowy, format wg rozszerzenia (domyslnie nadpisuje snapshot)")
+parser.add_argument("--previous", help="poprzedni snapshot, z ktorego przepisywane sa znane zdjecia")
+parser.add_argument("--workers", type=int, default=4, help="liczba rownoleglych zapytan")
+parser.add_argument("--rps", type=float, default=1, help="limit zapytan o zdjecia na sekunde")
+parser.add_argument("--quota", type=int, help="dzienny limit zapytan o zdjecia")
+parser.add_argument("--cache", default="cache.sqlite3", help="plik cache odpowiedzi API")
+parser.add_argument("--no-cache", action="store_true", help="wylacza cache odpowiedzi")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+logger = logging.getLogger("enrich_photos")
+
+records = load_snapshot(args.snapshot)
+previous = load_snapshot(args.previous) if args.previous else None
+
+cache = None if args.no_cache else ResponseCache(args.cache)
+enricher = PhotoEnricher(
+    TripAdvisorScraper(cache=cache), workers=args.workers, requests_per_second=args.rps, daily_quota=args.quota
+)
+stats = enricher.enrich(records, previous)
+logger.info(
+    f"Uzupełniono zdjęcia: z poprzedniego snapshotu {stats['snapshot']}, pobrane {stats['fetched']}, "
+    f"brak zdjęcia {stats['missing']}, pominięte (limit) {stats['quota_exceeded']}"
+)
+
+output = args.output or args.snapshot
+save_snapshot(output, records)
+logger.info(f"Saved {len(records)} records to {output}")
+if cache is not None:
+    cache.close()
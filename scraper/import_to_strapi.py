@@ -0,0 +1,52 @@
+import argparse
+import logging
+
+from scrapers.strapi import StrapiImporter, iter_records
+
+
+parser = argparse.ArgumentParser(description="Import restauracji do Strapi (upsert po place_id)")
+parser.add_argument("input", help="plik JSON lub JSONL z wynikami scrapera")
+parser.add_argument("--workers", type=int, default=8, help="liczba rownoleglych zapytan")
+parser.add_argument("--retry-file", default="import_failed.jsonl", help="plik na rekordy, ktorych nie zapisano")
+parser.add_argument("--rejects-file", default="import_rejected.jsonl",
+                    help="plik na rekordy odrzucone przez walidacje (z powodami)")
+parser.add_argument("--sync", action="store_true",
+                    help="wysyla tylko zmiany wzgledem stanu ostatniej synchronizacji (--state)")
+parser.add_argument("--state", default="strapi_sync_state.json", help="plik stanu synchronizacji (hashe rekordow)")
+parser.add_argument("--unpublish-missing", action="store_true",
+                    help="przy --sync wycofuje z publikacji restauracje, ktorych nie ma w pliku wejsciowym")
+parser.add_argument("--url", help="adres Strapi (domyslnie NEXT_PUBLIC_STRAPI_URL)")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+importer = StrapiImporter(base_url=args.url, workers=args.workers)
+if args.sync:
+    summary = importer.sync(
+        iter_records(args.input),
+        state_path=args.state,
+        retry_path=args.retry_file,
+        rejects_path=args.rejects_file,
+        unpublish_missing=args.unpublish_missing,
+    )
+else:
+    summary = importer.run(iter_records(args.input), retry_path=args.retry_file, rejects_path=args.rejects_file)
+
+print("📊 Podsumowanie:")
+print(f"   ✅ Utworzono: {summary['created']}")
+if args.sync:
+    fields = ", ".join(f"{field} {count}" for field, count in summary["fields"].items())
+    print(f"   ✏️  Zmienione pola: {summary['patched']}" + (f" ({fields})" if fields else ""))
+    print(f"   ♻️  Opublikowano ponownie: {summary['republished']}")
+    print(f"   💤 Bez zmian: {summary['unchanged']}")
+    print(f"   🪦 Wycofano z publikacji: {summary['unpublished']}")
+else:
+    print(f"   🔄 Zaktualizowano: {summary['updated']}")
+print(f"   ⏭️  Pominięto: {summary['skipped']}")
+print(f"   🚫 Odrzucone przez walidację: {summary['rejected']}")
+print(f"   ❌ Błędy: {summary['failed']}")
+print(f"   ⏱️  {summary['seconds']}s ({summary['per_second']} rekordów/s)")
+if summary["failed"]:
+    print(f"   🔁 Rekordy do ponowienia: {args.retry_file}")
+if summary["rejected"]:
+    print(f"   📝 Powody odrzucenia: {args.rejects_file}")
@@ -0,0 +1,36 @@
+import argparse
+import logging
+
+from scrapers.google_places import GooglePlaces
+from scrapers.images import ImagePipeline, ImageStore
+from scrapers.strapi import StrapiImporter, iter_records
+
+
+parser = argparse.ArgumentParser(description="Pobiera zdjecia restauracji, tworzy warianty WebP i ustawia okladki w Strapi")
+parser.add_argument("input", nargs="+", help="pliki JSON/JSONL ze scrapera lub z merge_sources.py")
+parser.add_argument("--store", default="images", help="katalog magazynu zdjec")
+parser.add_argument("--workers", type=int, default=8, help="liczba rownoleglych pobran")
+parser.add_argument("--processes", type=int, help="liczba procesow generujacych warianty (domyslnie liczba CPU)")
+parser.add_argument("--upload", action="store_true", help="wysyla okladki do Strapi")
+parser.add_argument("--upload-workers", type=int, default=4, help="liczba rownoleglych uploadow")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+records = [record for path in args.input for record in iter_records(path)]
+pipeline = ImagePipeline(
+    ImageStore(args.store),
+    google=GooglePlaces(),
+    workers=args.workers,
+    processes=args.processes,
+    strapi=StrapiImporter(workers=args.upload_workers) if args.upload else None,
+)
+stats = pipeline.run(records)
+
+print(f"\n✅ Pobrane: {stats.get('downloaded', 0)}, z magazynu: {stats.get('cached', 0)}, "
+      f"błędy pobierania: {stats.get('download_failed', 0)}")
+print(f"🖼️  Warianty: {stats.get('variants', 0)}, błędy: {stats.get('variants_failed', 0)}")
+if args.upload:
+    print(f"⬆️  Wysłane: {stats.get('uploaded', 0)}, podpięte okładki: {stats.get('attached', 0)}, "
+          f"bez zmian: {stats.get('unchanged', 0)}, błędy: {stats.get('upload_failed', 0)}")
+print(f"⏱️  Czas: {stats['seconds']}s")
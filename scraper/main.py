@@ -1,5 +1,52 @@
+import argparse
+
 from scrapers.google_places import GooglePlaces
+from scrapers.response_cache import ResponseCache
+from scrapers.tile_planner import BoundingBox
+
 
+parser = argparse.ArgumentParser(description="Pobieranie restauracji z Google Places")
+parser.add_argument("query", nargs="?", help="zapytanie tekstowe lub slowo kluczowe dla kafelkow")
+parser.add_argument("--city", help="przeszukuje cale miasto kafelkami (np. Krakow)")
+parser.add_argument("--bbox", type=BoundingBox.parse, help="przeszukuje obszar south,west,north,east kafelkami")
+parser.add_argument("--tile-workers", type=int, default=4, help="liczba rownolegle przeszukiwanych kafelkow")
+parser.add_argument("--workers", type=int, default=1, help="liczba rownoleglych zapytan o szczegoly")
+parser.add_argument("--cache", default="cache.sqlite3", help="plik cache odpowiedzi API")
+parser.add_argument("--no-cache", action="store_true", help="wylacza cache odpowiedzi")
+parser.add_argument("--refresh", action="store_true", help="pobiera odpowiedzi na nowo, ignorujac cache")
+parser.add_argument("--incremental", action="store_true", help="pobiera tylko nowe lub nieaktualne miejsca")
+parser.add_argument("--previous", help="poprzedni snapshot (domyslnie najnowszy restaurants_*.json)")
+parser.add_argument("--from-strapi", action="store_true", help="znane miejsca odczytuje ze Strapi zamiast ze snapshotu")
+parser.add_argument("--max-age", type=int, default=30, help="po ilu dniach wpis uznajemy za nieaktualny")
+parser.add_argument("--stream", help="plik JSONL, do ktorego rekordy sa dopisywane na biezaco")
+parser.add_argument("--resume", action="store_true", help="wznawia przerwany przebieg z pliku --stream")
+parser.add_argument("--format", choices=("json", "columnar"), default="json",
+                    help="format snapshotu: JSON albo kolumnowy .snap (szybszy odczyt)")
+parser.add_argument("--report", help="plik raportu z metrykami przebiegu (domyslnie run_report_<data>.json)")
+parser.add_argument("--prometheus", help="zapisuje metryki takze w formacie tekstowym Prometheusa")
+args = parser.parse_args()
 
-scrappy = GooglePlaces()
-scrappy.run("restaurants+in+Krakow")
\ No newline at end of file
+cache = None if args.no_cache else ResponseCache(args.cache)
+area = args.bbox or args.city
+query = args.query if args.query or area else "restaurants+in+Krakow"
+scrappy = GooglePlaces(
+    max_workers=args.workers,
+    area=area,
+    tile_workers=args.tile_workers,
+    cache=cache,
+    refresh=args.refresh,
+)
+scrappy.snapshot_format = args.format
+scrappy.run(
+    query,
+    incremental=args.incremental,
+    previous=args.previous,
+    from_strapi=args.from_strapi,
+    max_age_days=args.max_age,
+    stream=args.stream,
+    resume=args.resume,
+    report=args.report,
+    prometheus=args.prometheus,
+)
+if cache is not None:
+    cache.close()
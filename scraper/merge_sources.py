@@ -0,0 +1,35 @@
+import argparse
+import json
+import logging
+import time
+
+from scrapers.entity_resolution import EntityResolver
+
+
+parser = argparse.ArgumentParser(description="Laczy wyniki Google Places i TripAdvisor w jeden zbior")
+parser.add_argument("google", help="plik JSON z GooglePlaces")
+parser.add_argument("tripadvisor", help="plik JSON z TripAdvisorScraper")
+parser.add_argument("-o", "--output", default="restaurants_merged.json")
+parser.add_argument("--max-distance", type=float, default=150, help="maksymalna odleglosc pary w metrach")
+parser.add_argument("--threshold", type=float, default=0.65, help="minimalny wynik podobienstwa pary")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+logger = logging.getLogger("merge_sources")
+
+with open(args.google, encoding="utf-8") as f:
+    google = json.load(f)
+with open(args.tripadvisor, encoding="utf-8") as f:
+    tripadvisor = json.load(f)
+
+start = time.perf_counter()
+merged = EntityResolver(args.max_distance, args.threshold).merge(google, tripadvisor)
+matched = sum(1 for r in merged if r.get("place_id") and r.get("source_id"))
+logger.info(
+    f"Google: {len(google)}, TripAdvisor: {len(tripadvisor)}, dopasowano {matched} par "
+    f"w {time.perf_counter() - start:.2f}s"
+)
+
+with open(args.output, "w", encoding="utf-8") as f:
+    json.dump(merged, f, ensure_ascii=False, indent=4)
+logger.info(f"Saved {len(merged)} records to {args.output}")
@@ -0,0 +1,28 @@
+import argparse
+import os
+import time
+
+from scrapers.normalization import Normalizer
+from scrapers.snapshots import load_snapshot, save_snapshot
+
+
+parser = argparse.ArgumentParser(description="Normalizacja i walidacja snapshotu restauracji wg schematu Strapi")
+parser.add_argument("input", help="snapshot (.json albo .snap)")
+parser.add_argument("output", help="snapshot z poprawnymi rekordami (format wg rozszerzenia)")
+parser.add_argument("--rejects", help="plik JSONL na odrzucone rekordy (domyslnie <output>.rejects.jsonl)")
+args = parser.parse_args()
+
+rejects = args.rejects or f"{os.path.splitext(args.output)[0]}.rejects.jsonl"
+start = time.perf_counter()
+normalizer = Normalizer()
+records = list(normalizer.run(load_snapshot(args.input), rejects))
+save_snapshot(args.output, records)
+summary = normalizer.summary()
+
+print(f"✅ Poprawne: {summary['accepted']} → {args.output} ({time.perf_counter() - start:.2f}s)")
+if summary["rejected"]:
+    print(f"🚫 Odrzucone: {summary['rejected']} → {rejects}")
+    for field, count in summary["reasons"].items():
+        print(f"   {field}: {count}")
+for field, count in summary["cleared"].items():
+    print(f"🧹 Wyczyszczone pole {field}: {count}")
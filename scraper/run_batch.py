@@ -0,0 +1,54 @@
+import argparse
+import logging
+
+from scrapers.batch import SOURCES, BatchRunner, load_jobs
+
+
+def parse_limit(value):
+    """google=10:50000 -> ("google", (10.0, 50000)); dzienny limit jest opcjonalny."""
+    source, _, limit = value.partition("=")
+    if source not in SOURCES or not limit:
+        raise argparse.ArgumentTypeError("Oczekiwano zrodlo=zapytan_na_s[:limit_dzienny], np. google=10:50000")
+    return source, parse_rate(limit)
+
+
+def parse_rate(value):
+    """1:5000 -> (1.0, 5000); dzienny limit jest opcjonalny."""
+    rps, _, quota = value.partition(":")
+    return float(rps), int(quota) if quota else None
+
+
+parser = argparse.ArgumentParser(description="Nocne odswiezanie wielu miast i zapytan w puli procesow")
+parser.add_argument("jobs", help='plik JSON/JSONL z zadaniami, np. [{"source": "google", "city": ["Krakow", "Gdansk"]}]')
+parser.add_argument("--processes", type=int, default=4, help="liczba rownolegle wykonywanych zadan")
+parser.add_argument("--workers", type=int, default=4, help="liczba rownoleglych zapytan o szczegoly w zadaniu")
+parser.add_argument("--limit", type=parse_limit, action="append", default=[],
+                    help="wspolny budzet zrodla: zrodlo=zapytan_na_s[:limit_dzienny] (mozna powtarzac)")
+parser.add_argument("--photo-limit", type=parse_rate, default=(1, None),
+                    help="wspolny budzet zapytan o zdjecia TripAdvisor: zapytan_na_s[:limit_dzienny]")
+parser.add_argument("--out", help="katalog wynikow (domyslnie batch_<data>)")
+parser.add_argument("--state", default="batch_state.json", help="plik z czasem ostatniego odswiezenia zadan")
+parser.add_argument("--cache", default="cache.sqlite3", help="plik cache odpowiedzi API")
+parser.add_argument("--no-cache", action="store_true", help="wylacza cache odpowiedzi")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+jobs = load_jobs(args.jobs)
+runner = BatchRunner(
+    processes=args.processes,
+    workers=args.workers,
+    limits=dict(args.limit),
+    cache_path=None if args.no_cache else args.cache,
+    state_path=args.state,
+    photo_limits=args.photo_limit,
+)
+summary = runner.run(jobs, out_dir=args.out)
+
+print(f"\nZadania: {summary['ok']}/{summary['jobs']} zakończone, rekordy: {summary['records']}, "
+      f"czas: {summary['seconds']}s")
+for source, used in summary["quota_used"].items():
+    print(f"  {source}: wykorzystano {used} zapytań")
+for result in summary["results"]:
+    if result["status"] != "ok":
+        print(f"  ❌ {result['name']}: {result['status']} {result.get('error') or ''}")
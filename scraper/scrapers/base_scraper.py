@@ -2,11 +2,42 @@ from abc import ABC, abstractmethod
 from dotenv import load_dotenv
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.jsonl_sink import JsonlSink
+from scrapers.metrics import RunMetrics
+from scrapers.normalization import FIELD_MAP, Normalizer, parse_timestamp
+from scrapers.rate_limiter import RateLimiter, backoff_delay, parse_retry_after
+from scrapers.columnar import EXTENSION as COLUMNAR_EXTENSION
+from scrapers.snapshots import latest_snapshot, load_snapshot, merge_records, save_snapshot
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 
 class BaseScraper(ABC):
-    def __init__(self):
+    # Budzet zapytan zrodla - nadpisywany w podklasach lub w konstruktorze
+    requests_per_second = None
+    daily_quota = None
+    max_retries = 4
+    backoff_base = 1.0
+    backoff_max = 30.0
+    pool_size = 16
+    # Pole z identyfikatorem miejsca w zrodle oraz jego odpowiednik w Strapi (jesli istnieje)
+    id_field = None
+    strapi_id_field = None
+    # Format snapshotu zapisywanego przez run(): "json" albo "columnar" (.snap)
+    snapshot_format = "json"
+
+    def __init__(self, requests_per_second=None, daily_quota=None, cache=None, refresh=False):
+        """
+        cache - opcjonalny ResponseCache na odpowiedzi API
+        refresh - pomija odczyt z cache (odpowiedzi sa pobierane i zapisywane na nowo)
+        """
         logging.basicConfig(
             level=logging.INFO,
             format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
@@ -16,6 +47,92 @@ class BaseScraper(ABC):
         load_dotenv(env_path)
         self.logger = logging.getLogger(self.__class__.__name__)
         self.data = []
+        self.cache = cache
+        self.refresh = refresh
+        # Id miejsc pobranych niedawno - w trybie przyrostowym ich szczegoly sa pomijane
+        self.fresh_ids = set()
+        # Stan potrzebny do wznowienia przerwanego przebiegu (np. token strony wynikow)
+        self.resume_state = {}
+        self.metrics = RunMetrics(self.__class__.__name__)
+        self.normalizer = Normalizer()
+
+        self.rate_limiter = RateLimiter.for_source(
+            self.__class__.__name__,
+            requests_per_second or self.requests_per_second,
+            daily_quota or self.daily_quota,
+            store=cache,
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def cached(self, endpoint, key, fetch):
+        """
+        Zwraca odpowiedz z cache albo wywoluje fetch() i zapisuje jej wynik.
+        Wynik None nie jest zapisywany, wiec bledy sa ponawiane przy kolejnym uruchomieniu.
+        """
+        source = self.__class__.__name__
+        if self.cache is not None and not self.refresh:
+            value = self.cache.get(source, endpoint, key)
+            if value is not None:
+                return value
+        value = fetch()
+        if self.cache is not None and value is not None:
+            self.cache.set(source, endpoint, key, value)
+        return value
+
+    def should_retry(self, response):
+        """Czy odpowiedz oznacza blad przejsciowy, po ktorym warto ponowic zapytanie."""
+        return response.status_code in RETRY_STATUSES
+
+    def request(self, url, params=None, headers=None, timeout=10, method="GET", limiter=None):
+        """
+        Wysyla zapytanie przez wspolna sesje z uwzglednieniem limitu zapytan zrodla
+        (albo podanego limitera, jesli etap ma osobny budzet).
+        Bledy 429/5xx i zerwane polaczenia sa ponawiane z wykladniczym opoznieniem
+        (z jitterem), z poszanowaniem naglowka Retry-After.
+        Po wyczerpaniu prob rzuca requests.exceptions.RequestException.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.metrics.record_sleep("rate_limit", (limiter or self.rate_limiter).acquire())
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method, url, params=params, headers=headers, timeout=timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.metrics.record_request(url, time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                self.logger.warning(f"Blad polaczenia ({e}), ponowienie za {delay:.1f}s")
+                self.metrics.record_retry(url)
+                self.sleep(delay, "backoff")
+                continue
+            self.metrics.record_request(
+                url, time.perf_counter() - start, response.status_code, len(response.content)
+            )
+
+            if attempt < self.max_retries and self.should_retry(response):
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                self.logger.warning(
+                    f"HTTP {response.status_code} dla {url}, ponowienie za {delay:.1f}s "
+                    f"(proba {attempt + 1}/{self.max_retries})"
+                )
+                self.metrics.record_retry(url)
+                self.sleep(delay, "backoff")
+                continue
+
+            response.raise_for_status()
+            return response
+
+    def sleep(self, seconds, reason):
+        """time.sleep, ktorego czas trafia do metryk przebiegu pod podanym powodem."""
+        time.sleep(seconds)
+        self.metrics.record_sleep(reason, seconds)
 
     @abstractmethod
     def fetch_data(self, query: str):
@@ -27,27 +144,20 @@ class BaseScraper(ABC):
         """Przetwarza dane"""
         pass
 
-    def validate_item(self, item: dict):
+    def iter_parsed(self, raw_data):
         """
-        Walidacja pojedynczego wpisu:
-        - sprawdza, czy istnieją pola obowiązkowe (nazwa i adres)
-        - opcjonalne pola
+        Zwraca przetworzone rekordy jeden po drugim.
+        Podklasy moga nadpisac te metode, aby rekordy trafialy do zapisu od razu.
         """
-        required = ["name", "address"]
-        optional = ["phone", "website", "image"]
-
-        # Sprawdź wymagane pola
-        has_required = all(field in item and bool(item[field]) for field in required)
+        yield from self.parse_data(raw_data)
 
-        # Wypisz ostrzezenie, jesli opcjonalne pola sa puste
-        if has_required:
-            for opt in optional:
-                if opt not in item or not item[opt]:
-                    self.logger.debug(f"Puste pole opcjonalne: {opt}")
-            return True
-        else:
-            self.logger.warning(f"Nieprawidłowy wpis: {item}")
-            return False
+    def validate_item(self, item: dict):
+        """
+        Walidacja pojedynczego wpisu wg schematu restauracji (scrapers.normalization).
+        run() normalizuje rekordy strumieniowo i nie korzysta z tej metody.
+        """
+        _, errors = self.normalizer.normalize(item)
+        return not errors
 
     def save_to_json(self, filename=None):
         """Zapisuje dane do pliku JSON."""
@@ -58,9 +168,184 @@ class BaseScraper(ABC):
             json.dump(self.data, f, ensure_ascii=False, indent=4)
         self.logger.info(f"Saved {len(self.data)} records to {filename}")
 
-    def run(self, query: str):
-        """Uniwersalny workflow"""
-        raw = self.fetch_data(query)
-        parsed = self.parse_data(raw)
-        self.data = [x for x in parsed if self.validate_item(x)]
-        self.save_to_json()
+    def save_snapshot(self, filename=None):
+        """
+        Zapisuje dane w formacie snapshot_format (przy podanej nazwie - wg rozszerzenia).
+        Format kolumnowy laduje sie szybciej, a JSON pozostaje dostepny przez save_to_json.
+        """
+        if not filename:
+            date_str = datetime.now().strftime("%Y-%m-%d_%H-%M")
+            extension = COLUMNAR_EXTENSION if self.snapshot_format == "columnar" else ".json"
+            filename = f"restaurants_{date_str}{extension}"
+        save_snapshot(filename, self.data)
+        self.logger.info(f"Saved {len(self.data)} records to {filename}")
+
+    def save_report(self, filename=None, prometheus=None):
+        """Zapisuje metryki przebiegu do raportu JSON i opcjonalnie w formacie Prometheusa."""
+        self.metrics.finish(self.rate_limiter.used_today, self.rate_limiter.daily_quota)
+        if not filename:
+            date_str = datetime.now().strftime("%Y-%m-%d_%H-%M")
+            filename = f"run_report_{date_str}.json"
+        extra = {"cache": self.cache.stats()} if self.cache is not None else {}
+        self.metrics.write_json(filename, **extra)
+        if prometheus:
+            self.metrics.write_prometheus(prometheus)
+        summary = self.metrics.report()
+        self.logger.info(
+            f"Raport przebiegu zapisany w {filename}: {summary['wall_seconds']}s, "
+            f"sieć {summary['network_seconds']}s, oczekiwanie {sum(summary['sleep_seconds'].values()):.1f}s, "
+            f"rekordy {summary['records']['kept']} (odrzucone {summary['records']['dropped']})"
+        )
+
+    def needs_details(self, source_id):
+        """Czy dla miejsca trzeba pobrac szczegoly (w trybie przyrostowym - tylko nowe lub stare)."""
+        return source_id not in self.fresh_ids
+
+    def skip_known(self, results, key):
+        """Odfiltrowuje wyniki wyszukiwania, ktorych szczegoly sa aktualne."""
+        if not self.fresh_ids:
+            return results
+        kept = [r for r in results if self.needs_details(r.get(key))]
+        self.logger.info(f"Pominięto {len(results) - len(kept)} znanych miejsc")
+        return kept
+
+    def records_from_strapi(self, max_age):
+        """
+        Zwraca (rekordy, aktualne_id) restauracji zapisanych w Strapi, ktore maja id tego zrodla.
+        Rekordy (pola FIELD_MAP i scraped_at) sa scalane z wynikiem jak poprzedni snapshot, wiec
+        wynik trybu przyrostowego jest pelnym zbiorem, a nie tylko nowymi miejscami.
+        Aktualne sa miejsca z scraped_at nie starszym niz max_age - updatedAt nie nadaje sie,
+        bo zmienia go kazda edycja (np. zapis avg_rating przez aggregate_ratings.py).
+        """
+        if not self.strapi_id_field:
+            self.logger.warning(f"{self.__class__.__name__} nie ma odpowiednika id w Strapi")
+            return [], set()
+
+        api = os.environ["NEXT_PUBLIC_STRAPI_URL"] + "/api/restaurants"
+        headers = {"Authorization": f"Bearer {os.environ['NEXT_PUBLIC_STRAPI_KEY']}"}
+        cutoff = datetime.now(timezone.utc) - max_age
+        fields = list(FIELD_MAP.items()) + [("scraped_at", "scraped_at")]
+        records, fresh = [], set()
+        page = 1
+        while True:
+            params = {f"fields[{i}]": attribute for i, (_, attribute) in enumerate(fields)}
+            params.update({
+                f"filters[{self.strapi_id_field}][$notNull]": "true",
+                "pagination[page]": page,
+                "pagination[pageSize]": 100,
+            })
+            response = self.session.get(api, params=params, headers=headers, timeout=10)
+            response.raise_for_status()
+            body = response.json()
+            for entry in body.get("data", []):
+                record = {field: entry.get(attribute) for field, attribute in fields}
+                records.append(record)
+                scraped_at = parse_timestamp(record["scraped_at"])
+                if scraped_at and scraped_at >= cutoff:
+                    fresh.add(entry[self.strapi_id_field])
+            if page >= body.get("meta", {}).get("pagination", {}).get("pageCount", 0):
+                return records, fresh
+            page += 1
+
+    def prepare_incremental(self, previous=None, from_strapi=False, max_age_days=30):
+        """
+        Przygotowuje tryb przyrostowy: wczytuje poprzedni snapshot (lub restauracje ze Strapi)
+        i zapamietuje id miejsc, ktorych nie trzeba pobierac ponownie.
+        Zwraca rekordy poprzedniego snapshotu do scalenia z wynikiem.
+        """
+        max_age = timedelta(days=max_age_days)
+        if from_strapi:
+            records, self.fresh_ids = self.records_from_strapi(max_age)
+            self.logger.info(f"Znane miejsca w Strapi: {len(records)}, aktualnych {len(self.fresh_ids)}")
+            return records
+
+        previous = previous or latest_snapshot()
+        if not previous:
+            self.logger.warning("Brak poprzedniego snapshotu - pełne pobieranie")
+            return []
+
+        records = load_snapshot(previous)
+        cutoff = datetime.now(timezone.utc) - max_age
+        self.fresh_ids = {
+            r[self.id_field] for r in records
+            if r.get(self.id_field) and (parse_timestamp(r.get("scraped_at")) or cutoff) > cutoff
+        }
+        self.logger.info(
+            f"Snapshot {previous}: {len(records)} rekordów, aktualnych {len(self.fresh_ids)}"
+        )
+        return records
+
+    def run(self, query: str, incremental=False, previous=None, from_strapi=False, max_age_days=30,
+            stream=None, resume=False, checkpoint_every=20, output=None, report=None, prometheus=None,
+            rejects=None):
+        """
+        Uniwersalny workflow.
+        W trybie przyrostowym pobierane sa tylko szczegoly nowych lub przeterminowanych
+        miejsc, a wynik jest scalany z poprzednim snapshotem.
+        Jesli podano stream, kazdy poprawny rekord jest od razu dopisywany do pliku JSONL,
+        a resume wznawia przerwany przebieg od ostatniego checkpointu.
+        Na koniec dane sa zapisywane jako jeden snapshot (output, JSON albo .snap), a metryki przebiegu do raportu
+        (report) i opcjonalnie do pliku w formacie Prometheusa (prometheus).
+        Rekordy sa normalizowane (adres, kod pocztowy, telefon E.164, wspolrzedne), a odrzucone
+        trafiaja z powodami do rejects (domyslnie <output>.rejects.jsonl albo rejects_<data>.jsonl).
+        """
+        self.metrics.reset()
+        if not rejects:
+            date_str = datetime.now().strftime("%Y-%m-%d_%H-%M")
+            rejects = f"{os.path.splitext(output)[0]}.rejects.jsonl" if output else f"rejects_{date_str}.jsonl"
+        self.normalizer.reset()
+        previous_records = []
+        if incremental:
+            previous_records = self.prepare_incremental(previous, from_strapi, max_age_days)
+
+        sink = None
+        if stream:
+            sink = JsonlSink(stream, checkpoint_every=checkpoint_every, resume=resume)
+            if resume:
+                self.resume_state = dict(sink.state)
+                self.fresh_ids |= sink.written_ids(self.id_field)
+                self.logger.info(f"Wznawianie przebiegu: {sink.count} rekordów w {stream}")
+
+        scraped_at = datetime.now().isoformat(timespec="seconds")
+        self.data = []
+        try:
+            raw = self.fetch_data(query)
+            items = self.normalizer.run(
+                self.iter_parsed(raw), rejects, on_reject=lambda record, errors: self.metrics.record_item(False)
+            )
+            for item in items:
+                self.metrics.record_item(True)
+                item["scraped_at"] = scraped_at
+                if sink:
+                    sink.write(item, **self.resume_state)
+                else:
+                    self.data.append(item)
+        except BaseException:
+            if sink:
+                sink.close(finished=False)
+                self.logger.warning(f"Przebieg przerwany - checkpoint zapisany w {sink.checkpoint_path}")
+            self.save_report(report, prometheus)
+            raise
+
+        if sink:
+            sink.close()
+            self.data = list(sink.read())
+
+        normalization = self.normalizer.summary()
+        if normalization["rejected"]:
+            self.logger.warning(
+                f"Odrzucono {normalization['rejected']} rekordów ({rejects}): "
+                + ", ".join(f"{field} {count}" for field, count in normalization["reasons"].items())
+            )
+
+        if incremental:
+            fetched = len(self.data)
+            self.data = merge_records(previous_records, self.data, self.id_field)
+            self.logger.info(f"Pobrano {fetched} nowych/zmienionych, łącznie {len(self.data)}")
+        self.save_snapshot(output)
+        if self.cache is not None:
+            for endpoint, stats in self.cache.stats().items():
+                self.logger.info(
+                    f"Cache {endpoint}: trafienia {stats['hits']}, chybienia {stats['misses']}"
+                )
+        self.save_report(report, prometheus)
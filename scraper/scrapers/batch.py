@@ -0,0 +1,242 @@
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from scrapers.columnar import EXTENSION as COLUMNAR_EXTENSION
+from scrapers.google_places import GooglePlaces
+from scrapers.photo_enrichment import PhotoEnricher
+from scrapers.rate_limiter import QuotaExceeded, RateLimiter, SharedRateLimiter
+from scrapers.response_cache import ResponseCache
+from scrapers.tile_planner import BoundingBox
+from scrapers.trip_advisor import TripAdvisorScraper
+
+SOURCES = {
+    "google": GooglePlaces,
+    "tripadvisor": TripAdvisorScraper,
+}
+
+JOB_FIELDS = ("source", "query", "city", "bbox")
+# Budzet zapytan o zdjecia (PhotoEnricher) jest osobny od budzetu glownego pobierania TripAdvisor
+PHOTOS_LIMITER = f"{TripAdvisorScraper.__name__}.photos"
+
+logger = logging.getLogger("Batch")
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+
+
+def expand_jobs(entries):
+    """
+    Rozwija wpisy z listy zadan: pole bedace lista daje iloczyn kartezjanski, np.
+    {"source": "google", "city": ["Krakow", "Gdansk"], "query": ["pizza", "sushi"]} -> 4 zadania.
+    Kazde zadanie dostaje unikalna nazwe (name), uzywana w nazwach plikow i w stanie.
+    """
+    jobs = {}
+    for entry in entries:
+        keys = list(entry)
+        values = [v if isinstance(v, list) else [v] for v in entry.values()]
+        for combo in itertools.product(*values):
+            job = dict(zip(keys, combo))
+            if job.get("source") not in SOURCES:
+                raise ValueError(f"Nieznane zrodlo {job.get('source')!r} (dostepne: {', '.join(SOURCES)})")
+            job.setdefault("name", "_".join(slug(job[k]) for k in JOB_FIELDS if job.get(k)))
+            jobs[job["name"]] = job
+    return list(jobs.values())
+
+
+def load_jobs(path):
+    """Wczytuje liste zadan z pliku JSON (tablica) albo JSONL."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+    return expand_jobs(entries)
+
+
+def order_by_staleness(jobs, state):
+    """Najpierw zadania nigdy nieuruchomione, potem od najdawniej odswiezonych."""
+    return sorted(jobs, key=lambda job: state.get(job["name"], {}).get("finished_at") or "")
+
+
+# --- proces workera ---
+
+_cache = None
+
+
+def _init_worker(limiters, cache_path):
+    """limiters - {nazwa w rejestrze RateLimiter: SharedRateLimiter}."""
+    global _cache
+    for name, limiter in limiters.items():
+        RateLimiter.register(name, limiter)
+    _cache = ResponseCache(cache_path) if cache_path else None
+
+
+def previous_output(job, out_dir, state):
+    """
+    Poprzedni wynik zadania dla trybu przyrostowego: jawne previous, sciezka zapisana
+    w stanie albo <out_dir>/<zadanie>.json|.snap. Nigdy najnowszy snapshot z katalogu
+    roboczego - moglby pochodzic z innego zadania (innego miasta lub zapytania).
+    """
+    candidates = [job.get("previous"), state.get(job["name"], {}).get("output")]
+    candidates += [os.path.join(out_dir, f"{job['name']}{ext}") for ext in (COLUMNAR_EXTENSION, ".json")]
+    return next((path for path in candidates if path and os.path.exists(path)), None)
+
+
+def run_job(job, out_dir, workers, limits, previous=None, photo_limits=(1, None)):
+    """Uruchamia jedno zadanie w procesie workera i zwraca jego podsumowanie."""
+    scraper_cls = SOURCES[job["source"]]
+    requests_per_second, daily_quota = limits
+    options = {"cache": _cache, "requests_per_second": requests_per_second, "daily_quota": daily_quota}
+    if scraper_cls is GooglePlaces:
+        area = BoundingBox.parse(job["bbox"]) if job.get("bbox") else job.get("city")
+        scraper = GooglePlaces(max_workers=job.get("workers", workers), area=area, **options)
+        query = job.get("query")
+    else:
+        scraper = scraper_cls(**options)
+        query = job.get("query") or f"restaurants in {job['city']}"
+
+    summary = {"name": job["name"], "source": job["source"], "status": "ok", "error": None}
+    extension = COLUMNAR_EXTENSION if job.get("format") == "columnar" else ".json"
+    output = os.path.join(out_dir, f"{job['name']}{extension}")
+    incremental = job.get("incremental", False)
+    if incremental and not previous:
+        # Bez wlasnego poprzedniego wyniku BaseScraper siegnalby po globalny latest_snapshot()
+        logger.warning(f"{job['name']}: brak poprzedniego wyniku zadania - pełne pobieranie")
+        incremental = False
+    try:
+        scraper.run(
+            query,
+            incremental=incremental,
+            previous=previous,
+            output=output,
+            report=os.path.join(out_dir, f"{job['name']}.report.json"),
+        )
+        if job.get("photos") and isinstance(scraper, TripAdvisorScraper):
+            PhotoEnricher(scraper, job.get("workers", workers), *photo_limits).enrich(scraper.data)
+            scraper.save_snapshot(output)
+    except QuotaExceeded as e:
+        summary.update(status="quota_exceeded", error=str(e))
+    except Exception as e:
+        summary.update(status="failed", error=f"{type(e).__name__}: {e}")
+    if _cache is not None:
+        # Cache workera nie jest zamykany (zyje tyle co pula), wiec zuzycie zapisujemy po kazdym zadaniu
+        _cache.flush_quota()
+    report = scraper.metrics.report()
+    summary.update(
+        records=len(scraper.data),
+        output=output if summary["status"] == "ok" else None,
+        seconds=report["wall_seconds"],
+        requests=sum(e["requests"] for e in report["endpoints"].values()),
+        finished_at=datetime.now().isoformat(timespec="seconds"),
+    )
+    return summary
+
+
+class BatchRunner:
+    """
+    Uruchamia wiele zadan scrapowania (zrodlo x zapytanie/miasto) w puli procesow.
+    Limity zapytan kazdego zrodla sa wspolne dla wszystkich procesow (SharedRateLimiter),
+    wiec rownolegle zadania nie przekrocza lacznie budzetu dostawcy. Zadania sa
+    uruchamiane od najbardziej nieaktualnych; po wyczerpaniu dziennego limitu zrodla
+    jego pozostale zadania sa anulowane.
+    """
+
+    def __init__(self, processes=4, workers=4, limits=None, cache_path="cache.sqlite3",
+                 state_path="batch_state.json", photo_limits=(1, None)):
+        """
+        limits - {zrodlo: (requests_per_second, daily_quota)}, domyslnie limity klas scraperow.
+        photo_limits - (requests_per_second, daily_quota) zapytan o zdjecia, wspolne dla wszystkich procesow.
+        """
+        self.processes = processes
+        self.photo_limits = photo_limits
+        self.workers = workers
+        self.cache_path = cache_path
+        self.state_path = state_path
+        self.limits = {
+            source: (limits or {}).get(source, (cls.requests_per_second, cls.daily_quota))
+            for source, cls in SOURCES.items()
+        }
+
+    def load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=4)
+        os.replace(tmp, self.state_path)
+
+    def run(self, jobs, out_dir=None):
+        """Wykonuje zadania i zapisuje summary.json w out_dir. Zwraca podsumowanie."""
+        out_dir = out_dir or f"batch_{datetime.now().strftime('%Y-%m-%d_%H-%M')}"
+        os.makedirs(out_dir, exist_ok=True)
+        state = self.load_state() if self.state_path else {}
+        jobs = order_by_staleness(jobs, state)
+        limiters = {source: SharedRateLimiter(*limit) for source, limit in self.limits.items()}
+        photos_limiter = SharedRateLimiter(*self.photo_limits)
+        registry = {SOURCES[source].__name__: limiter for source, limiter in limiters.items()}
+        registry[PHOTOS_LIMITER] = photos_limiter
+
+        start = time.perf_counter()
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_init_worker, initargs=(registry, self.cache_path)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    run_job, job, out_dir, self.workers, self.limits[job["source"]],
+                    previous_output(job, out_dir, state), self.photo_limits,
+                ): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                if future.cancelled():
+                    continue
+                result = future.result()
+                results.append(result)
+                logger.info(
+                    f"[{len(results)}/{len(jobs)}] {result['name']}: {result['status']}, "
+                    f"rekordy {result['records']}, {result['seconds']}s"
+                )
+                if result["status"] == "ok" and self.state_path:
+                    state[job["name"]] = {
+                        "finished_at": result["finished_at"],
+                        "records": result["records"],
+                        "output": result["output"],
+                    }
+                    self.save_state(state)
+                elif result["status"] == "quota_exceeded":
+                    for other, other_job in futures.items():
+                        if other_job["source"] == job["source"]:
+                            other.cancel()
+
+        done = {r["name"] for r in results}
+        results.extend(
+            {"name": job["name"], "source": job["source"], "status": "cancelled", "records": 0}
+            for job in jobs if job["name"] not in done
+        )
+        summary = {
+            "seconds": round(time.perf_counter() - start, 2),
+            "jobs": len(jobs),
+            "ok": sum(r["status"] == "ok" for r in results),
+            "records": sum(r["records"] for r in results),
+            "quota_used": {
+                **{source: limiter.used_today for source, limiter in limiters.items()},
+                "tripadvisor.photos": photos_limiter.used_today,
+            },
+            "results": sorted(results, key=lambda r: r["name"]),
+        }
+        with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=4)
+        return summary
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"FOODSNAP"
+VERSION = 1
+EXTENSION = ".snap"
+ALIGN = 8
+
+# Kolumny zawsze zapisywane jako float64 (TripAdvisor zwraca je jako napisy)
+FLOAT_COLUMNS = ("lat", "lng")
+# Pola pomijane w hashu rekordu - zmieniaja sie przy kazdym pobraniu
+HASH_IGNORED = ("scraped_at",)
+
+# Znaczniki w masce kolumny: wartosc jest, wartosc None, brak klucza w rekordzie
+PRESENT, NULL, ABSENT = 0, 1, 2
+
+
+def record_hash(record):
+    """8-bajtowy hash tresci rekordu (bez pol z HASH_IGNORED), niezalezny od kolejnosci kluczy."""
+    content = {k: v for k, v in record.items() if k not in HASH_IGNORED}
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _column_type(name, values):
+    if name in FLOAT_COLUMNS:
+        return "f8"
+    present = [v for v in values if v is not None]
+    if present and all(type(v) is int and -2 ** 63 <= v < 2 ** 63 for v in present):
+        return "i8"
+    if present and all(type(v) in (int, float) for v in present):
+        return "f8"
+    if all(type(v) is str for v in present):
+        return "str"
+    return "json"
+
+
+def _little_endian(values):
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_column(kind, values):
+    """Zwraca bloki kolumny: {"values": bytes, "offsets": bytes (dla napisow)}."""
+    if kind == "f8":
+        converted = (_to_float(v) for v in values)
+        return {"values": _little_endian(array("d", (math.nan if v is None else v for v in converted)))}
+    if kind == "i8":
+        return {"values": _little_endian(array("q", (0 if v is None else v for v in values)))}
+
+    offsets = array("Q", [0])
+    chunks = []
+    size = 0
+    for value in values:
+        if value is not None:
+            text = value if kind == "str" else json.dumps(value, ensure_ascii=False)
+            data = text.encode("utf-8")
+            chunks.append(data)
+            size += len(data)
+        offsets.append(size)
+    return {"values": b"".join(chunks), "offsets": _little_endian(offsets)}
+
+
+def write_columnar(path, records):
+    """
+    Zapisuje rekordy w formacie kolumnowym (jeden plik):
+    MAGIC, wersja, dlugosc naglowka, naglowek JSON (typy i polozenie blokow kolumn),
+    a potem bloki wyrownane do 8 bajtow. Kolumny liczbowe to ciagle tablice
+    little-endian (float64/int64), ktore mozna zmapowac wprost do NumPy; napisy
+    to tablica przesuniec uint64 i jeden blok UTF-8.
+    """
+    records = list(records)
+    names = list(dict.fromkeys(k for record in records for k in record))
+    header = {"version": VERSION, "count": len(records), "columns": {}}
+    blocks = []
+    offset = 0
+
+    def add_block(data):
+        nonlocal offset
+        start = offset
+        blocks.append(data)
+        blocks.append(b"\0" * (-len(data) % ALIGN))
+        offset += len(data) + (-len(data) % ALIGN)
+        return [start, len(data)]
+
+    for name in names:
+        mask = bytes(PRESENT if name in r and r[name] is not None else NULL if name in r else ABSENT
+                     for r in records)
+        values = [r.get(name) for r in records]
+        kind = _column_type(name, values)
+        column = {"type": kind}
+        for block, data in _encode_column(kind, values).items():
+            column[block] = add_block(data)
+        if any(mask):
+            column["mask"] = add_block(mask)
+        header["columns"][name] = column
+    header["hashes"] = add_block(b"".join(record_hash(r) for r in records))
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = MAGIC + struct.pack("<IQ", VERSION, len(header_bytes)) + header_bytes
+    prefix += b"\0" * (-len(prefix) % ALIGN)
+    header_size = len(prefix)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp, path)
+    return header_size + offset
+
+
+class ColumnarSnapshot:
+    """
+    Snapshot w formacie kolumnowym otwarty przez mmap - wczytywane sa tylko
+    potrzebne kolumny. floats() zwraca tablice NumPy zmapowana wprost z pliku
+    (albo kopie w array.array, jesli NumPy nie jest zainstalowany).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} nie jest snapshotem kolumnowym")
+        version, header_len = struct.unpack_from("<IQ", self._mm, len(MAGIC))
+        if version > VERSION:
+            self._mm.close()
+            raise ValueError(f"Nieobslugiwana wersja snapshotu: {version}")
+        start = len(MAGIC) + 12
+        header = json.loads(self._mm[start:start + header_len])
+        self._base = start + header_len + (-(start + header_len) % ALIGN)
+        self.count = header["count"]
+        self.schema = header["columns"]
+        self._hashes = header["hashes"]
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+
+    @property
+    def columns(self):
+        return list(self.schema)
+
+    def _view(self, block):
+        start, size = block
+        return memoryview(self._mm)[self._base + start:self._base + start + size]
+
+    def _mask(self, name):
+        column = self.schema[name]
+        return bytes(self._view(column["mask"])) if "mask" in column else bytes(self.count)
+
+    def floats(self, name):
+        """Kolumna liczbowa jako tablica tylko do odczytu (NaN = brak wartosci)."""
+        column = self.schema[name]
+        dtype = {"f8": "<f8", "i8": "<i8"}.get(column["type"])
+        if dtype is None:
+            raise TypeError(f"Kolumna {name} ma typ {column['type']}, a nie liczbowy")
+        start, size = column["values"]
+        try:
+            import numpy as np
+        except ImportError:
+            values = array("d" if dtype == "<f8" else "q")
+            values.frombytes(self._view(column["values"]))
+            if sys.byteorder != "little":
+                values.byteswap()
+            return values
+        if not self.count:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=self._base + start, shape=(self.count,))
+
+    def column(self, name):
+        """Kolumna jako lista wartosci Pythona (None dla brakow)."""
+        column = self.schema.get(name)
+        if column is None:
+            return [None] * self.count
+        mask = self._mask(name)
+        kind = column["type"]
+        if kind in ("f8", "i8"):
+            values = array("d" if kind == "f8" else "q")
+            values.frombytes(self._view(column["values"]))
+            if sys.byteorder != "little":
+                values.byteswap()
+            return [v if m == PRESENT and v == v else None for v, m in zip(values, mask)]
+
+        offsets = array("Q")
+        offsets.frombytes(self._view(column["offsets"]))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        data = bytes(self._view(column["values"]))
+        out = []
+        for i in range(self.count):
+            if mask[i] != PRESENT:
+                out.append(None)
+                continue
+            text = data[offsets[i]:offsets[i + 1]].decode("utf-8")
+            out.append(text if kind == "str" else json.loads(text))
+        return out
+
+    def hashes(self):
+        """Lista 8-bajtowych hashy tresci rekordow (record_hash)."""
+        data = bytes(self._view(self._hashes))
+        return [data[i:i + 8] for i in range(0, len(data), 8)]
+
+    def records(self):
+        """Odtwarza rekordy (klucze nieobecne w oryginale sa pomijane)."""
+        columns = {name: (self.column(name), self._mask(name)) for name in self.schema}
+        for i in range(self.count):
+            yield {
+                name: values[i]
+                for name, (values, mask) in columns.items()
+                if mask[i] != ABSENT
+            }
@@ -0,0 +1,196 @@
+import math
+import re
+import statistics
+import unicodedata
+from collections import defaultdict
+
+from scrapers.normalization import content_hash, parse_coordinate
+from scrapers.tile_planner import haversine_m
+
+# Slowa, ktore nie odrozniaja lokali i tylko zaburzaja porownanie nazw
+NAME_STOPWORDS = {
+    "restauracja", "restaurant", "ristorante", "bar", "bistro", "cafe", "kawiarnia",
+    "the", "i", "and", "&",
+}
+ADDRESS_STOPWORDS = {"ul", "ulica", "al", "aleja", "os", "osiedle", "pl", "plac", "poland", "polska"}
+
+POSTAL_RE = re.compile(r"\b\d{2}-\d{3}\b")
+NON_WORD_RE = re.compile(r"[^\w\s]")
+
+# Z ktorego zrodla brac pole w pierwszej kolejnosci
+FIELD_PRIORITY = {
+    "name": ("google", "tripadvisor"),
+    "address": ("google", "tripadvisor"),
+    "city": ("google", "tripadvisor"),
+    "postalCode": ("google", "tripadvisor"),
+    "phone": ("google", "tripadvisor"),
+    "website": ("google", "tripadvisor"),
+    "lat": ("google", "tripadvisor"),
+    "lng": ("google", "tripadvisor"),
+    "photo": ("google",),
+    "image": ("tripadvisor",),
+    "rating": ("tripadvisor",),
+    "price_level": ("tripadvisor",),
+    "scraped_at": ("google", "tripadvisor"),
+}
+
+
+def normalize_text(text, stopwords):
+    """Male litery, bez polskich znakow, interpunkcji i slow nieistotnych."""
+    text = unicodedata.normalize("NFKD", (text or "").lower().replace("ł", "l"))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = NON_WORD_RE.sub(" ", text)
+    return " ".join(t for t in text.split() if t not in stopwords)
+
+
+def trigrams(text):
+    """Zbior trigramow znakowych napisu (z dopelnieniem spacjami na brzegach)."""
+    if not text:
+        return frozenset()
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a, b):
+    """Wspolczynnik Dice'a na zbiorach trigramow - odporny na literowki i szyk slow."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class _Entry:
+    __slots__ = ("record", "lat", "lng", "name", "street", "postal")
+
+    def __init__(self, record):
+        self.record = record
+        # TripAdvisor podaje wspolrzedne jako napisy; niepoprawne = brak (rekord bez pary)
+        self.lat, _ = parse_coordinate(record.get("lat"), 90)
+        self.lng, _ = parse_coordinate(record.get("lng"), 180)
+        if self.lat is None or self.lng is None:
+            self.lat = self.lng = None
+        self.name = trigrams(normalize_text(record.get("name"), NAME_STOPWORDS))
+        address = record.get("address") or ""
+        postal = POSTAL_RE.search(address)
+        self.postal = postal.group() if postal else None
+        self.street = trigrams(normalize_text(address.split(",")[0], ADDRESS_STOPWORDS))
+
+
+class EntityResolver:
+    """
+    Laczy rekordy Google Places i TripAdvisor opisujace ten sam lokal.
+    Kandydaci sa ograniczani do sasiednich komorek siatki (blocking po lat/lng),
+    dzieki czemu liczba porownan rosnie liniowo z liczba miejsc, a nie kwadratowo.
+    Para jest dopasowana, jesli laczny wynik podobienstwa nazwy, adresu i odleglosci
+    przekracza threshold; kazdy rekord moze zostac dopasowany tylko raz.
+    """
+
+    def __init__(self, max_distance_m=150, threshold=0.65):
+        self.max_distance_m = max_distance_m
+        self.threshold = threshold
+        self._cell_lat = max_distance_m / 111_320
+        self._cell_lng = self._cell_lat
+
+    def _set_cell_width(self, entries):
+        """
+        Jedna szerokosc komorki w dlugosci geograficznej dla calego dopasowania, liczona dla
+        mediany szerokosci (pasa, w ktorym lezy wiekszosc danych), wiec pojedyncza bledna
+        wspolrzedna nie poszerza wszystkich komorek. Punkty dalej od rownika niz mediana
+        przeszukuja odpowiednio wiecej kolumn (_reach).
+        """
+        latitudes = [abs(e.lat) for e in entries if e.lat is not None]
+        reference = statistics.median(latitudes) if latitudes else 0.0
+        self._cell_lng = self._lng_width(reference)
+
+    def _lng_width(self, lat):
+        """Szerokosc max_distance_m w dlugosci geograficznej, z zapasem jednej komorki w strone bieguna
+        (punkt pary moze lezec do max_distance_m dalej od rownika)."""
+        return self._cell_lat / max(math.cos(math.radians(min(abs(lat) + self._cell_lat, 90))), 0.01)
+
+    def _reach(self, lat):
+        """Ile kolumn w kazda strone trzeba przeszukac dla punktu na danej szerokosci."""
+        return max(1, math.ceil(self._lng_width(lat) / self._cell_lng))
+
+    def _cell(self, lat, lng):
+        return int(lat // self._cell_lat), int(lng // self._cell_lng)
+
+    def _index(self, entries):
+        grid = defaultdict(list)
+        for entry in entries:
+            if entry.lat is not None and entry.lng is not None:
+                grid[self._cell(entry.lat, entry.lng)].append(entry)
+        return grid
+
+    def score(self, a, b):
+        distance = haversine_m(a.lat, a.lng, b.lat, b.lng)
+        if distance > self.max_distance_m:
+            return 0.0
+        proximity = 1 - distance / self.max_distance_m
+        partial = 0.6 * similarity(a.name, b.name) + 0.15 * proximity
+        # Nawet idealny adres nie podniesie wyniku ponad prog - szkoda liczyc
+        if partial + 0.25 < self.threshold:
+            return 0.0
+        street = similarity(a.street, b.street)
+        if a.postal and b.postal and a.postal != b.postal:
+            street *= 0.5
+        return partial + 0.25 * street
+
+    def match(self, google, tripadvisor):
+        """Zwraca liste par (rekord_google, rekord_tripadvisor, wynik)."""
+        google_entries = [_Entry(r) for r in google]
+        ta_entries = [_Entry(r) for r in tripadvisor]
+        self._set_cell_width(google_entries + ta_entries)
+        grid = self._index(google_entries)
+
+        candidates = []
+        for ta in ta_entries:
+            if ta.lat is None or ta.lng is None:
+                continue
+            row, col = self._cell(ta.lat, ta.lng)
+            reach = self._reach(ta.lat)
+            for d_row in (-1, 0, 1):
+                for d_col in range(-reach, reach + 1):
+                    for g in grid.get((row + d_row, col + d_col), ()):
+                        score = self.score(g, ta)
+                        if score >= self.threshold:
+                            candidates.append((score, g, ta))
+
+        # Zachlanne przypisanie od najlepszych par
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        used_google, used_ta = set(), set()
+        pairs = []
+        for score, g, ta in candidates:
+            if id(g) in used_google or id(ta) in used_ta:
+                continue
+            used_google.add(id(g))
+            used_ta.add(id(ta))
+            pairs.append((g.record, ta.record, score))
+        return pairs
+
+    def merge(self, google, tripadvisor):
+        """
+        Zwraca zunifikowane rekordy z oboma identyfikatorami (place_id i source_id).
+        Dla dopasowanych par kazde pole pochodzi z preferowanego zrodla (FIELD_PRIORITY);
+        rekordy bez pary sa przepisywane bez zmian.
+        """
+        pairs = self.match(google, tripadvisor)
+        matched_google = {id(g) for g, _, _ in pairs}
+        matched_ta = {id(t) for _, t, _ in pairs}
+
+        merged = []
+        for g, ta, score in pairs:
+            sources = {"google": g, "tripadvisor": ta}
+            record = {"place_id": g.get("place_id"), "source_id": ta.get("source_id")}
+            for field, order in FIELD_PRIORITY.items():
+                record[field] = next(
+                    (sources[s][field] for s in order if sources[s].get(field) not in (None, "")),
+                    None,
+                )
+            if g.get("content_hash") or ta.get("content_hash"):
+                # Pola pochodza z obu zrodel - hash zadnego z nich nie opisuje polaczonego rekordu
+                record["content_hash"] = content_hash(record)
+            record["match_score"] = round(score, 3)
+            merged.append(record)
+
+        merged.extend(g for g in google if id(g) not in matched_google)
+        merged.extend(t for t in tripadvisor if id(t) not in matched_ta)
+        return merged
@@ -1,13 +1,58 @@
 import os
 import requests
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.tile_planner import BoundingBox, TilePlanner
 
 
 class GooglePlaces(BaseScraper):
+    requests_per_second = 10
+    base_url = 'https://maps.googleapis.com'
+    # Token kolejnej strony staje sie aktywny dopiero po chwili od jego wydania
+    page_token_delay = 3
+    id_field = "place_id"
+    strapi_id_field = "place_id"
+
+    def __init__(self, max_workers=1, area=None, tile_workers=4, **kwargs):
+        """
+        max_workers - limit rownoleglych zapytan o szczegoly miejsc.
+        Dla 1 scraper dziala sekwencyjnie, jak dotychczas.
+        area - BoundingBox albo nazwa miasta; wtedy obszar jest przeszukiwany kafelkami
+        (tile_workers rownoleglych kafelkow) zamiast jednym zapytaniem tekstowym.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.area = area
+        self.tile_workers = tile_workers
+        self.planner = None
+        self.pool_size = max(self.pool_size, self.max_workers + tile_workers)
+        super().__init__(**kwargs)
+
+    def should_retry(self, response):
+        # Places API zglasza przekroczenie limitu kodem 200 i statusem w tresci
+        if super().should_retry(response):
+            return True
+        try:
+            return response.json().get("status") == "OVER_QUERY_LIMIT"
+        except ValueError:
+            return False
+
     def fetch_data(self, query='restaurants+in+Krakow'):
-        api = 'https://maps.googleapis.com/maps/api/place/textsearch/json'
+        """
+        W trybie wspolbieznym wyniki sa zwracane leniwie (generator), dzieki czemu
+        parse_data pobiera szczegoly juz podczas oczekiwania na kolejne strony.
+        """
+        if self.area is not None:
+            results = self.iter_tiled_results(self.area, keyword=query)
+        else:
+            results = self.iter_results(query)
+        if self.max_workers == 1:
+            results = list(results)
+        return {"results": results}
+
+    def iter_results(self, query='restaurants+in+Krakow'):
+        """Zwraca iterator po wynikach wyszukiwania, pobieranych strona po stronie."""
         api_key = os.environ.get("GOOGLE_PLACE_API_KEY")
         
         if not api_key:
@@ -17,44 +62,111 @@ class GooglePlaces(BaseScraper):
             )
         
         params = {"query": query, "key": api_key}
+        page_token = self.resume_state.get("page_token")
+        if page_token:
+            self.logger.info("Wznawianie od zapisanej strony wyników")
+            return self._iter_pages({"pagetoken": page_token, "key": api_key}, fallback=params)
+        return self._iter_pages(params)
+
+    def geocode_bounds(self, city):
+        """Zwraca BoundingBox miasta na podstawie Geocoding API."""
+        api = f'{self.base_url}/maps/api/geocode/json'
+        params = {"address": city, "key": os.environ["GOOGLE_PLACE_API_KEY"]}
+        data = self.request(api, params=params, timeout=5).json()
+        if not data.get("results"):
+            raise ValueError(f"Nie znaleziono obszaru dla: {city}")
+        viewport = data["results"][0]["geometry"]["viewport"]
+        return BoundingBox(
+            viewport["southwest"]["lat"], viewport["southwest"]["lng"],
+            viewport["northeast"]["lat"], viewport["northeast"]["lng"],
+        )
 
-        all_results = []
+    def search_tile(self, tile, keyword=None):
+        """Pobiera wszystkie strony wynikow Nearby Search dla jednego kafelka."""
+        lat, lng = tile.center
+        params = {
+            "location": f"{lat},{lng}",
+            "radius": int(tile.radius_m) + 1,
+            "type": "restaurant",
+            "key": os.environ["GOOGLE_PLACE_API_KEY"],
+        }
+        if keyword:
+            params["keyword"] = keyword
+        api = f'{self.base_url}/maps/api/place/nearbysearch/json'
+        return list(self._iter_pages(params, api=api))
+
+    def iter_tiled_results(self, area, keyword=None):
+        """Zwraca unikalne wyniki z obszaru przeszukiwanego adaptacyjnymi kafelkami."""
+        if not os.environ.get("GOOGLE_PLACE_API_KEY"):
+            raise ValueError(
+                "GOOGLE_PLACE_API_KEY not found in environment variables. "
+                "Please add it to .env.local file in the project root."
+            )
+        bounds = area if isinstance(area, BoundingBox) else self.geocode_bounds(area)
+        self.planner = TilePlanner(
+            lambda tile: self.search_tile(tile, keyword), max_workers=self.tile_workers
+        )
+        return self._iter_tiles(bounds)
+
+    def _iter_tiles(self, bounds):
+        yield from self.planner.iter_results(bounds)
+        self.logger.info(
+            f"Przeszukano {self.planner.tiles_searched} kafelków "
+            f"(podzielonych: {self.planner.tiles_split})"
+        )
+
+    def _iter_pages(self, params, fallback=None, api=None):
+        """
+        Pobiera kolejne strony wynikow. Kazdy wynik dostaje pole _pagetoken z tokenem
+        strony, z ktorej pochodzi - na jego podstawie zapisywany jest punkt wznowienia.
+        fallback to parametry uzywane, gdy zapisany token strony juz wygasl.
+        """
+        api = api or f'{self.base_url}/maps/api/place/textsearch/json'
 
         while True:
             try:
-                response = requests.get(api, params=params, timeout=5)
-                response.raise_for_status()
+                response = self.request(api, params=params, timeout=5)
                 data = response.json()
             except requests.exceptions.RequestException as e:
                 self.logger.error(f"Blad podczas zapytania: {e}")
                 break
 
-            if "results" in data:
-                all_results.extend(data["results"])
+            if fallback and data.get("status") == "INVALID_REQUEST":
+                self.logger.warning("Zapisany token strony wygasł - wyszukiwanie od początku")
+                params, fallback = fallback, None
+                continue
+            fallback = None
+
+            for result in data.get("results", []):
+                result["_pagetoken"] = params.get("pagetoken")
+                yield result
 
             next_page_token = data.get("next_page_token")
             if not next_page_token:
                 break
             self.logger.debug("Oczekiwanie na aktywacje next_page_token...")
-            time.sleep(3)
+            self.sleep(self.page_token_delay, "page_token")
 
             params = {"pagetoken": next_page_token, "key": os.environ["GOOGLE_PLACE_API_KEY"]}
 
-        return {"results": all_results}
+    def _fetch_details(self, api, params):
+        data = self.request(api, params=params, timeout=5).json()
+        # Do cache trafiaja tylko poprawne odpowiedzi
+        return data if 'result' in data else None
 
     def parse_details_data(self, place_id):
-        api = 'https://maps.googleapis.com/maps/api/place/details/json'
+        api = f'{self.base_url}/maps/api/place/details/json'
         params = {"place_id": place_id, "key": os.environ["GOOGLE_PLACE_API_KEY"]}
 
         try:
-            response = requests.get(api, params=params, timeout=5)
-            response.raise_for_status()
-            restaurant = response.json()
+            restaurant = self.cached(
+                "details", place_id, lambda: self._fetch_details(api, params)
+            )
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Blad podczas pobierania szczegolow miejsca {place_id}: {e}")
             return None
 
-        if 'result' not in restaurant:
+        if not restaurant or 'result' not in restaurant:
             self.logger.warning(f"Brak danych szczegolowych dla place_id={place_id}")
             return None
 
@@ -73,41 +185,80 @@ class GooglePlaces(BaseScraper):
 
         return restaurant_dict
 
+    def fetch_photo(self, reference, max_width=1600):
+        """Pobiera zdjecie miejsca (Place Photo API) i zwraca jego bajty."""
+        api = f'{self.base_url}/maps/api/place/photo'
+        params = {"photo_reference": reference, "maxwidth": max_width, "key": os.environ["GOOGLE_PLACE_API_KEY"]}
+        # API odpowiada przekierowaniem na plik obrazu, ktore sesja obsluguje sama
+        return self.request(api, params=params, timeout=30).content
+
+    def iter_details(self, results):
+        """
+        Zwraca pary (wynik, szczegoly) w kolejnosci wynikow wyszukiwania.
+        Przy max_workers > 1 szczegoly pobiera pula watkow; liczba zlecen w locie
+        jest ograniczona, wiec leniwe wyniki nie sa wczytywane z wyprzedzeniem.
+        """
+        if self.max_workers == 1:
+            for result in results:
+                place_id = result.get("place_id")
+                yield result, self.parse_details_data(place_id) if place_id else None
+            return
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for result in results:
+                place_id = result.get("place_id")
+                future = executor.submit(self.parse_details_data, place_id) if place_id else None
+                pending.append((result, future))
+                while len(pending) > 2 * self.max_workers:
+                    yield self._resolve(pending.popleft())
+            while pending:
+                yield self._resolve(pending.popleft())
+
+    @staticmethod
+    def _resolve(entry):
+        result, future = entry
+        return result, future.result() if future else None
+
     def parse_data(self, raw_data):
+        return list(self.iter_parsed(raw_data))
+
+    def iter_parsed(self, raw_data):
         if not raw_data:
             self.logger.warning("Brak danych wejściowych do parsowania.")
-            return []
+            return
 
         results = raw_data.get("results", [])
-        if not results:
+        if isinstance(results, list) and not results:
             self.logger.warning("Brak wyników w odpowiedzi API.")
-            return []
+            return
 
-        data = []
-        total = len(results)
-        self.logger.info(f"Rozpoczynam parsowanie {total} miejsc...")
+        if isinstance(results, list):
+            results = self.skip_known(results, "place_id")
+        else:
+            results = (r for r in results if self.needs_details(r.get("place_id")))
 
-        for i, result in enumerate(results, start=1):
+        count = 0
+        total = len(results) if isinstance(results, list) else "?"
+        self.logger.info(f"Rozpoczynam parsowanie {total} miejsc (watki: {self.max_workers})...")
+
+        i = 0
+        for i, (result, details) in enumerate(self.iter_details(results), start=1):
             place_id = result.get("place_id")
             if not place_id:
                 self.logger.debug(f"Pominięto wynik bez place_id: {result}")
                 continue
 
-            # pobieranie szczegolow dla pojedynczej restauracji
-            details = self.parse_details_data(place_id)
             if details:
-                data.append(details)
+                count += 1
+                self.resume_state["page_token"] = result.get("_pagetoken")
                 self.logger.debug(f"[{i}/{total}] Dodano: {details.get('name')}")
+                yield details
             else:
                 self.logger.warning(f"[{i}/{total}] Brak szczegółów dla place_id={place_id}")
 
-            # delay zeby nie dostac bana
-            time.sleep(0.5)
-
-        self.logger.info(f"Parsowanie zakończone. Pobrano {len(data)} poprawnych rekordów.")
-        return data
-
-
-
-
+        if i == 0:
+            self.logger.warning("Brak wyników w odpowiedzi API.")
+            return
 
+        self.logger.info(f"Parsowanie zakończone. Pobrano {count} poprawnych rekordów.")
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Warianty generowane dla kazdego zdjecia: nazwa -> maksymalny bok w pikselach
+VARIANTS = {
+    "cover": 1600,
+    "thumb": 400,
+}
+WEBP_QUALITY = 80
+
+
+def make_variants(source, targets):
+    """
+    Tworzy warianty WebP zdjecia (wywolywane w procesie puli - Pillow zajmuje CPU).
+    targets - {nazwa_wariantu: sciezka}; zwraca liczbe utworzonych plikow.
+    """
+    # Pillow jest potrzebny tylko w tym etapie, wiec import jest tutaj
+    from PIL import Image
+
+    created = 0
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        for name, path in targets.items():
+            variant = image.copy()
+            variant.thumbnail((VARIANTS[name], VARIANTS[name]))
+            tmp = f"{path}.tmp"
+            variant.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(tmp, path)
+            created += 1
+    return created
+
+
+class ImageStore:
+    """
+    Lokalny magazyn zdjec adresowany trescia: plik lezy pod root/ab/<sha256>,
+    a warianty obok (<sha256>.cover.webp, <sha256>.thumb.webp), wiec to samo zdjecie
+    z roznych adresow jest zapisane raz. index.json pamieta, jaki hash ma dany adres
+    (zeby nie pobierac go ponownie) oraz ktore hashe sa juz wyslane do Strapi.
+    """
+
+    def __init__(self, root="images"):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        else:
+            index = {}
+        # adres/referencja -> sha256
+        self.sources = index.get("sources", {})
+        # sha256 -> id pliku w bibliotece mediow Strapi
+        self.uploads = index.get("uploads", {})
+        # documentId restauracji -> id pliku ustawionego jako cover
+        self.covers = index.get("covers", {})
+
+    def path(self, digest, variant=None):
+        name = digest if variant is None else f"{digest}.{variant}.webp"
+        return os.path.join(self.root, digest[:2], name)
+
+    def put(self, key, data):
+        """Zapisuje bajty zdjecia pod jego hashem i zapamietuje hash adresu. Zwraca hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self.sources[key] = digest
+        return digest
+
+    def missing_variants(self, digest):
+        return {name: self.path(digest, name) for name in VARIANTS if not os.path.exists(self.path(digest, name))}
+
+    def save(self):
+        with self._lock:
+            index = {"sources": self.sources, "uploads": self.uploads, "covers": self.covers}
+            tmp = f"{self.index_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp, self.index_path)
+
+
+def image_source(record):
+    """Zwraca (klucz, rodzaj) zdjecia rekordu: referencja Google albo adres URL z TripAdvisor."""
+    if record.get("photo"):
+        return f"google:{record['photo']}", "google"
+    if record.get("image"):
+        return record["image"], "url"
+    return None, None
+
+
+class ImagePipeline:
+    """
+    Pobiera zdjecia restauracji do ImageStore, tworzy warianty WebP w puli procesow
+    i ustawia je jako cover restauracji w Strapi. Kazdy etap pomija prace juz wykonana:
+    znane adresy nie sa pobierane, istniejace warianty nie sa generowane, a hash
+    wyslany wczesniej jest podpinany bez ponownego uploadu.
+    """
+
+    def __init__(self, store, google=None, workers=8, processes=None, strapi=None):
+        """
+        google - instancja GooglePlaces do rozwiazywania referencji zdjec (jej limit zapytan)
+        strapi - StrapiImporter, przez ktory wysylane sa zdjecia (None = bez uploadu)
+        """
+        self.store = store
+        self.google = google
+        self.workers = workers
+        self.processes = processes
+        self.strapi = strapi
+        self.stats = Counter()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # sha256 -> blokada uploadu, zeby dwa watki nie wyslaly tego samego zdjecia
+        self._upload_locks = {}
+
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # --- pobieranie ---
+
+    def _download(self, key, kind):
+        try:
+            if kind == "google":
+                if self.google is None:
+                    return key, None, "brak scrapera Google do rozwiazania referencji"
+                data = self.google.fetch_photo(key.split(":", 1)[1])
+            else:
+                response = self.session.get(key, timeout=30)
+                response.raise_for_status()
+                data = response.content
+            return key, self.store.put(key, data), None
+        except Exception as e:
+            return key, None, str(e)
+
+    def download(self, records):
+        """Pobiera zdjecia, ktorych adresow nie ma jeszcze w magazynie."""
+        todo = {}
+        for record in records:
+            key, kind = image_source(record)
+            if key and key not in self.store.sources:
+                todo[key] = kind
+        self.stats["cached"] = sum(1 for r in records if image_source(r)[0] in self.store.sources)
+        self.logger.info(f"Zdjęcia do pobrania: {len(todo)} (w magazynie: {self.stats['cached']})")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for key, digest, error in executor.map(lambda item: self._download(*item), todo.items()):
+                if error:
+                    self.stats["download_failed"] += 1
+                    self.logger.warning(f"Nie udało się pobrać {key[:80]}: {error}")
+                else:
+                    self.stats["downloaded"] += 1
+        self.store.save()
+
+    # --- warianty ---
+
+    def build_variants(self, digests):
+        jobs = [(self.store.path(d), targets) for d in digests if (targets := self.store.missing_variants(d))]
+        if not jobs:
+            return
+        self.logger.info(f"Generowanie wariantów dla {len(jobs)} zdjęć")
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = [executor.submit(make_variants, source, targets) for source, targets in jobs]
+            for (source, _), future in zip(jobs, futures):
+                try:
+                    self.stats["variants"] += future.result()
+                except Exception as e:
+                    self.stats["variants_failed"] += 1
+                    self.logger.warning(f"Nie udało się przetworzyć {source}: {e}")
+
+    # --- upload ---
+
+    def _upload(self, digest):
+        """Wysyla wariant cover do biblioteki mediow Strapi i zwraca id pliku."""
+        with open(self.store.path(digest, "cover"), "rb") as f:
+            response = self.strapi.session.post(
+                f"{self.strapi.api}/upload",
+                files={"files": (f"{digest[:16]}.webp", f, "image/webp")},
+                # Naglowek JSON z sesji importera zepsulby multipart
+                headers={"Content-Type": None},
+                timeout=60,
+            )
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()[0]["id"]
+
+    def _media_id(self, digest):
+        """Zwraca (id pliku w Strapi, czy wyslano teraz); kazdy hash jest wysylany najwyzej raz."""
+        with self.store._lock:
+            lock = self._upload_locks.setdefault(digest, threading.Lock())
+        with lock:
+            media_id = self.store.uploads.get(digest)
+            if media_id is not None:
+                return media_id, False
+            media_id = self._upload(digest)
+            with self.store._lock:
+                self.store.uploads[digest] = media_id
+            return media_id, True
+
+    def _attach(self, document_id, media_id):
+        if self.store.covers.get(document_id) == media_id:
+            return "unchanged"
+        response = self.strapi.session.put(
+            f"{self.strapi.api}/{self.strapi.collection}/{document_id}",
+            json={"data": {"cover": media_id}}, timeout=30,
+        )
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        with self.store._lock:
+            self.store.covers[document_id] = media_id
+        return "attached"
+
+    def _safe_attach(self, document_id, digest):
+        """Zwraca (akcja, czy wyslano zdjecie, blad) - statystyki liczy _collect w watku glownym."""
+        uploaded = False
+        try:
+            media_id, uploaded = self._media_id(digest)
+            return self._attach(document_id, media_id), uploaded, None
+        except Exception as e:
+            return "upload_failed", uploaded, f"{document_id}: {e}"
+
+    def upload(self, records):
+        """Ustawia cover restauracji w Strapi (po place_id); liczba zlecen w locie jest ograniczona."""
+        existing = self.strapi.fetch_existing()
+        todo = {}
+        for record in records:
+            document_id = existing.get(record.get(self.strapi.key_field))
+            digest = self.store.sources.get(image_source(record)[0])
+            if document_id and digest and os.path.exists(self.store.path(digest, "cover")):
+                todo[document_id] = digest
+
+        # Zdjecie wspolne dla kilku restauracji wysylamy raz: najpierw po jednym rekordzie na hash
+        first, rest, seen = [], [], set(self.store.uploads)
+        for document_id, digest in todo.items():
+            (rest if digest in seen else first).append((document_id, digest))
+            seen.add(digest)
+
+        for batch in (first, rest):
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=self.strapi.workers) as executor:
+                for document_id, digest in batch:
+                    pending.append(executor.submit(self._safe_attach, document_id, digest))
+                    while len(pending) > 4 * self.strapi.workers:
+                        self._collect(pending.popleft())
+                while pending:
+                    self._collect(pending.popleft())
+            self.store.save()
+
+    def _collect(self, future):
+        action, uploaded, error = future.result()
+        self.stats[action] += 1
+        self.stats["uploaded"] += uploaded
+        if error:
+            self.logger.warning(f"Błąd uploadu okładki {error}")
+
+    def run(self, records):
+        start = time.perf_counter()
+        records = list(records)
+        self.download(records)
+        digests = {self.store.sources[k] for k in (image_source(r)[0] for r in records) if k in self.store.sources}
+        self.build_variants(sorted(digests))
+        if self.strapi is not None:
+            self.upload(records)
+        self.stats["seconds"] = round(time.perf_counter() - start, 2)
+        return dict(self.stats)
+
@@ -0,0 +1,74 @@
+import json
+import os
+
+
+class JsonlSink:
+    """
+    Strumieniowy zapis rekordow do pliku JSONL (jeden rekord w linii).
+    Co checkpoint_every rekordow plik jest synchronizowany na dysk (fsync),
+    a obok niego zapisywany jest plik .checkpoint ze stanem potrzebnym do
+    wznowienia przerwanego przebiegu (np. next_page_token).
+    """
+
+    def __init__(self, path, checkpoint_every=20, resume=False):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.checkpoint_every = checkpoint_every
+        self.state = {}
+        self.count = 0
+
+        if resume and os.path.exists(path):
+            self._truncate_partial_line()
+            self.count = sum(1 for _ in self.read())
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, encoding="utf-8") as f:
+                    self.state = json.load(f).get("state", {})
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+
+    def _truncate_partial_line(self):
+        """Usuwa niedokonczona ostatnia linie, ktora mogla zostac po przerwaniu zapisu."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                f.truncate(end)
+
+    def write(self, record, **state):
+        """Dopisuje rekord; state to stan wznowienia aktualny po zapisaniu tego rekordu."""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.state.update(state)
+        self.count += 1
+        if self.count % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Synchronizuje dane na dysk i atomowo zapisuje stan wznowienia."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"records": self.count, "state": self.state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def read(self):
+        """Zwraca kolejne rekordy zapisane w pliku."""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def written_ids(self, id_field):
+        return {record.get(id_field) for record in self.read()}
+
+    def close(self, finished=True):
+        """Zamyka plik; po zakonczonym przebiegu plik checkpointu jest usuwany."""
+        self.checkpoint()
+        self._file.close()
+        if finished:
+            os.remove(self.checkpoint_path)
@@ -0,0 +1,201 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# Granice kubelkow histogramu czasu odpowiedzi (w sekundach) dla Prometheusa
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ID_SEGMENT_RE = re.compile(r"^\d+$")
+
+
+def endpoint_label(url):
+    """Sciezka URL bez hosta, z numerycznymi id zastapionymi przez {id} (np. /location/{id}/details)."""
+    path = urlparse(url).path or "/"
+    return "/".join("{id}" if ID_SEGMENT_RE.match(s) else s for s in path.split("/"))
+
+
+def percentile(sorted_values, p):
+    """Percentyl metoda najblizszej rangi z posortowanej listy (None dla pustej)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class _Endpoint:
+    __slots__ = ("latencies", "statuses", "retries", "errors", "bytes")
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = defaultdict(int)
+        self.retries = 0
+        self.errors = 0
+        self.bytes = 0
+
+
+class RunMetrics:
+    """
+    Metryki jednego przebiegu scrapera, zbierane bezpiecznie z wielu watkow:
+    zapytania, czasy odpowiedzi, ponowienia i bajty per endpoint, czas spedzony
+    na czekaniu (limit zapytan, backoff, token strony) oraz liczba rekordow
+    przyjetych i odrzuconych przez normalizacje.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._start = time.perf_counter()
+            self.finished = None
+            self.endpoints = defaultdict(_Endpoint)
+            self.sleeps = defaultdict(float)
+            self.records = defaultdict(int)
+            self.quota = {}
+
+    def record_request(self, url, seconds, status=None, size=0):
+        """Zapisuje jedno zapytanie; status None oznacza blad polaczenia."""
+        with self._lock:
+            endpoint = self.endpoints[endpoint_label(url)]
+            endpoint.latencies.append(seconds)
+            if status is None:
+                endpoint.errors += 1
+            else:
+                endpoint.statuses[status] += 1
+            endpoint.bytes += size
+
+    def record_retry(self, url):
+        with self._lock:
+            self.endpoints[endpoint_label(url)].retries += 1
+
+    def record_sleep(self, reason, seconds):
+        if seconds > 0:
+            with self._lock:
+                self.sleeps[reason] += seconds
+
+    def record_item(self, kept):
+        with self._lock:
+            self.records["kept" if kept else "dropped"] += 1
+
+    def finish(self, quota_used=None, daily_quota=None):
+        with self._lock:
+            self.finished = time.perf_counter()
+            self.quota = {"used_today": quota_used, "daily_quota": daily_quota}
+
+    @property
+    def wall_seconds(self):
+        return (self.finished or time.perf_counter()) - self._start
+
+    def report(self):
+        """Zwraca raport przebiegu jako slownik gotowy do zapisania w JSON."""
+        with self._lock:
+            endpoints = {}
+            network = 0.0
+            for name, e in sorted(self.endpoints.items()):
+                latencies = sorted(e.latencies)
+                network += sum(latencies)
+                endpoints[name] = {
+                    "requests": len(latencies),
+                    "statuses": {str(k): v for k, v in sorted(e.statuses.items())},
+                    "connection_errors": e.errors,
+                    "retries": e.retries,
+                    "bytes": e.bytes,
+                    "latency_ms": {
+                        f"p{p}": round(percentile(latencies, p) * 1000, 1) if latencies else None
+                        for p in (50, 95, 99)
+                    },
+                }
+            return {
+                "source": self.source,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "wall_seconds": round(self.wall_seconds, 3),
+                # Suma czasow zapytan - przy wielu watkach moze przekroczyc wall_seconds
+                "network_seconds": round(network, 3),
+                "sleep_seconds": {k: round(v, 3) for k, v in sorted(self.sleeps.items())},
+                "records": {"kept": self.records["kept"], "dropped": self.records["dropped"]},
+                "quota": dict(self.quota),
+                "endpoints": endpoints,
+            }
+
+    def prometheus(self):
+        """Zwraca metryki w formacie tekstowym Prometheusa."""
+        source = self.source
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            requests_total = []
+            for name, e in endpoints:
+                statuses = {str(k): v for k, v in sorted(e.statuses.items())}
+                if e.errors:
+                    statuses["error"] = e.errors
+                requests_total.extend(
+                    ({"source": source, "endpoint": name, "status": status}, count)
+                    for status, count in statuses.items()
+                )
+            metric("scraper_requests_total", "counter", "Liczba zapytan HTTP", requests_total)
+            metric("scraper_retries_total", "counter", "Liczba ponowionych zapytan", [
+                ({"source": source, "endpoint": name}, e.retries) for name, e in endpoints
+            ])
+            metric("scraper_response_bytes_total", "counter", "Bajty pobrane z API", [
+                ({"source": source, "endpoint": name}, e.bytes) for name, e in endpoints
+            ])
+
+            histogram = []
+            for name, e in endpoints:
+                labels = {"source": source, "endpoint": name}
+                for bound in LATENCY_BUCKETS:
+                    count = sum(1 for v in e.latencies if v <= bound)
+                    histogram.append(({**labels, "le": str(bound)}, count))
+                histogram.append(({**labels, "le": "+Inf"}, len(e.latencies)))
+            lines.append("# HELP scraper_request_duration_seconds Czas odpowiedzi API")
+            lines.append("# TYPE scraper_request_duration_seconds histogram")
+            for labels, value in histogram:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"scraper_request_duration_seconds_bucket{{{label_text}}} {value}")
+            for name, e in endpoints:
+                label_text = f'source="{source}",endpoint="{name}"'
+                lines.append(f"scraper_request_duration_seconds_sum{{{label_text}}} {sum(e.latencies):.6f}")
+                lines.append(f"scraper_request_duration_seconds_count{{{label_text}}} {len(e.latencies)}")
+
+            metric("scraper_sleep_seconds_total", "counter", "Czas oczekiwania", [
+                ({"source": source, "reason": reason}, f"{seconds:.6f}")
+                for reason, seconds in sorted(self.sleeps.items())
+            ])
+            metric("scraper_records_total", "counter", "Rekordy po walidacji", [
+                ({"source": source, "result": result}, self.records[result]) for result in ("kept", "dropped")
+            ])
+            if self.quota.get("used_today") is not None:
+                metric("scraper_quota_used", "gauge", "Zapytania wykorzystane dzisiaj", [
+                    ({"source": source}, self.quota["used_today"])
+                ])
+        metric("scraper_run_duration_seconds", "gauge", "Czas trwania przebiegu", [
+            ({"source": source}, f"{self.wall_seconds:.3f}")
+        ])
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path, **extra):
+        """Zapisuje raport przebiegu; extra to dodatkowe sekcje (np. statystyki cache)."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.report(), **extra}, f, ensure_ascii=False, indent=4)
+
+    def write_prometheus(self, path):
+        # Zapis atomowy - textfile collector node_exportera nie przeczyta polowy pliku
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
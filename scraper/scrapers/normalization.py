@@ -0,0 +1,225 @@
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime
+
+from scrapers.columnar import record_hash
+
+SCHEMA_PATH = os.path.join(
+    os.path.dirname(__file__), "../../dev/strapi/api/restaurant/content-types/restaurant/schema.json"
+)
+
+# Pole rekordu scrapera -> atrybut restauracji w Strapi
+FIELD_MAP = {
+    "name": "name",
+    "address": "address",
+    "city": "city",
+    "postalCode": "postalCode",
+    "lat": "latitude",
+    "lng": "longitude",
+    "place_id": "place_id",
+}
+# Bez nazwy i adresu rekord jest bezuzyteczny, nawet jesli schemat Strapi ich nie wymaga
+REQUIRED = ("name", "address")
+
+DASHES = r"\-\u2010-\u2015"
+# Czesc adresu z kodem i miastem: "31-019 Kraków" albo "Kraków 31-019". Kod jest dopasowywany
+# luzno (cyfry, spacje, myslniki), zeby bledny kod odrzucila walidacja, a nie zgubil parser.
+POSTAL_CITY_RE = re.compile(rf"^(\d[\d\s{DASHES}]*\d)\s+(\D+?)$")
+CITY_POSTAL_RE = re.compile(rf"^(\D+?)\s+(\d[\d\s{DASHES}]*\d)$")
+# Kod doklejony do ulicy: "Długa 5 31-147 Kraków"
+STREET_POSTAL_RE = re.compile(rf"\s(\d{{2}}[{DASHES}]\d{{3}})(?:\s+(\D+))?$")
+COUNTRY_RE = re.compile(r"(?:^|\s+)(?:polska|poland|pl)$", re.IGNORECASE)
+NON_DIGIT_RE = re.compile(r"\D")
+PHONE_STRIP_RE = re.compile(r"[\s\-(). /]")
+DIGITS_RE = re.compile(r"^\+?\d+$")
+SPACES_RE = re.compile(r"\s+")
+
+
+def content_hash(record):
+    """Stabilny hash pol zapisywanych w Strapi (FIELD_MAP) - zmienia sie tylko, gdy zmienia sie ich tresc."""
+    return record_hash({field: record.get(field) for field in FIELD_MAP}).hex()
+
+
+def parse_address(address):
+    """
+    Rozbiera polski adres ("ul. Floriańska 12, 31-019 Kraków, Polska") na
+    (ulica, kod pocztowy, miasto). Brakujace czesci sa None; kod jest w postaci NN-NNN.
+    """
+    parts = [COUNTRY_RE.sub("", p.strip()) for p in (address or "").split(",")]
+    parts = [p for p in parts if p]
+    if not parts:
+        return None, None, None
+
+    street, postal, city = parts[0], None, None
+    for part in parts[1:]:
+        match = POSTAL_CITY_RE.match(part)
+        if match:
+            postal, city = match.groups()
+            continue
+        match = CITY_POSTAL_RE.match(part)
+        if match:
+            city, postal = match.groups()
+        elif city is None and not any(c.isdigit() for c in part):
+            city = part
+    if postal is None:
+        match = STREET_POSTAL_RE.search(street)
+        if match:
+            postal, city = match.group(1), city or match.group(2)
+    if postal:
+        digits = NON_DIGIT_RE.sub("", postal)
+        postal = f"{digits[:2]}-{digits[2:]}" if len(digits) == 5 else postal
+    return street, postal, city
+
+
+def normalize_phone(phone, country_code="48"):
+    """Zwraca numer w formacie E.164 (+48123456789) albo None, jesli nie da sie go odczytac."""
+    if not phone:
+        return None
+    number = PHONE_STRIP_RE.sub("", str(phone))
+    if number.startswith("00"):
+        number = "+" + number[2:]
+    if not DIGITS_RE.match(number):
+        return None
+    if not number.startswith("+"):
+        # Krajowy numer bez prefiksu (9 cyfr w Polsce, czasem z dawnym zerem na poczatku)
+        number = number.lstrip("0")
+        number = f"+{country_code}{number}" if len(number) == 9 else "+" + number
+    return number if 8 <= len(number) - 1 <= 15 else None
+
+
+def parse_timestamp(value):
+    """Czas ISO 8601 (takze z "Z" ze Strapi) jako datetime ze strefa; czas bez strefy jest lokalny."""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return moment if moment.tzinfo else moment.astimezone()
+
+
+def parse_coordinate(value, limit):
+    """Zamienia wspolrzedna (liczbe albo napis, takze z przecinkiem) na float w zakresie +-limit."""
+    if value is None or value == "":
+        return None, None
+    try:
+        number = float(str(value).replace(",", ".")) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return None, f"niepoprawna wartość {value!r}"
+    if number != number or not -limit <= number <= limit:
+        return None, f"poza zakresem ±{limit}: {value!r}"
+    return number, None
+
+
+class Normalizer:
+    """
+    Normalizacja i walidacja rekordow restauracji zgodna ze schematem Strapi
+    (schema.json: wymagane pola, typy, regex, maxLength). Rekord jest uzupelniany
+    o city i postalCode z adresu, telefon jest zamieniany na E.164, wspolrzedne
+    na liczby, a poprawny rekord dostaje content_hash (hash pol zapisywanych w Strapi).
+    normalize() zwraca (rekord, lista_bledow); rekord z bledami nalezy
+    odrzucic. Statystyki zliczaja bledy (stats) i wyczyszczone pola opcjonalne (cleared)
+    bez logowania kazdego rekordu.
+    """
+
+    def __init__(self, schema_path=SCHEMA_PATH):
+        with open(schema_path, encoding="utf-8") as f:
+            attributes = json.load(f)["attributes"]
+        self.rules = []
+        for field, attribute in FIELD_MAP.items():
+            spec = attributes.get(attribute)
+            if spec is None:
+                continue
+            self.rules.append((
+                field,
+                attribute,
+                spec.get("required", False) or field in REQUIRED,
+                re.compile(spec["regex"]) if spec.get("regex") else None,
+                spec.get("maxLength"),
+            ))
+        self.reset()
+
+    def reset(self):
+        self.stats = Counter()
+        self.cleared = Counter()
+
+    def normalize(self, record):
+        clean = dict(record)
+        errors = []
+
+        for field in ("name", "address"):
+            if isinstance(clean.get(field), str):
+                clean[field] = SPACES_RE.sub(" ", clean[field]).strip()
+
+        _, postal, city = parse_address(clean.get("address"))
+        if postal and not clean.get("postalCode"):
+            clean["postalCode"] = postal
+        if city and not clean.get("city"):
+            clean["city"] = city
+
+        if clean.get("phone"):
+            phone = normalize_phone(clean["phone"])
+            if phone is None:
+                self.cleared["phone"] += 1
+            clean["phone"] = phone
+
+        for field, limit in (("lat", 90), ("lng", 180)):
+            if field in clean:
+                clean[field], error = parse_coordinate(clean[field], limit)
+                if error:
+                    errors.append(f"{field}: {error}")
+
+        for field, attribute, required, regex, max_length in self.rules:
+            value = clean.get(field)
+            if value in (None, ""):
+                if required:
+                    errors.append(f"{field}: brak wartości ({attribute} jest wymagane)")
+                continue
+            if regex is not None and not regex.search(str(value)):
+                errors.append(f"{field}: {value!r} nie pasuje do {regex.pattern}")
+            if max_length and len(str(value)) > max_length:
+                errors.append(f"{field}: dłuższe niż {max_length} znaków")
+
+        for error in errors:
+            self.stats[error.split(":", 1)[0]] += 1
+        if not errors:
+            clean["content_hash"] = content_hash(clean)
+        return clean, errors
+
+    def run(self, records, rejects_path=None, on_reject=None):
+        """
+        Normalizuje rekordy strumieniowo i zwraca poprawne. Odrzucone trafiaja
+        do rejects_path (JSONL z polem reasons); plik powstaje dopiero przy pierwszym odrzuceniu.
+        on_reject(rekord, bledy) - opcjonalne wywolanie dla kazdego odrzuconego rekordu.
+        """
+        rejects = None
+        try:
+            for record in records:
+                clean, errors = self.normalize(record)
+                if not errors:
+                    self.stats["accepted"] += 1
+                    yield clean
+                    continue
+                self.stats["rejected"] += 1
+                if on_reject is not None:
+                    on_reject(record, errors)
+                if rejects_path:
+                    if rejects is None:
+                        rejects = open(rejects_path, "w", encoding="utf-8")
+                    rejects.write(json.dumps({**record, "reasons": errors}, ensure_ascii=False, default=str) + "\n")
+        finally:
+            if rejects is not None:
+                rejects.close()
+
+    def summary(self):
+        """Liczba przyjetych/odrzuconych rekordow, najczestsze powody odrzucenia i wyczyszczone pola."""
+        counts = dict(self.stats)
+        accepted, rejected = counts.pop("accepted", 0), counts.pop("rejected", 0)
+        return {
+            "accepted": accepted,
+            "rejected": rejected,
+            "reasons": dict(Counter(counts).most_common()),
+            "cleared": dict(self.cleared),
+        }
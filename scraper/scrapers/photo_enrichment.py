@@ -0,0 +1,61 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapers.rate_limiter import QuotaExceeded, RateLimiter
+
+
+class PhotoEnricher:
+    """
+    Osobny etap uzupelniajacy zdjecia rekordow TripAdvisor.
+    Zapytania sa wysylane tylko dla rekordow bez pola image, ktorych zdjecia nie ma
+    ani w poprzednim snapshocie, ani w cache. Etap ma wlasny budzet zapytan
+    (limiter "TripAdvisorScraper.photos"), wiec nie spowalnia glownego pobierania,
+    a po wyczerpaniu limitu reszta rekordow czeka na kolejne uruchomienie.
+    """
+
+    def __init__(self, scraper, workers=4, requests_per_second=1, daily_quota=None):
+        self.scraper = scraper
+        self.workers = workers
+        self.limiter = RateLimiter.for_source(
+            f"{scraper.__class__.__name__}.photos", requests_per_second, daily_quota, store=scraper.cache
+        )
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _fetch(self, record):
+        try:
+            return record, self.scraper.get_place_photos(record["source_id"], limiter=self.limiter)
+        except QuotaExceeded:
+            return record, QuotaExceeded
+
+    def enrich(self, records, previous=None):
+        """
+        Uzupelnia pole image w rekordach (w miejscu).
+        previous - rekordy poprzedniego snapshotu, z ktorych zdjecia sa przepisywane bez zapytan.
+        Zwraca slownik z liczba rekordow uzupelnionych z kazdego zrodla.
+        """
+        known = {r.get("source_id"): r.get("image") for r in previous or () if r.get("image")}
+        stats = {"snapshot": 0, "fetched": 0, "missing": 0, "quota_exceeded": 0}
+        todo = []
+        for record in records:
+            if record.get("image") or not record.get("source_id"):
+                continue
+            image = known.get(record["source_id"])
+            if image:
+                record["image"] = image
+                stats["snapshot"] += 1
+            else:
+                todo.append(record)
+
+        self.logger.info(f"Zdjęcia: z poprzedniego snapshotu {stats['snapshot']}, do pobrania {len(todo)}")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for record, image in executor.map(self._fetch, todo):
+                if image is QuotaExceeded:
+                    stats["quota_exceeded"] += 1
+                elif image:
+                    record["image"] = image
+                    stats["fetched"] += 1
+                else:
+                    stats["missing"] += 1
+        if stats["quota_exceeded"]:
+            self.logger.warning(f"Wyczerpano limit zdjęć - pominięto {stats['quota_exceeded']} rekordów")
+        return stats
@@ -0,0 +1,238 @@
+import multiprocessing
+import random
+import threading
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+# Zuzycie jest liczone w pamieci i zapisywane w store co tyle zapytan albo sekund (i przy close)
+QUOTA_FLUSH_EVERY = 100
+QUOTA_FLUSH_SECONDS = 10.0
+
+
+class QuotaExceeded(Exception):
+    """Dzienny limit zapytan dla zrodla zostal wyczerpany."""
+
+
+class RateLimiter:
+    """
+    Ogranicznik zapytan wspoldzielony przez watki jednego zrodla:
+    - requests_per_second - minimalny odstep miedzy kolejnymi zapytaniami
+    - daily_quota - maksymalna liczba zapytan w ciagu doby (None = bez limitu)
+    Dzienny licznik moze byc zapisywany w ResponseCache (persist), wtedy kolejne
+    uruchomienia tego samego dnia kontynuuja zuzycie zamiast zaczynac od zera.
+    Zapis jest zbiorczy (flush), zeby zapytania nie czekaly na SQLite.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, requests_per_second=None, daily_quota=None):
+        self._lock = threading.Lock()
+        self.configure(requests_per_second, daily_quota)
+        self._next_slot = 0.0
+        self._day = date.today()
+        self._used_today = 0
+        self._store = None
+        self._source = None
+        self._pending = None
+
+    @classmethod
+    def for_source(cls, source, requests_per_second=None, daily_quota=None, store=None):
+        """
+        Zwraca wspolny limiter dla zrodla, aby wszystkie instancje scrapera dzielily budzet.
+        Podane limity nadpisuja ustawienia istniejacego limitera.
+        store - ResponseCache, w ktorym jest zapisywane dzienne zuzycie (patrz persist).
+        """
+        with cls._registry_lock:
+            limiter = cls._registry.get(source)
+            if limiter is None:
+                limiter = cls(requests_per_second, daily_quota)
+                cls._registry[source] = limiter
+            else:
+                limiter.configure(requests_per_second, daily_quota)
+        if store is not None and limiter._store is not store:
+            limiter.persist(store, source)
+        return limiter
+
+    @classmethod
+    def register(cls, source, limiter):
+        """Ustawia gotowy limiter dla zrodla (np. SharedRateLimiter w procesie workera)."""
+        with cls._registry_lock:
+            cls._registry[source] = limiter
+
+    def configure(self, requests_per_second=None, daily_quota=None):
+        with self._lock:
+            self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+            self.daily_quota = daily_quota
+
+    def persist(self, store, source):
+        """
+        Wczytuje dzisiejsze zuzycie zrodla ze store i od teraz dopisuje tam zapytania
+        tego procesu (w paczkach, patrz flush). Licznik w pamieci nie maleje -
+        zapytania z biezacego procesu sa juz w store albo czekaja na zapis.
+        """
+        self.flush()
+        # [dzien, liczba zapytan do zapisania, czas ostatniego zapisu]; blokada jest lokalna dla procesu
+        self._pending_lock = threading.Lock()
+        self._pending = [date.today().isoformat(), 0, time.monotonic()]
+        self._store, self._source = store, source
+        store.add_quota_counter(self.flush)
+        self._restore(store.quota_used(source, date.today().isoformat()))
+
+    def _restore(self, used):
+        with self._lock:
+            today = date.today()
+            if today != self._day:
+                self._day = today
+                self._used_today = 0
+            self._used_today = max(self._used_today, used)
+
+    def _record_use(self):
+        if self._store is None:
+            return
+        today = date.today().isoformat()
+        with self._pending_lock:
+            if today != self._pending[0]:
+                self._flush_pending()
+                self._pending[0] = today
+            self._pending[1] += 1
+            if self._pending[1] >= QUOTA_FLUSH_EVERY or time.monotonic() - self._pending[2] >= QUOTA_FLUSH_SECONDS:
+                self._flush_pending()
+
+    def _flush_pending(self):
+        day, count, _ = self._pending
+        if count:
+            self._store.record_quota(self._source, day, count)
+        self._pending[1:] = [0, time.monotonic()]
+
+    def flush(self):
+        """Zapisuje w store zapytania policzone od ostatniego zapisu (wywolywane tez przez ResponseCache.close)."""
+        if self._store is None:
+            return
+        with self._pending_lock:
+            self._flush_pending()
+
+    @property
+    def used_today(self):
+        return self._used_today
+
+    def acquire(self):
+        """
+        Rezerwuje miejsce na jedno zapytanie i czeka na swoja kolej.
+        Zwraca czas (w sekundach) spedzony na czekaniu.
+        """
+        with self._lock:
+            today = date.today()
+            if today != self._day:
+                self._day = today
+                self._used_today = 0
+            if self.daily_quota is not None and self._used_today >= self.daily_quota:
+                raise QuotaExceeded(f"Wyczerpano dzienny limit {self.daily_quota} zapytan")
+            self._used_today += 1
+
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        self._record_use()
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    RateLimiter, ktorego stan (odstep, kolejka i dzienny licznik) lezy w pamieci
+    wspoldzielonej, wiec budzet zrodla jest wspolny dla wielu procesow.
+    Tworzony w procesie glownym i przekazywany do workerow przy ich starcie
+    (np. w initargs ProcessPoolExecutor), gdzie trzeba go zarejestrowac przez register().
+    """
+
+    def __init__(self, requests_per_second=None, daily_quota=None):
+        self._lock = multiprocessing.Lock()
+        self._interval = multiprocessing.Value("d", 0.0, lock=False)
+        self._quota = multiprocessing.Value("q", -1, lock=False)
+        self._next = multiprocessing.Value("d", 0.0, lock=False)
+        self._day_ordinal = multiprocessing.Value("q", date.today().toordinal(), lock=False)
+        self._used = multiprocessing.Value("q", 0, lock=False)
+        # Store jest ustawiany osobno w kazdym procesie (persist po register), nie jest wspoldzielony
+        self._store = None
+        self._source = None
+        self._pending = None
+        self.configure(requests_per_second, daily_quota)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(_store=None, _pending=None, _pending_lock=None)
+        return state
+
+    def configure(self, requests_per_second=None, daily_quota=None):
+        with self._lock:
+            self._interval.value = 1.0 / requests_per_second if requests_per_second else 0.0
+            self._quota.value = -1 if daily_quota is None else daily_quota
+
+    @property
+    def interval(self):
+        return self._interval.value
+
+    @property
+    def daily_quota(self):
+        return None if self._quota.value < 0 else self._quota.value
+
+    @property
+    def used_today(self):
+        return self._used.value
+
+    def _restore(self, used):
+        with self._lock:
+            today = date.today().toordinal()
+            if today != self._day_ordinal.value:
+                self._day_ordinal.value = today
+                self._used.value = 0
+            self._used.value = max(self._used.value, used)
+
+    def acquire(self):
+        # time.monotonic to zegar systemowy, wiec jest porownywalny miedzy procesami
+        with self._lock:
+            today = date.today().toordinal()
+            if today != self._day_ordinal.value:
+                self._day_ordinal.value = today
+                self._used.value = 0
+            if 0 <= self._quota.value <= self._used.value:
+                raise QuotaExceeded(f"Wyczerpano dzienny limit {self._quota.value} zapytan")
+            self._used.value += 1
+
+            now = time.monotonic()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self._interval.value
+
+        self._record_use()
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def backoff_delay(attempt, base=1.0, maximum=30.0):
+    """Wykladnicze opoznienie z pelnym jitterem dla proby o numerze attempt (od 0)."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """Zamienia naglowek Retry-After (sekundy lub data HTTP) na liczbe sekund."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
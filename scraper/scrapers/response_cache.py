@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+DAY = 24 * 60 * 60
+
+# Domyslny czas zycia wpisow (w sekundach) dla poszczegolnych endpointow
+DEFAULT_TTLS = {
+    "details": 7 * DAY,
+    "photos": 30 * DAY,
+}
+
+
+class ResponseCache:
+    """
+    Lokalny cache odpowiedzi API w jednym pliku SQLite.
+    Kluczem jest trojka (zrodlo, endpoint, id). Wpisy starsze niz TTL endpointu
+    sa traktowane jako brak, a po przekroczeniu max_entries usuwane sa
+    najdawniej uzywane wpisy.
+    """
+
+    def __init__(self, path="cache.sqlite3", ttls=None, default_ttl=DAY, max_entries=100_000):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.hits = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # W trybie WAL synchronous=NORMAL jest bezpieczne, a commit nie czeka na fsync
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                source TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (source, endpoint, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        # Dzienne zuzycie limitow zapytan (RateLimiter.persist) - przezywa restart procesu
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                source TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (source, day)
+            )
+            """
+        )
+        self._conn.commit()
+        self._writes = 0
+        self._quota_counters = []
+
+    def get(self, source, endpoint, key):
+        """Zwraca zapisana odpowiedz lub None, jesli jej brak albo jest przeterminowana."""
+        now = time.time()
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at FROM responses WHERE source=? AND endpoint=? AND key=?",
+                (source, endpoint, str(key)),
+            ).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses[endpoint] += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at=? WHERE source=? AND endpoint=? AND key=?",
+                (now, source, endpoint, str(key)),
+            )
+            # Bez commita otwarta transakcja blokowalaby plik innym procesom (run_batch.py)
+            self._conn.commit()
+            self.hits[endpoint] += 1
+        return json.loads(row[0])
+
+    def set(self, source, endpoint, key, value):
+        now = time.time()
+        body = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (source, endpoint, str(key), body, now, now),
+            )
+            self._writes += 1
+            # Eksmisja co pewna liczbe zapisow, zeby nie liczyc wierszy przy kazdym zapisie
+            if self._writes % 500 == 0:
+                self._evict()
+            self._conn.commit()
+
+    def quota_used(self, source, day):
+        """Liczba zapytan zrodla wykonanych w dniu day (data ISO)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM quota_usage WHERE source=? AND day=?", (source, day)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def record_quota(self, source, day, count=1):
+        """Dopisuje count zapytan do zuzycia zrodla (RateLimiter zapisuje je paczkami)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO quota_usage VALUES (?, ?, ?) "
+                "ON CONFLICT (source, day) DO UPDATE SET used = used + excluded.used",
+                (source, day, count),
+            )
+            self._conn.commit()
+
+    def add_quota_counter(self, flush):
+        """Rejestruje funkcje zapisujaca zuzycie liczone w pamieci (RateLimiter.flush)."""
+        self._quota_counters.append(flush)
+
+    def flush_quota(self):
+        """Zapisuje zuzycie ze wszystkich zarejestrowanych limiterow."""
+        for flush in self._quota_counters:
+            flush()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE rowid IN "
+                "(SELECT rowid FROM responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def stats(self):
+        """Statystyki trafien w postaci {endpoint: {"hits": n, "misses": m}}."""
+        endpoints = sorted(set(self.hits) | set(self.misses))
+        return {e: {"hits": self.hits[e], "misses": self.misses[e]} for e in endpoints}
+
+    def close(self):
+        self.flush_quota()
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,84 @@
+import glob
+import json
+import os
+from datetime import datetime
+
+from scrapers.columnar import EXTENSION, ColumnarSnapshot, record_hash, write_columnar
+
+SNAPSHOT_PATTERNS = ("restaurants_*.json", f"restaurants_*{EXTENSION}")
+
+
+def latest_snapshot(directory="."):
+    """Zwraca sciezke do najnowszego pliku restaurants_*.json / .snap lub None."""
+    paths = [p for pattern in SNAPSHOT_PATTERNS for p in glob.glob(os.path.join(directory, pattern))]
+    if not paths:
+        return None
+    # Nazwy zawieraja date w formacie %Y-%m-%d_%H-%M, wiec sortowanie leksykalne wystarcza
+    # (przy tej samej dacie wygrywa .snap)
+    return max(paths)
+
+
+def is_columnar(path):
+    return path.endswith(EXTENSION)
+
+
+def save_snapshot(path, records):
+    """Zapisuje rekordy jako JSON albo w formacie kolumnowym - zaleznie od rozszerzenia."""
+    if is_columnar(path):
+        write_columnar(path, records)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(records), f, ensure_ascii=False, indent=4)
+
+
+def load_snapshot(path):
+    """
+    Wczytuje zapisany wczesniej snapshot (JSON albo .snap).
+    Rekordy bez pola scraped_at dostaja date modyfikacji pliku.
+    """
+    if is_columnar(path):
+        with ColumnarSnapshot(path) as snapshot:
+            records = list(snapshot.records())
+    else:
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+    file_time = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+    for record in records:
+        record.setdefault("scraped_at", file_time)
+    return records
+
+
+def merge_records(previous, fresh, id_field):
+    """
+    Laczy poprzedni zbior z nowo pobranymi rekordami.
+    Rekordy o tym samym id sa zastepowane w miejscu, nowe trafiaja na koniec.
+    """
+    merged = {}
+    for record in previous:
+        merged[record.get(id_field)] = record
+    for record in fresh:
+        merged[record.get(id_field)] = record
+    return list(merged.values())
+
+
+def snapshot_index(path, id_field):
+    """
+    Zwraca {id: hash tresci} rekordow snapshotu. Dla .snap czytana jest tylko kolumna id
+    i zapisane hashe, bez odtwarzania rekordow.
+    """
+    if is_columnar(path):
+        with ColumnarSnapshot(path) as snapshot:
+            return dict(zip(snapshot.column(id_field), snapshot.hashes()))
+    with open(path, encoding="utf-8") as f:
+        return {r.get(id_field): record_hash(r) for r in json.load(f)}
+
+
+def diff_snapshots(old_path, new_path, id_field):
+    """Porownuje dwa snapshoty; zwraca listy id dodanych, usunietych i zmienionych rekordow."""
+    old = snapshot_index(old_path, id_field)
+    new = snapshot_index(new_path, id_field)
+    return {
+        "added": [k for k in new if k not in old],
+        "removed": [k for k in old if k not in new],
+        "changed": [k for k, h in new.items() if k in old and old[k] != h],
+    }
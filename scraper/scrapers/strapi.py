@@ -0,0 +1,365 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scrapers.normalization import Normalizer, content_hash, parse_address, parse_timestamp
+
+SYNC_STATE_PATH = "strapi_sync_state.json"
+# Niezmieniony rekord dostaje nowy scraped_at w Strapi najwyzej raz na tyle - wystarczy
+# dla trybu przyrostowego (--from-strapi, domyslnie 30 dni), a sync nie wysyla PUT dla kazdego rekordu
+SCRAPED_AT_REFRESH = timedelta(days=7)
+
+
+def load_env():
+    """Laduje .env.local z katalogu glownego projektu."""
+    load_dotenv(os.path.join(os.path.dirname(__file__), "../../.env.local"))
+
+
+def iter_records(path):
+    """Zwraca rekordy z pliku JSONL (strumieniowo) albo z tablicy JSON."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def restaurant_payload(record):
+    """Zamienia rekord scrapera (po normalizacji) na pola restauracji w Strapi."""
+    address = record.get("address") or ""
+    scraped_at = parse_timestamp(record.get("scraped_at"))
+    city, postal_code = record.get("city"), record.get("postalCode")
+    if city is None and postal_code is None:
+        _, postal_code, city = parse_address(address)
+    return {
+        "name": record.get("name"),
+        "address": address,
+        "city": city,
+        "postalCode": postal_code,
+        "latitude": record.get("lat"),
+        "longitude": record.get("lng"),
+        "place_id": record.get("place_id"),
+        "scraped_at": scraped_at.astimezone(timezone.utc).isoformat() if scraped_at else None,
+    }
+
+
+class WriteSafeRetry(Retry):
+    """
+    Retry, ktory ponawia POST tylko po 429 (i bledach polaczenia - zapytanie nie dotarlo).
+    5xx albo timeout odczytu moga przyjsc juz po zapisie w Strapi, a ponowny POST
+    utworzylby duplikat restauracji. GET i PUT sa idempotentne i ponawiane jak zwykle.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == "POST":
+            return status_code == 429 and bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def scraped_at_due(entry, record):
+    """Czy scraped_at w Strapi jest starszy od rekordu o co najmniej SCRAPED_AT_REFRESH."""
+    sent, scraped = parse_timestamp(entry.get("scraped_at")), parse_timestamp(record.get("scraped_at"))
+    return scraped is not None and (sent is None or scraped - sent >= SCRAPED_AT_REFRESH)
+
+
+def field_hashes(payload):
+    """Krotki hash kazdego pola payloadu - pozwala wyslac tylko pola, ktore sie zmienily."""
+    return {
+        field: hashlib.blake2b(json.dumps(value, ensure_ascii=False).encode("utf-8"), digest_size=6).hexdigest()
+        for field, value in payload.items()
+    }
+
+
+class StrapiImporter:
+    """
+    Wspolbiezny import restauracji do Strapi z upsertem po place_id.
+    Istniejace place_id sa pobierane jednym stronicowanym zapytaniem przed importem,
+    wiec ponowne uruchomienie aktualizuje rekordy zamiast tworzyc duplikaty.
+    sync() wysyla tylko zmiany wzgledem stanu ostatniej synchronizacji.
+    """
+
+    collection = "restaurants"
+    key_field = "place_id"
+
+    def __init__(self, base_url=None, token=None, workers=8, page_size=100):
+        load_env()
+        base_url = base_url or os.environ["NEXT_PUBLIC_STRAPI_URL"]
+        self.api = base_url.rstrip("/") + "/api"
+        self.workers = workers
+        self.page_size = page_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.session = requests.Session()
+        retry = WriteSafeRetry(
+            total=4,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {token or os.environ['STRAPI_KEY']}",
+            "Content-Type": "application/json",
+        })
+
+    def fetch_existing(self):
+        """Zwraca slownik {place_id: documentId} dla restauracji zapisanych w Strapi."""
+        existing = {}
+        page = 1
+        while True:
+            params = {
+                "fields[0]": self.key_field,
+                "fields[1]": "documentId",
+                f"filters[{self.key_field}][$notNull]": "true",
+                # Wersje robocze obejmuja tez restauracje wycofane z publikacji
+                "status": "draft",
+                "pagination[page]": page,
+                "pagination[pageSize]": self.page_size,
+            }
+            response = self.session.get(f"{self.api}/{self.collection}", params=params, timeout=30)
+            response.raise_for_status()
+            body = response.json()
+            for row in body["data"]:
+                existing[row[self.key_field]] = row["documentId"]
+            if page >= body["meta"]["pagination"]["pageCount"]:
+                return existing
+            page += 1
+
+    def upsert(self, record, existing):
+        """Tworzy lub aktualizuje jeden rekord. Zwraca "created" albo "updated"."""
+        payload = restaurant_payload(record)
+        document_id = existing.get(payload[self.key_field])
+        if document_id:
+            response = self.session.put(
+                f"{self.api}/{self.collection}/{document_id}", json={"data": payload}, timeout=30
+            )
+            action = "updated"
+        else:
+            payload["avg_rating"] = 0
+            response = self.session.post(
+                f"{self.api}/{self.collection}", json={"data": payload}, timeout=30
+            )
+            action = "created"
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return action
+
+    def _safe_upsert(self, record, existing):
+        try:
+            return record, self.upsert(record, existing), None
+        except Exception as e:
+            return record, "failed", str(e)
+
+    def run(self, records, retry_path="import_failed.jsonl", rejects_path="import_rejected.jsonl"):
+        """
+        Importuje rekordy z iteratora, trzymajac w pamieci tylko ograniczona liczbe zlecen.
+        Rekordy sa najpierw normalizowane wg schematu restauracji - niepoprawne (np. zly
+        kod pocztowy) trafiaja do rejects_path z powodami zamiast konczyc sie bledem 400.
+        Rekordy, ktorych nie udalo sie zapisac, trafiaja do retry_path (JSONL, z polem error),
+        ktory mozna podac jako wejscie kolejnego importu.
+        Zwraca slownik z podsumowaniem.
+        """
+        start = time.perf_counter()
+        existing = self.fetch_existing()
+        self.logger.info(f"W Strapi jest {len(existing)} restauracji z {self.key_field}")
+
+        summary = {"created": 0, "updated": 0, "failed": 0, "skipped": 0, "rejected": 0}
+        normalizer = Normalizer()
+        seen = set()
+        pending = deque()
+        with open(retry_path, "w", encoding="utf-8") as retry_file, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+
+            def collect(future):
+                record, action, error = future.result()
+                summary[action] += 1
+                if error:
+                    self.logger.warning(f"Błąd importu {record.get('name')}: {error}")
+                    retry_file.write(json.dumps({**record, "error": error}, ensure_ascii=False) + "\n")
+
+            for record in normalizer.run(records, rejects_path):
+                key = record.get(self.key_field)
+                # Bez klucza nie da sie zrobic upsertu, a powtorzony klucz dalby duplikat
+                if not key or key in seen:
+                    summary["skipped"] += 1
+                    continue
+                seen.add(key)
+                pending.append(executor.submit(self._safe_upsert, record, existing))
+                while len(pending) > 4 * self.workers:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+
+        if not summary["failed"]:
+            os.remove(retry_path)
+        summary["rejected"] = normalizer.stats["rejected"]
+        elapsed = time.perf_counter() - start
+        done = summary["created"] + summary["updated"]
+        summary["seconds"] = round(elapsed, 2)
+        summary["per_second"] = round(done / elapsed, 1) if elapsed else 0.0
+        return summary
+
+    # --- synchronizacja przyrostowa ---
+
+    def load_sync_state(self, path):
+        """Stan ostatniej synchronizacji: {place_id: {documentId, hash, fields, unpublished}}."""
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_sync_state(self, path, state):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _send(self, method, path, data=None):
+        response = self.session.request(
+            method, f"{self.api}/{path}", json=None if data is None else {"data": data}, timeout=30
+        )
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json() if response.content else {}
+
+    def _sync_record(self, key, record, digest, entry):
+        """
+        Tworzy restauracje albo wysyla PUT tylko ze zmienionymi polami (Strapi aktualizuje
+        wylacznie pola obecne w data). Wycofana wczesniej restauracja dostaje pelny payload
+        i jest publikowana ponownie. Zwraca (klucz, akcja, nowy_wpis_stanu, wyslane_pola, blad).
+        """
+        payload = restaurant_payload(record)
+        fields = field_hashes(payload)
+        try:
+            if entry is None:
+                body = self._send("POST", self.collection, {**payload, "avg_rating": 0})
+                document_id, action, changed = body["data"]["documentId"], "created", payload
+            else:
+                document_id = entry["documentId"]
+                if entry.get("unpublished"):
+                    action, changed = "republished", payload
+                else:
+                    old = entry.get("fields", {})
+                    action = "patched"
+                    changed = {field: value for field, value in payload.items() if old.get(field) != fields[field]}
+                if changed:
+                    self._send("PUT", f"{self.collection}/{document_id}", changed)
+                else:
+                    action = "unchanged"
+        except Exception as e:
+            return key, "failed", None, (), str(e)
+        entry = {"documentId": document_id, "hash": digest, "fields": fields, "scraped_at": payload["scraped_at"]}
+        return key, action, entry, tuple(changed), None
+
+    def _unpublish(self, key, entry):
+        """Wycofuje z publikacji restauracje, ktorej nie ma juz w danych (custom route w Strapi)."""
+        try:
+            self._send("POST", f"{self.collection}/{entry['documentId']}/unpublish")
+        except Exception as e:
+            # Restauracja usunieta recznie w panelu - nie ma czego wycofywac
+            if not str(e).startswith("HTTP 404"):
+                return key, "failed", None, (), str(e)
+        return key, "unpublished", {**entry, "unpublished": True}, (), None
+
+    def sync(self, records, state_path=SYNC_STATE_PATH, retry_path="import_failed.jsonl",
+             rejects_path="import_rejected.jsonl", unpublish_missing=False):
+        """
+        Synchronizacja przyrostowa: rekord jest porownywany po content_hash z ostatnio
+        wyslanym stanem (state_path), wiec do Strapi trafiaja tylko nowe restauracje
+        (POST) i zmienione pola (PUT z czescia pol). Przy unpublish_missing restauracje,
+        ktorych place_id zniknal z danych, sa wycofywane z publikacji (draftAndPublish).
+        Bez zapisanego stanu documentId sa pobierane ze Strapi, a pierwsza synchronizacja
+        wysyla pelne rekordy. Zwraca slownik z podsumowaniem.
+        """
+        start = time.perf_counter()
+        state = self.load_sync_state(state_path)
+        if not state:
+            state = {key: {"documentId": document_id} for key, document_id in self.fetch_existing().items()}
+            self.logger.info(f"Brak stanu synchronizacji - w Strapi jest {len(state)} restauracji")
+
+        summary = {
+            "created": 0, "patched": 0, "republished": 0, "unchanged": 0,
+            "unpublished": 0, "failed": 0, "skipped": 0, "rejected": 0,
+        }
+        fields_sent = Counter()
+        normalizer = Normalizer()
+        seen = set()
+        # Odrzucone przez walidacje wciaz sa w danych - nie wolno ich wycofac z publikacji
+        rejected = set()
+        pending = deque()
+        try:
+            with open(retry_path, "w", encoding="utf-8") as retry_file, \
+                    ThreadPoolExecutor(max_workers=self.workers) as executor:
+
+                def collect(item):
+                    record, future = item
+                    key, action, entry, sent, error = future.result()
+                    summary[action] += 1
+                    if error:
+                        self.logger.warning(f"Błąd synchronizacji {key}: {error}")
+                        if record is not None:
+                            retry_file.write(json.dumps({**record, "error": error}, ensure_ascii=False) + "\n")
+                        return
+                    state[key] = entry
+                    if action == "patched":
+                        fields_sent.update(sent)
+
+                def submit(record, fn, *args):
+                    pending.append((record, executor.submit(fn, *args)))
+                    while len(pending) > 4 * self.workers:
+                        collect(pending.popleft())
+
+                def on_reject(record, errors):
+                    if record.get(self.key_field):
+                        rejected.add(record[self.key_field])
+
+                for record in normalizer.run(records, rejects_path, on_reject):
+                    key = record.get(self.key_field)
+                    if not key or key in seen:
+                        summary["skipped"] += 1
+                        continue
+                    seen.add(key)
+                    digest = record.get("content_hash") or content_hash(record)
+                    entry = state.get(key)
+                    if entry and entry.get("hash") == digest and not entry.get("unpublished") \
+                            and not scraped_at_due(entry, record):
+                        summary["unchanged"] += 1
+                        continue
+                    submit(record, self._sync_record, key, record, digest, entry)
+
+                # Pusty zbior wejsciowy wycofalby wszystko - to prawie na pewno blad, a nie zamkniecie lokali
+                if unpublish_missing and seen:
+                    for key, entry in list(state.items()):
+                        if key not in seen and key not in rejected and not entry.get("unpublished"):
+                            submit(None, self._unpublish, key, entry)
+                while pending:
+                    collect(pending.popleft())
+        finally:
+            self.save_sync_state(state_path, state)
+
+        if not summary["failed"]:
+            os.remove(retry_path)
+        summary["rejected"] = normalizer.stats["rejected"]
+        summary["fields"] = dict(fields_sent.most_common())
+        elapsed = time.perf_counter() - start
+        writes = summary["created"] + summary["patched"] + summary["republished"] + summary["unpublished"]
+        summary["writes"] = writes
+        summary["seconds"] = round(elapsed, 2)
+        summary["per_second"] = round((writes + summary["unchanged"]) / elapsed, 1) if elapsed else 0.0
+        return summary
@@ -0,0 +1,85 @@
+import math
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+EARTH_RADIUS_M = 6_371_000
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Odleglosc w metrach miedzy dwoma punktami na kuli ziemskiej."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class BoundingBox(namedtuple("BoundingBox", "south west north east")):
+    """Prostokat wspolrzednych geograficznych (stopnie)."""
+
+    @classmethod
+    def parse(cls, text):
+        """Tworzy prostokat z napisu 'south,west,north,east'."""
+        return cls(*(float(x) for x in text.split(",")))
+
+    @property
+    def center(self):
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    @property
+    def radius_m(self):
+        """Promien okregu opisanego na prostokacie - tyle obejmuje zapytanie o kafelek."""
+        lat, lng = self.center
+        return haversine_m(lat, lng, self.north, self.east)
+
+    def split(self):
+        """Dzieli prostokat na cztery cwiartki."""
+        lat, lng = self.center
+        return [
+            BoundingBox(self.south, self.west, lat, lng),
+            BoundingBox(self.south, lng, lat, self.east),
+            BoundingBox(lat, self.west, self.north, lng),
+            BoundingBox(lat, lng, self.north, self.east),
+        ]
+
+
+class TilePlanner:
+    """
+    Adaptacyjny podzial obszaru na kafelki.
+    Kazdy kafelek jest przeszukiwany osobno; jesli zwroci pelny zestaw wynikow
+    (capacity - limit API), prawdopodobnie ucina czesc miejsc i zostaje podzielony
+    na cztery mniejsze. Kafelki sa przeszukiwane rownolegle, a wyniki deduplikowane
+    po place_id w trakcie pobierania.
+    """
+
+    def __init__(self, search, max_workers=4, capacity=60, min_radius_m=150):
+        """search - funkcja (BoundingBox) -> lista wynikow dla kafelka"""
+        self.search = search
+        self.max_workers = max_workers
+        self.capacity = capacity
+        self.min_radius_m = min_radius_m
+        self.tiles_searched = 0
+        self.tiles_split = 0
+
+    def iter_results(self, bounds):
+        """Zwraca unikalne wyniki z calego obszaru, w miare konczenia kolejnych kafelkow."""
+        seen = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self.search, bounds): bounds}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tile = pending.pop(future)
+                    results = future.result()
+                    self.tiles_searched += 1
+
+                    if len(results) >= self.capacity and tile.radius_m > self.min_radius_m:
+                        self.tiles_split += 1
+                        for sub in tile.split():
+                            pending[executor.submit(self.search, sub)] = sub
+
+                    for result in results:
+                        place_id = result.get("place_id")
+                        if place_id and place_id not in seen:
+                            seen.add(place_id)
+                            yield result
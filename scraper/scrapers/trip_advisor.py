@@ -1,9 +1,12 @@
 import os
 import requests
-import time
 from scrapers.base_scraper import BaseScraper
+from scrapers.rate_limiter import QuotaExceeded
 
 class TripAdvisorScraper(BaseScraper):
+    requests_per_second = 2
+    base_url = "https://api.content.tripadvisor.com"
+    id_field = "source_id"
     def fetch_data(self, query='restaurants in Krakow'):
         """
         Wyszukuje miejsca pasujące do zapytania.
@@ -17,7 +20,7 @@ class TripAdvisorScraper(BaseScraper):
             )
 
         # Endpoint wyszukiwania
-        url = "https://api.content.tripadvisor.com/api/v1/location/search"
+        url = f"{self.base_url}/api/v1/location/search"
         
         # Parametry zapytania
         params = {
@@ -32,8 +35,7 @@ class TripAdvisorScraper(BaseScraper):
 
         try:
             self.logger.info(f"Wysyłanie zapytania do TripAdvisor API: {query}")
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = self.request(url, params=params, headers=headers, timeout=10)
             data = response.json()
             
             # TripAdvisor zwraca listę w kluczu 'data'
@@ -49,7 +51,7 @@ class TripAdvisorScraper(BaseScraper):
         TripAdvisor API details endpoint: /api/v1/location/{locationId}/details
         """
         api_key = os.environ.get("TRIPADVISOR_API_KEY")
-        url = f"https://api.content.tripadvisor.com/api/v1/location/{location_id}/details"
+        url = f"{self.base_url}/api/v1/location/{location_id}/details"
         
         params = {
             "key": api_key,
@@ -59,46 +61,68 @@ class TripAdvisorScraper(BaseScraper):
         headers = {"accept": "application/json"}
 
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self.cached(
+                "details",
+                location_id,
+                lambda: self.request(url, params=params, headers=headers, timeout=10).json(),
+            )
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Błąd podczas pobierania szczegółów dla ID {location_id}: {e}")
             return None
 
-    def get_place_photos(self, location_id):
+    def get_place_photos(self, location_id, limiter=None):
         """
         TripAdvisor często oddziela zdjęcia od szczegółów.
         Endpoint: /api/v1/location/{locationId}/photos
+        Wywoływane tylko w osobnym etapie (PhotoEnricher) - limiter pozwala mu
+        korzystać z własnego budżetu zapytań.
         """
         api_key = os.environ.get("TRIPADVISOR_API_KEY")
-        url = f"https://api.content.tripadvisor.com/api/v1/location/{location_id}/photos"
+        url = f"{self.base_url}/api/v1/location/{location_id}/photos"
         params = {"key": api_key, "limit": 1}
         headers = {"accept": "application/json"}
 
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=5)
-            if response.status_code == 200:
-                photos_data = response.json()
-                if "data" in photos_data and len(photos_data["data"]) > 0:
-                    # Pobieramy URL zdjęcia w dużej rozdzielczości (original lub large)
-                    images = photos_data["data"][0].get("images", {})
-                    return images.get("large", {}).get("url")
-            return None
+            photos_data = self.cached(
+                "photos",
+                location_id,
+                lambda: self.request(url, params=params, headers=headers, timeout=5, limiter=limiter).json(),
+            )
+            return self.photo_url(photos_data)
+        except QuotaExceeded:
+            raise
         except Exception:
             return None
 
+    def cached_photo(self, location_id):
+        """Zwraca URL zdjęcia, jeśli jest już w cache - bez zapytania do API."""
+        if self.cache is None or self.refresh:
+            return None
+        return self.photo_url(self.cache.get(self.__class__.__name__, "photos", location_id))
+
+    @staticmethod
+    def photo_url(photos_data):
+        if photos_data and photos_data.get("data"):
+            # Pobieramy URL zdjęcia w dużej rozdzielczości (original lub large)
+            images = photos_data["data"][0].get("images", {})
+            return images.get("large", {}).get("url")
+        return None
+
     def parse_data(self, raw_data):
+        return list(self.iter_parsed(raw_data))
+
+    def iter_parsed(self, raw_data):
         if not raw_data:
             self.logger.warning("Brak danych wejściowych.")
-            return []
+            return
 
         results = raw_data.get("results", [])
         if not results:
             self.logger.warning("Brak wyników wyszukiwania.")
-            return []
+            return
 
-        parsed_list = []
+        results = self.skip_known(results, "location_id")
+        count = 0
         total = len(results)
         self.logger.info(f"Znaleziono {total} miejsc. Rozpoczynam pobieranie szczegółów...")
 
@@ -112,8 +136,9 @@ class TripAdvisorScraper(BaseScraper):
             if not details:
                 continue
 
-            # 2. Pobierz zdjęcie (opcjonalnie - dodatkowy request zużywa limit API !)
-            photo_url = self.get_place_photos(location_id)
+            # 2. Zdjęcie tylko z cache - brakujące uzupełnia osobny etap (PhotoEnricher),
+            # bo dodatkowy request na każde miejsce podwaja zużycie limitu API
+            photo_url = self.cached_photo(location_id)
 
             # 3. Parsowanie adresu
             address_obj = details.get("address_obj", {})
@@ -139,11 +164,8 @@ class TripAdvisorScraper(BaseScraper):
                 'image': photo_url
             }
 
-            parsed_list.append(restaurant_dict)
+            count += 1
             self.logger.debug(f"[{i}/{total}] Przetworzono: {restaurant_dict.get('name')}")
-            
-            # Opóźnienie, aby nie przekroczyć limitów (Rate Limiting)
-            time.sleep(0.5)
+            yield restaurant_dict
 
-        self.logger.info(f"Zakończono. Przetworzono {len(parsed_list)} restauracji.")
-        return parsed_list
\ No newline at end of file
+        self.logger.info(f"Zakończono. Przetworzono {count} restauracji.")
\ No newline at end of file
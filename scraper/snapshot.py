@@ -0,0 +1,46 @@
+import argparse
+import json
+import time
+
+from scrapers.columnar import ColumnarSnapshot
+from scrapers.snapshots import diff_snapshots, is_columnar, load_snapshot, save_snapshot
+
+
+parser = argparse.ArgumentParser(description="Konwersja, podglad i porownanie snapshotow restauracji")
+commands = parser.add_subparsers(dest="command", required=True)
+
+convert = commands.add_parser("convert", help="konwertuje snapshot (format wg rozszerzenia: .json / .snap)")
+convert.add_argument("input")
+convert.add_argument("output")
+
+info = commands.add_parser("info", help="wypisuje kolumny i liczbe rekordow snapshotu .snap")
+info.add_argument("input")
+
+diff = commands.add_parser("diff", help="porownuje dwa snapshoty po id")
+diff.add_argument("old")
+diff.add_argument("new")
+diff.add_argument("--id-field", default="place_id")
+diff.add_argument("--ids", action="store_true", help="wypisuje tez id zmienionych rekordow (JSON)")
+args = parser.parse_args()
+
+start = time.perf_counter()
+if args.command == "convert":
+    records = load_snapshot(args.input)
+    save_snapshot(args.output, records)
+    print(f"✅ Zapisano {len(records)} rekordów do {args.output} ({time.perf_counter() - start:.2f}s)")
+
+elif args.command == "info":
+    if not is_columnar(args.input):
+        parser.error("info obsługuje tylko pliki .snap")
+    with ColumnarSnapshot(args.input) as snapshot:
+        print(f"Rekordy: {len(snapshot)}")
+        for name, column in snapshot.schema.items():
+            print(f"  {name:<16} {column['type']:<5} {column['values'][1]:>10} B")
+
+else:
+    result = diff_snapshots(args.old, args.new, args.id_field)
+    elapsed = time.perf_counter() - start
+    print(f"➕ Dodane: {len(result['added'])}, ➖ usunięte: {len(result['removed'])}, "
+          f"🔄 zmienione: {len(result['changed'])} ({elapsed * 1000:.0f} ms)")
+    if args.ids:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
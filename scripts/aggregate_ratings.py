@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Przelicza srednie oceny na podstawie opinii:
+- dishes.rating i restaurants.avg_rating z /reviews
+- attributes.rating z /review-details
+
+Stan (biezace sumy i liczniki, wklad kazdej opinii oraz znacznik czasu ostatnio
+przetworzonej opinii) jest zapisywany w pliku, wiec kolejne uruchomienia czytaja
+tylko nowe lub zmienione opinie (oraz liste documentId, by odjac wklad usunietych),
+a do Strapi wysylane sa tylko oceny, ktore sie zmienily.
+
+Uzycie: python aggregate_ratings.py [--state ratings_state.json] [--full]
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from strapi_client import StrapiClient
+
+parser = argparse.ArgumentParser(description="Przelicza srednie oceny dan, restauracji i atrybutow")
+parser.add_argument("--state", default=str(Path(__file__).parent / "ratings_state.json"))
+parser.add_argument("--full", action="store_true", help="ignoruje zapisany stan i liczy wszystko od nowa")
+parser.add_argument("--workers", type=int, default=8, help="liczba rownoleglych zapisow")
+args = parser.parse_args()
+
+client = StrapiClient(pool_size=args.workers)
+
+
+def load_state(path):
+    if args.full or not os.path.exists(path):
+        return {
+            "watermark": None,
+            "details_watermark": None,
+            "reviews": {},
+            "details": {},
+            "sums": {},
+            "written": {},
+        }
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def changed_since(watermark, populate):
+    # $gte zamiast $gt: opinie z tym samym znacznikiem czasu sa przeliczane ponownie,
+    # co jest bezpieczne, bo wklad kazdej opinii jest zapamietany pod jej documentId
+    return {
+        "fields": ["rating", "updatedAt"],
+        "populate": populate,
+        "filters": {"updatedAt": {"$gte": watermark}} if watermark else None,
+        "sort": ["updatedAt:asc", "id:asc"],
+    }
+
+
+def relation_id(entry, name):
+    related = entry.get(name)
+    return related.get("documentId") if related else None
+
+
+def add(sums, key, rating, sign):
+    """Dodaje (sign=1) lub odejmuje (sign=-1) ocene z biezacej sumy i licznika klucza."""
+    if key and rating is not None:
+        total = sums.setdefault(key, [0.0, 0])
+        total[0] += sign * float(rating)
+        total[1] += sign
+
+
+def sync_reviews(state):
+    """
+    Przetwarza nowe/zmienione opinie. Zapamietany wklad opinii ({review: [dish, restaurant, rating]})
+    jest najpierw odejmowany od sum, wiec zmiana oceny zastepuje poprzednia wartosc.
+    """
+    query = changed_since(state["watermark"], {
+        "dish": {"fields": ["documentId"], "populate": {"restaurant": {"fields": ["documentId"]}}},
+    })
+    dishes = state["sums"].setdefault("dishes", {})
+    restaurants = state["sums"].setdefault("restaurants", {})
+    count = 0
+    for review in client.iter("reviews", **query):
+        old = state["reviews"].get(review["documentId"])
+        if old:
+            add(dishes, old[0], old[2], -1)
+            add(restaurants, old[1], old[2], -1)
+        dish = review.get("dish") or {}
+        new = [dish.get("documentId"), relation_id(dish, "restaurant"), review.get("rating")]
+        add(dishes, new[0], new[2], 1)
+        add(restaurants, new[1], new[2], 1)
+        state["reviews"][review["documentId"]] = new
+        state["watermark"] = max(state["watermark"] or "", review["updatedAt"])
+        count += 1
+    return count
+
+
+def sync_details(state):
+    """Jak sync_reviews, dla szczegolow opinii ({detail: [attribute, rating]})."""
+    query = changed_since(state["details_watermark"], {"attribute": {"fields": ["documentId"]}})
+    attributes = state["sums"].setdefault("attributes", {})
+    count = 0
+    for detail in client.iter("review-details", **query):
+        old = state["details"].get(detail["documentId"])
+        if old:
+            add(attributes, old[0], old[1], -1)
+        new = [relation_id(detail, "attribute"), detail.get("rating")]
+        add(attributes, new[0], new[1], 1)
+        state["details"][detail["documentId"]] = new
+        state["details_watermark"] = max(state["details_watermark"] or "", detail["updatedAt"])
+        count += 1
+    return count
+
+
+def drop_deleted(state):
+    """
+    Odejmuje wklad opinii i szczegolow usunietych ze Strapi (watermark ich nie widzi).
+    Lista obecnych documentId jest lekka - bez relacji i pol.
+    """
+    dishes = state["sums"].setdefault("dishes", {})
+    restaurants = state["sums"].setdefault("restaurants", {})
+    attributes = state["sums"].setdefault("attributes", {})
+    present = {r["documentId"] for r in client.iter("reviews", fields=["documentId"])}
+    removed = 0
+    for review_id in set(state["reviews"]) - present:
+        dish, restaurant, rating = state["reviews"].pop(review_id)
+        add(dishes, dish, rating, -1)
+        add(restaurants, restaurant, rating, -1)
+        removed += 1
+    present = {d["documentId"] for d in client.iter("review-details", fields=["documentId"])}
+    for detail_id in set(state["details"]) - present:
+        attribute, rating = state["details"].pop(detail_id)
+        add(attributes, attribute, rating, -1)
+        removed += 1
+    return removed
+
+
+def averages(sums):
+    # Klucz bez opinii (wszystkie usuniete) dostaje None, zeby wyczyscic ocene w Strapi
+    return {key: round(total / count, 2) if count > 0 else None for key, (total, count) in sums.items()}
+
+
+def write_changed(collection, field, values, written):
+    """Wysyla (rownolegle) tylko oceny rozne od ostatnio zapisanych."""
+    changed = {k: v for k, v in values.items() if written.get(k) != v}
+
+    def put(item):
+        document_id, value = item
+        r = client.update(collection, document_id, {field: value})
+        return document_id, value, r.status_code in (200, 201)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for document_id, value, ok in executor.map(put, changed.items()):
+            if ok:
+                written[document_id] = value
+            else:
+                failed += 1
+    print(f"  {collection}.{field}: zmienionych {len(changed)}, błędów {failed}")
+
+
+state = load_state(args.state)
+print(f"API: {client.api}")
+print(f"Znacznik czasu: {state['watermark'] or 'brak (pełne przeliczenie)'}")
+
+new_reviews = sync_reviews(state)
+new_details = sync_details(state)
+deleted = drop_deleted(state)
+print(f"Nowe/zmienione opinie: {new_reviews}, szczegóły opinii: {new_details}, usunięte: {deleted}")
+
+sums = state["sums"]
+written = state["written"]
+write_changed("dishes", "rating", averages(sums.get("dishes", {})), written.setdefault("dishes", {}))
+write_changed("restaurants", "avg_rating", averages(sums.get("restaurants", {})),
+              written.setdefault("restaurants", {}))
+write_changed("attributes", "rating", averages(sums.get("attributes", {})),
+              written.setdefault("attributes", {}))
+
+save_state(args.state, state)
+print("Gotowe!")
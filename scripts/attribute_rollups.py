@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Buduje profile ocen atrybutow (smak, porcja, swiezosc, ...) dla dan i restauracji.
+
+Szczegoly opinii (review-details: atrybut + ocena) sa zamieniane na tablice NumPy
+(danie, restauracja, atrybut, ocena), a liczniki, srednie i histogramy (0-5 gwiazdek)
+sa liczone wektorowo przez grupowanie po parach (danie, atrybut) i (restauracja, atrybut).
+Wynik to male pliki JSON, ktore strona dania czyta zamiast pobierac wszystkie opinie:
+    dishes/<documentId>.json, restaurants/<documentId>.json
+    {"documentId", "details", "attributes": {atrybut: {"name", "count", "mean", "histogram"}}}
+
+Stan (wiersze szczegolow, nazwy atrybutow, znacznik czasu i odciski zapisanych plikow)
+jest zapisywany w katalogu wyjsciowym, wiec kolejne uruchomienia pobieraja tylko
+szczegoly zmienione od ostatniego razu, przeliczaja tylko dotkniete nimi dania i restauracje
+i nadpisuja tylko pliki, ktorych tresc sie zmienila.
+
+Uzycie: python attribute_rollups.py [--out ../public/rollups] [--full] [--input details.jsonl]
+Wymaga NumPy: pip install -r requirements.txt (z katalogu scripts/)
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from strapi_client import StrapiClient
+
+BINS = 6  # histogram ocen 0..5 (zaokraglonych do pelnych gwiazdek)
+
+parser = argparse.ArgumentParser(description="Profile ocen atrybutow dla dan i restauracji")
+parser.add_argument("--out", default=str(Path(__file__).parent.parent / "public" / "rollups"))
+parser.add_argument("--full", action="store_true", help="liczy wszystko od nowa (poza lista zapisanych plikow)")
+parser.add_argument("--input", help="plik JSONL ze szczegolami opinii (np. z strapi_client.py) zamiast Strapi")
+
+
+# --- dane ---
+
+DETAILS_POPULATE = {
+    "attribute": {"fields": ["documentId", "name"]},
+    "review": {
+        "fields": ["documentId"],
+        "populate": {"dish": {"fields": ["documentId"], "populate": {"restaurant": {"fields": ["documentId"]}}}},
+    },
+}
+
+
+def relation(entry, *path):
+    for name in path:
+        entry = (entry or {}).get(name)
+    return entry
+
+
+def fetch_details(client, watermark):
+    """Szczegoly opinii zmienione od watermark (takze gdy zmienila sie sama opinia, np. jej danie)."""
+    # $gte jak w aggregate_ratings.py: szczegoly z tym samym znacznikiem sa pobierane ponownie,
+    # co jest bezpieczne, bo wiersz kazdego szczegolu jest zapamietany pod jego documentId
+    changed = {"updatedAt": {"$gte": watermark}} if watermark else None
+    return client.iter(
+        "review-details",
+        fields=["rating", "updatedAt"],
+        populate=DETAILS_POPULATE,
+        filters={"$or": [changed, {"review": changed}]} if changed else None,
+        sort=["updatedAt:asc", "id:asc"],
+    )
+
+
+def load_details(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def touch(touched, row):
+    touched["dishes"].add(row[0])
+    if row[1]:
+        touched["restaurants"].add(row[1])
+
+
+def set_row(state, touched, detail_id, row):
+    """Zapisuje (albo usuwa, gdy row jest None) wiersz szczegolu i oznacza dotkniete dania i restauracje."""
+    old = state["rows"].pop(detail_id, None) if row is None else state["rows"].get(detail_id)
+    if old == row:
+        return False
+    if row is not None:
+        state["rows"][detail_id] = row
+    for r in (old, row):
+        if r:
+            touch(touched, r)
+    return True
+
+
+def apply_details(state, details, touched):
+    """Aktualizuje wiersze stanu: {detail: [danie, restauracja, atrybut, ocena]}. Zwraca liczbe zmian."""
+    names = state["attributes"]
+    count = 0
+    for detail in details:
+        attribute = detail.get("attribute") or {}
+        dish = relation(detail, "review", "dish") or {}
+        row = [
+            dish.get("documentId"),
+            relation(dish, "restaurant", "documentId"),
+            attribute.get("documentId"),
+            detail.get("rating"),
+        ]
+        # Szczegol bez dania, atrybutu albo oceny nie wchodzi do profili
+        valid = row[0] and row[2] and row[3] is not None
+        count += set_row(state, touched, detail["documentId"], row if valid else None)
+        attribute_id = attribute.get("documentId")
+        if attribute_id and names.get(attribute_id) != attribute.get("name"):
+            if attribute_id in names:
+                # Zmiana nazwy atrybutu zmienia profile wszystkich dan z tym atrybutem
+                for r in state["rows"].values():
+                    if r[2] == attribute_id:
+                        touch(touched, r)
+            names[attribute_id] = attribute.get("name")
+        state["watermark"] = max(state["watermark"] or "", detail.get("updatedAt") or "")
+    return count
+
+
+# --- agregacja ---
+
+def rollup(keys, attributes, ratings):
+    """
+    Grupowanie po (klucz, atrybut): zwraca (klucze, atrybuty, liczniki, srednie, histogramy)
+    dla niepustych komorek. np.unique na parach zamiast pelnej macierzy klucz x atrybut,
+    wiec pamiec zalezy od liczby par, a nie od iloczynu liczby dan i atrybutow.
+    """
+    key_values, key_index = np.unique(keys, return_inverse=True)
+    attr_values, attr_index = np.unique(attributes, return_inverse=True)
+    cells, cell_index = np.unique(key_index * len(attr_values) + attr_index, return_inverse=True)
+    counts = np.bincount(cell_index, minlength=len(cells))
+    means = np.bincount(cell_index, weights=ratings, minlength=len(cells)) / counts
+    stars = np.clip(np.floor(ratings + 0.5), 0, BINS - 1).astype(np.int64)
+    histograms = np.bincount(cell_index * BINS + stars, minlength=len(cells) * BINS).reshape(len(cells), BINS)
+    return (
+        key_values[cells // len(attr_values)],
+        attr_values[cells % len(attr_values)],
+        counts,
+        means,
+        histograms,
+    )
+
+
+def summaries(rows, names, column, keys):
+    """Profile atrybutow dla kluczy keys z kolumny wierszy: 0 - dania, 1 - restauracje."""
+    valid = [r for r in rows if r[column] in keys]
+    if not valid:
+        return {}
+    cells = rollup(
+        np.array([r[column] for r in valid]),
+        np.array([r[2] for r in valid]),
+        np.array([float(r[3]) for r in valid], dtype=np.float64),
+    )
+    # Petla po gotowych listach Pythona - iterowanie po skalarach NumPy jest kilka razy wolniejsze
+    cell_keys, cell_attributes, counts, means, histograms = (
+        cells[0].tolist(), cells[1].tolist(), cells[2].tolist(), cells[3].round(2).tolist(), cells[4].tolist()
+    )
+    out = {}
+    for key, attribute, count, mean, histogram in zip(cell_keys, cell_attributes, counts, means, histograms):
+        summary = out.get(key)
+        if summary is None:
+            summary = out[key] = {"documentId": key, "details": 0, "attributes": {}}
+        summary["details"] += count
+        summary["attributes"][attribute] = {
+            "name": names.get(attribute),
+            "count": count,
+            "mean": mean,
+            "histogram": histogram,
+        }
+    return out
+
+
+# --- zapis ---
+
+def fingerprint(item):
+    return hashlib.blake2b(json.dumps(item, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_changed(directory, items, keys, written):
+    """Zapisuje profile kluczy keys o zmienionym odcisku i usuwa pliki kluczy, ktore nie maja juz szczegolow."""
+    directory.mkdir(parents=True, exist_ok=True)
+    changed, removed = 0, 0
+    for key in keys:
+        item = items.get(key)
+        if item is None:
+            if written.pop(key, None) is not None:
+                (directory / f"{key}.json").unlink(missing_ok=True)
+                removed += 1
+            continue
+        fp = fingerprint(item)
+        if written.get(key) != fp:
+            write_json(directory / f"{key}.json", item)
+            written[key] = fp
+            changed += 1
+    return changed, removed
+
+
+def main():
+    args = parser.parse_args()
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    state_path = out / "state.json"
+
+    state = None
+    if state_path.exists():
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    state = state or {"watermark": None, "rows": {}, "attributes": {}, "written": {}}
+    if args.full:
+        # Odciski zapisanych plikow zostaja - bez nich nie daloby sie usunac osieroconych plikow
+        state.update(watermark=None, rows={}, attributes={})
+    written = state.setdefault("written", {})
+    written.setdefault("dishes", {})
+    written.setdefault("restaurants", {})
+    # Przy pelnym przeliczeniu dotkniete sa tez klucze z zapisanymi plikami (usuniecie osieroconych)
+    touched = {kind: set(written[kind]) if args.full else set() for kind in ("dishes", "restaurants")}
+
+    start = time.perf_counter()
+    if args.input:
+        # Plik to pelny eksport - szczegoly, ktorych w nim nie ma, zostaly usuniete
+        details = load_details(args.input)
+        present = {d["documentId"] for d in details}
+    else:
+        client = StrapiClient()
+        details = fetch_details(client, state["watermark"])
+    updated = apply_details(state, details, touched)
+    if not args.input:
+        # Usuniete szczegoly (np. razem z opinia) - wystarcza same documentId
+        present = {d["documentId"] for d in client.iter("review-details", fields=["documentId"])}
+    for detail_id in set(state["rows"]) - present:
+        updated += set_row(state, touched, detail_id, None)
+    fetched = time.perf_counter() - start
+
+    rows = list(state["rows"].values())
+    start = time.perf_counter()
+    dishes = summaries(rows, state["attributes"], 0, touched["dishes"])
+    restaurants = summaries(rows, state["attributes"], 1, touched["restaurants"])
+    computed = time.perf_counter() - start
+
+    dish_changes = write_changed(out / "dishes", dishes, touched["dishes"], written["dishes"])
+    restaurant_changes = write_changed(out / "restaurants", restaurants, touched["restaurants"], written["restaurants"])
+    write_json(state_path, state)
+
+    print(f"Szczegóły opinii: {len(rows)} (zmienione: {updated}, pobieranie {fetched:.2f}s, "
+          f"agregacja {computed:.2f}s)")
+    print(f"Dania: przeliczone {len(touched['dishes'])}, zapisane {dish_changes[0]}, usunięte {dish_changes[1]}")
+    print(f"Restauracje: przeliczone {len(touched['restaurants'])}, zapisane {restaurant_changes[0]}, "
+          f"usunięte {restaurant_changes[1]}")
+
+
+if __name__ == "__main__":
+    main()
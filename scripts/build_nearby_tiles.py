@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Buduje statyczne kafelki "najblizsze restauracje" dla widoku Nearby.
+
+Restauracje sa indeksowane siatka geohash. Dla kazdego kafelka (z restauracjami
+i jego sasiadow) liczone sa odleglosci haversine od srodka kafelka (wektorowo, NumPy)
+i zapisywany jest plik <geohash>.json z lista posortowana po odleglosci. Lista zawiera
+wszystkie restauracje w promieniu radius_m = odleglosc k-tej + przekatna kafelka,
+wiec k najblizszych dla dowolnego punktu kafelka zawsze sie w niej znajduje -
+frontend sortuje juz tylko te kilkadziesiat pozycji wzgledem lokalizacji uzytkownika.
+
+Stan (pozycje restauracji i sklad kafelkow) jest zapisywany w katalogu wyjsciowym,
+wiec kolejne uruchomienia przeliczaja tylko kafelki dotkniete zmianami.
+
+Uzycie: python build_nearby_tiles.py [--out ../public/nearby] [--precision 6] [-k 20] [--full]
+Wymaga NumPy: pip install -r requirements.txt (z katalogu scripts/)
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from strapi_client import StrapiClient
+
+EARTH_RADIUS_M = 6_371_000
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+parser = argparse.ArgumentParser(description="Buduje kafelki najblizszych restauracji (geohash)")
+parser.add_argument("--out", default=str(Path(__file__).parent.parent / "public" / "nearby"))
+parser.add_argument("--precision", type=int, default=6, help="dlugosc geohasha kafelka (6 = ok. 1,2 x 0,6 km)")
+parser.add_argument("-k", type=int, default=20, help="liczba najblizszych restauracji gwarantowana dla kafelka")
+parser.add_argument("--input", help="plik JSONL z restauracjami (np. z strapi_client.py) zamiast Strapi")
+parser.add_argument("--full", action="store_true", help="ignoruje zapisany stan i buduje wszystkie kafelki")
+
+
+# --- geohash ---
+
+def geohash_encode(lat, lng, precision):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_bounds(tile):
+    """Zwraca (south, west, north, east) kafelka."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in tile:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def tile_geometry(tile):
+    """Srodek kafelka, polowa przekatnej i najmniejszy wymiar (w metrach)."""
+    south, west, north, east = geohash_bounds(tile)
+    lat, lng = (south + north) / 2, (west + east) / 2
+    height = np.radians(north - south) * EARTH_RADIUS_M
+    width = np.radians(east - west) * EARTH_RADIUS_M * np.cos(np.radians(lat))
+    return lat, lng, float(np.hypot(height, width) / 2), float(min(height, width))
+
+
+def neighbours(tile, ring=1):
+    """Kafelki w kwadracie (2*ring+1)^2 wokol tile (lacznie z nim)."""
+    south, west, north, east = geohash_bounds(tile)
+    lat, lng = (south + north) / 2, (west + east) / 2
+    d_lat, d_lng = north - south, east - west
+    out = set()
+    for i in range(-ring, ring + 1):
+        for j in range(-ring, ring + 1):
+            n_lat = lat + i * d_lat
+            if -90 < n_lat < 90:
+                n_lng = (lng + j * d_lng + 180) % 360 - 180
+                out.add(geohash_encode(n_lat, n_lng, len(tile)))
+    return out
+
+
+def haversine_m(lat, lng, lats, lngs):
+    """Odleglosci (m) od punktu do tablic wspolrzednych - wektorowo."""
+    lat, lng = np.radians(lat), np.radians(lng)
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+# --- dane ---
+
+def entry(restaurant):
+    """Pola restauracji zapisywane w kafelku."""
+    cover = restaurant.get("cover") or {}
+    return {
+        "documentId": restaurant["documentId"],
+        "name": restaurant.get("name"),
+        "address": restaurant.get("address"),
+        "lat": float(restaurant["latitude"]),
+        "lng": float(restaurant["longitude"]),
+        "avg_rating": restaurant.get("avg_rating"),
+        "cover": cover.get("url") if isinstance(cover, dict) else None,
+    }
+
+
+def fingerprint(item):
+    return hashlib.blake2b(json.dumps(item, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def load_restaurants(path=None):
+    if path:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        client = StrapiClient()
+        rows = client.iter(
+            "restaurants",
+            fields=["documentId", "name", "address", "latitude", "longitude", "avg_rating"],
+            populate={"cover": {"fields": ["url"]}},
+        )
+    return {
+        r["documentId"]: entry(r)
+        for r in rows
+        if r.get("latitude") is not None and r.get("longitude") is not None
+    }
+
+
+class NearbyIndex:
+    """Siatka geohash nad restauracjami z tablicami wspolrzednych dla NumPy."""
+
+    def __init__(self, restaurants, precision):
+        self.precision = precision
+        self.ids = list(restaurants)
+        self.items = [restaurants[i] for i in self.ids]
+        self.lats = np.array([r["lat"] for r in self.items], dtype=np.float64)
+        self.lngs = np.array([r["lng"] for r in self.items], dtype=np.float64)
+        self.cells = {}
+        for index, item in enumerate(self.items):
+            self.cells.setdefault(geohash_encode(item["lat"], item["lng"], precision), []).append(index)
+
+    def tiles(self):
+        """Kafelki z restauracjami oraz ich sasiedzi."""
+        out = set()
+        for cell in self.cells:
+            out |= neighbours(cell)
+        return out
+
+    def nearest(self, tile, k):
+        """
+        Zwraca (radius_m, [(indeks, odleglosc)]) dla kafelka. Kandydaci pochodza z coraz
+        wiekszego kwadratu sasiednich komorek, az pokryje on caly potrzebny promien.
+        """
+        lat, lng, half_diagonal, side = tile_geometry(tile)
+        total = len(self.items)
+        k = min(k, total)
+        ring = 1
+        while True:
+            # Kwadrat wiekszy niz liczba zajetych komorek - taniej policzyc wszystko naraz
+            if (2 * ring + 1) ** 2 >= len(self.cells):
+                candidates = range(total)
+            else:
+                candidates = [i for cell in neighbours(tile, ring) for i in self.cells.get(cell, ())]
+            if len(candidates) < k:
+                ring *= 2
+                continue
+            index = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            distances = haversine_m(lat, lng, self.lats[index], self.lngs[index])
+            radius = np.partition(distances, k - 1)[k - 1] + 2 * half_diagonal
+            if radius <= (ring + 0.5) * side or len(candidates) == total:
+                keep = distances <= radius
+                order = np.argsort(distances[keep], kind="stable")
+                return float(radius), list(zip(index[keep][order].tolist(), distances[keep][order].tolist()))
+            # Promien jest juz znany - od razu kwadrat, ktory go pokrywa
+            ring = max(ring + 1, int(np.ceil(radius / side - 0.5)))
+
+
+def affected_tiles(state, restaurants, tiles):
+    """Kafelki do przeliczenia: nowe albo takie, na ktorych liscie/promieniu jest zmieniona restauracja."""
+    old = state["restaurants"]
+    changed = {i for i in restaurants if old.get(i, {}).get("fp") != fingerprint(restaurants[i])}
+    changed |= set(old) - set(restaurants)
+    if not changed:
+        return {t for t in tiles if t not in state["tiles"]}, changed
+
+    moved = [restaurants[i] for i in changed if i in restaurants]
+    lats = np.array([r["lat"] for r in moved]) if moved else np.empty(0)
+    lngs = np.array([r["lng"] for r in moved]) if moved else np.empty(0)
+    todo = set()
+    for tile in tiles:
+        stored = state["tiles"].get(tile)
+        if stored is None or changed.intersection(stored["ids"]):
+            todo.add(tile)
+        elif len(moved):
+            lat, lng, _, _ = tile_geometry(tile)
+            if (haversine_m(lat, lng, lats, lngs) <= stored["radius_m"]).any():
+                todo.add(tile)
+    return todo, changed
+
+
+def write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def main():
+    args = parser.parse_args()
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    state_path = out / "state.json"
+
+    state = None
+    if state_path.exists() and not args.full:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("precision") != args.precision or state.get("k") != args.k:
+            print("Zmieniono parametry kafelków - pełna przebudowa")
+            state = None
+    state = state or {"precision": args.precision, "k": args.k, "restaurants": {}, "tiles": {}}
+
+    start = time.perf_counter()
+    restaurants = load_restaurants(args.input)
+    index = NearbyIndex(restaurants, args.precision)
+    tiles = index.tiles()
+    todo, changed = affected_tiles(state, restaurants, tiles)
+    print(f"Restauracje: {len(restaurants)} (zmienione: {len(changed)}), kafelki: {len(tiles)}, "
+          f"do przeliczenia: {len(todo)}")
+
+    for tile in sorted(todo):
+        radius, nearest = index.nearest(tile, args.k)
+        lat, lng, _, _ = tile_geometry(tile)
+        write_json(out / f"{tile}.json", {
+            "tile": tile,
+            "center": [lat, lng],
+            "radius_m": round(radius, 1),
+            "restaurants": [{**index.items[i], "distance_m": round(d, 1)} for i, d in nearest],
+        })
+        state["tiles"][tile] = {
+            "radius_m": radius,
+            "ids": [index.ids[i] for i, _ in nearest],
+        }
+
+    removed = set(state["tiles"]) - tiles
+    for tile in removed:
+        (out / f"{tile}.json").unlink(missing_ok=True)
+        del state["tiles"][tile]
+
+    state["restaurants"] = {i: {"fp": fingerprint(r)} for i, r in restaurants.items()}
+    write_json(out / "index.json", {"precision": args.precision, "k": args.k, "tiles": sorted(tiles)})
+    write_json(state_path, state)
+    print(f"Zapisano {len(todo)} kafelków, usunięto {len(removed)} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Indeks wyszukiwania trigramowego dla restauracji, dan i atrybutow.
+
+Dokumenty sa eksportowane ze Strapi stronicowanymi odczytami (strapi_client),
+a ich nazwy rozbijane na trigramy (male litery, bez polskich znakow). Indeks
+odwrocony jest zapisywany jako statyczne pliki:
+    meta.json           - parametry indeksu
+    docs/NNNNN.json     - DOC_SHARD_SIZE kolejnych dokumentow:
+                          [typ, documentId, nazwa, podpis, tekst_indeksu] (null = wolne miejsce)
+    kinds.txt           - jeden znak typu na numer dokumentu (KIND_CODES, "-" = wolne miejsce)
+    shards/NN.json      - {trigram: [numery dokumentow, kodowane roznicowo]}
+    state.json          - znacznik czasu ostatniej aktualizacji
+Trigram trafia do shardu wg crc32, a dokument do shardu wg numeru, wiec zapytanie
+czyta tylko kilka malych plikow, niezaleznie od rozmiaru katalogu. Literowki sa
+tolerowane, bo ranking liczy czesc wspolnych trigramow, a nie dokladne dopasowanie.
+
+Kolejne uruchomienia pobieraja tylko wpisy zmienione od ostatniego (updatedAt),
+usuwaja dokumenty, ktorych juz nie ma, i zapisuja tylko zmienione shardy.
+
+Budowa:     python search_index.py build [--out ../public/search] [--full]
+Zapytanie:  python search_index.py query "pierogi ruskie" [--type dish]
+
+Z Pythona:
+    index = SearchIndex("public/search")
+    index.search("kebap", limit=5)
+"""
+import argparse
+import heapq
+import json
+import os
+import re
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+
+DEFAULT_OUT = Path(__file__).parent.parent / "public" / "search"
+SHARDS = 64
+DOC_SHARD_SIZE = 64
+VERSION = 3
+
+# Kolekcja Strapi -> typ dokumentu w indeksie
+COLLECTIONS = {
+    "restaurants": "restaurant",
+    "dishes": "dish",
+    "attributes": "attribute",
+}
+# Typ dokumentu -> znak w kinds.txt; filtr typu nie musi wczytywac shardow dokumentow
+KIND_CODES = {"restaurant": "r", "dish": "d", "attribute": "a"}
+
+# Litery, ktorych NFKD nie rozklada na litere bazowa
+TRANSLITERATION = str.maketrans({"ł": "l", "Ł": "l"})
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+# --- tekst ---
+
+def normalize(text):
+    """Male litery bez znakow diakrytycznych, slowa oddzielone pojedyncza spacja."""
+    text = unicodedata.normalize("NFKD", (text or "").translate(TRANSLITERATION))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return NON_WORD_RE.sub(" ", text).strip()
+
+
+def trigrams(text):
+    """Zbior trigramow znormalizowanego tekstu; kazde slowo jest otoczone spacjami."""
+    out = set()
+    for word in text.split():
+        padded = f" {word} "
+        out.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return out
+
+
+def shard_of(trigram, shards=SHARDS):
+    return zlib.crc32(trigram.encode("utf-8")) % shards
+
+
+def doc_shard_path(root, number):
+    return Path(root) / "docs" / f"{number:05d}.json"
+
+
+def encode_postings(ids):
+    ids = sorted(ids)
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def decode_postings(deltas):
+    return list(accumulate(deltas))
+
+
+def write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_text(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- dokumenty ---
+
+def document(kind, entry):
+    """Zwraca (nazwa, podpis, tekst_do_indeksu) wpisu Strapi danego typu."""
+    name = entry.get("name") or ""
+    if kind == "restaurant":
+        return name, entry.get("address") or entry.get("city") or "", f"{name} {entry.get('city') or ''}"
+    if kind == "dish":
+        restaurant = entry.get("restaurant") or {}
+        subtitle = " · ".join(p for p in (entry.get("category"), restaurant.get("name")) if p)
+        return name, subtitle, f"{name} {entry.get('category') or ''}"
+    return name, (entry.get("description") or "")[:80], name
+
+
+def export_queries(watermark):
+    """Parametry stronicowanych odczytow kolekcji (tylko wpisy zmienione od watermark)."""
+    changed = {"updatedAt": {"$gte": watermark}} if watermark else None
+    return {
+        "restaurants": {"fields": ["name", "address", "city", "updatedAt"], "filters": changed},
+        "dishes": {
+            "fields": ["name", "category", "updatedAt"],
+            "populate": {"restaurant": {"fields": ["name", "updatedAt"]}},
+            # Zmiana nazwy restauracji zmienia podpis jej dan
+            "filters": {"$or": [changed, {"restaurant": changed}]} if changed else None,
+        },
+        "attributes": {"fields": ["name", "description", "updatedAt"], "filters": changed},
+    }
+
+
+# --- budowa ---
+
+class IndexWriter:
+    """
+    Aktualizuje indeks na dysku: dokumenty dostaja stale numery (zwolnione sa
+    uzywane ponownie), a shardy sa wczytywane i zapisywane tylko wtedy, gdy
+    zmienil sie ktorys z ich trigramow. Zapisywane sa tez tylko zmienione shardy dokumentow.
+    """
+
+    def __init__(self, out, full=False):
+        self.out = Path(out)
+        (self.out / "shards").mkdir(parents=True, exist_ok=True)
+        (self.out / "docs").mkdir(parents=True, exist_ok=True)
+        state = None if full else read_json(self.out / "state.json")
+        if state and state.get("version") != VERSION:
+            state = None
+        self.full = state is None
+        self.state = state or {"version": VERSION, "watermark": None}
+        self.docs = []
+        if not self.full:
+            meta = read_json(self.out / "meta.json", {})
+            for number in range(-(-meta.get("slots", 0) // DOC_SHARD_SIZE)):
+                self.docs.extend(read_json(doc_shard_path(self.out, number), []))
+        self.slots = {f"{d[0]}:{d[1]}": i for i, d in enumerate(self.docs) if d}
+        self.free = [i for i, d in enumerate(self.docs) if d is None]
+        self.shards = {}
+        self.dirty = set()
+        self.dirty_docs = set()
+
+    def shard(self, number):
+        if number not in self.shards:
+            path = self.out / "shards" / f"{number:02d}.json"
+            stored = {} if self.full else read_json(path, {})
+            self.shards[number] = {t: set(decode_postings(p)) for t, p in stored.items()}
+        return self.shards[number]
+
+    def _postings(self, slot, terms, add):
+        for term in terms:
+            number = shard_of(term)
+            shard = self.shard(number)
+            if add:
+                shard.setdefault(term, set()).add(slot)
+            else:
+                shard.get(term, set()).discard(slot)
+                if term in shard and not shard[term]:
+                    del shard[term]
+            self.dirty.add(number)
+
+    def remove(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return False
+        self._postings(slot, trigrams(self.docs[slot][4]), add=False)
+        self.docs[slot] = None
+        self.dirty_docs.add(slot // DOC_SHARD_SIZE)
+        self.free.append(slot)
+        return True
+
+    def put(self, kind, entry):
+        """Dodaje albo aktualizuje dokument. Zwraca True, jesli cos sie zmienilo."""
+        key = f"{kind}:{entry['documentId']}"
+        name, subtitle, text = document(kind, entry)
+        text = normalize(text)
+        terms = trigrams(text)
+        row = [kind, entry["documentId"], name, subtitle, text]
+        slot = self.slots.get(key)
+        if slot is not None:
+            if self.docs[slot] == row:
+                return False
+            old_terms = trigrams(self.docs[slot][4])
+            self._postings(slot, old_terms - terms, add=False)
+            self._postings(slot, terms - old_terms, add=True)
+        else:
+            slot = self.free.pop() if self.free else len(self.docs)
+            if slot == len(self.docs):
+                self.docs.append(None)
+            self.slots[key] = slot
+            self._postings(slot, terms, add=True)
+        self.docs[slot] = row
+        self.dirty_docs.add(slot // DOC_SHARD_SIZE)
+        return True
+
+    def keys(self, kind):
+        prefix = f"{kind}:"
+        return {key[len(prefix):] for key in self.slots if key.startswith(prefix)}
+
+    def save(self):
+        for number in self.dirty:
+            shard = self.shards[number]
+            write_json(self.out / "shards" / f"{number:02d}.json",
+                       {t: encode_postings(ids) for t, ids in sorted(shard.items())})
+        for number in self.dirty_docs:
+            start = number * DOC_SHARD_SIZE
+            write_json(doc_shard_path(self.out, number), self.docs[start:start + DOC_SHARD_SIZE])
+        if self.dirty_docs or self.full:
+            write_text(self.out / "kinds.txt", "".join(KIND_CODES[d[0]] if d else "-" for d in self.docs))
+        if self.full:
+            # Pozostalosci po poprzedniej wersji albo wiekszym indeksie
+            count = -(-len(self.docs) // DOC_SHARD_SIZE)
+            for path in (self.out / "docs").glob("*.json"):
+                if int(path.stem) >= count:
+                    path.unlink()
+            (self.out / "docs.json").unlink(missing_ok=True)
+        write_json(self.out / "meta.json", {
+            "version": VERSION,
+            "shards": SHARDS,
+            "doc_shard_size": DOC_SHARD_SIZE,
+            "slots": len(self.docs),
+            "docs": len(self.slots),
+            "types": dict(Counter(key.split(":", 1)[0] for key in self.slots)),
+        })
+        write_json(self.out / "state.json", self.state)
+
+
+def build(client, out, full=False):
+    """Eksportuje zmienione wpisy ze Strapi i aktualizuje indeks. Zwraca podsumowanie."""
+    start = time.perf_counter()
+    writer = IndexWriter(out, full)
+    watermark = writer.state["watermark"]
+    summary = {"full": writer.full, "changed": 0, "removed": 0}
+    latest = watermark
+    for collection, query in export_queries(watermark).items():
+        kind = COLLECTIONS[collection]
+        for entry in client.iter(collection, **query):
+            summary["changed"] += writer.put(kind, entry)
+            latest = max(latest or "", entry.get("updatedAt") or "")
+        # Usuniete i wycofane z publikacji wpisy - wystarcza same documentId
+        present = {e["documentId"] for e in client.iter(collection, fields=["documentId"])}
+        for document_id in writer.keys(kind) - present:
+            summary["removed"] += writer.remove(f"{kind}:{document_id}")
+    writer.state["watermark"] = latest
+    writer.save()
+    summary.update(docs=len(writer.slots), shards_written=len(writer.dirty),
+                   seconds=round(time.perf_counter() - start, 2))
+    return summary
+
+
+# --- zapytania ---
+
+class SearchIndex:
+    """
+    Wyszukiwanie w zbudowanym indeksie. Wczytywane sa tylko shardy z trigramami
+    zapytania i shardy dokumentow kandydatow (i zapamietywane). Kandydaci pochodza
+    z najrzadszych trigramow: listy dluzsze niz common_limit sa pomijane, jesli
+    zapytanie ma co najmniej dwa rzadsze. Kandydaci sa ukladani wg liczby wspolnych
+    trigramow (tylko dokumenty zadanych typow) i dopiero ten ranking jest przycinany
+    do max_candidates, ktorzy sa oceniani dokladnie - czas zapytania nie rosnie z katalogiem.
+    """
+
+    def __init__(self, path=DEFAULT_OUT, common_limit=2000, max_candidates=100):
+        self.path = Path(path)
+        self.meta = read_json(self.path / "meta.json")
+        if self.meta is None:
+            raise FileNotFoundError(f"Brak indeksu w {self.path}")
+        self.doc_shard_size = self.meta["doc_shard_size"]
+        self._docs = {}
+        self.common_limit = common_limit
+        self.max_candidates = max_candidates
+        self._shards = {}
+        self._kinds = None
+
+    def _postings(self, term):
+        number = shard_of(term, self.meta["shards"])
+        if number not in self._shards:
+            self._shards[number] = read_json(self.path / "shards" / f"{number:02d}.json", {})
+        return self._shards[number].get(term)
+
+    def _slot_kinds(self):
+        if self._kinds is None:
+            with open(self.path / "kinds.txt", encoding="utf-8") as f:
+                self._kinds = f.read()
+        return self._kinds
+
+    def _doc(self, slot):
+        number, offset = divmod(slot, self.doc_shard_size)
+        if number not in self._docs:
+            self._docs[number] = read_json(doc_shard_path(self.path, number), [])
+        docs = self._docs[number]
+        return docs[offset] if offset < len(docs) else None
+
+    def search(self, query, limit=10, types=None, min_score=0.3):
+        """
+        Zwraca do limit dokumentow posortowanych wg trafnosci:
+        [{"type", "documentId", "name", "subtitle", "score"}].
+        Wynik laczy pokrycie trigramow zapytania (glowna czesc) i podobienstwo
+        do calego tekstu dokumentu; dokumenty z nazwa zaczynajaca sie od zapytania
+        dostaja premie.
+        """
+        text = normalize(query)
+        terms = trigrams(text)
+        if not terms:
+            return []
+        postings = sorted(
+            (p for p in (self._postings(t) for t in terms) if p is not None),
+            key=len,
+        )
+        # Filtr typu przed rankingiem - inaczej dokumenty innych typow moglyby zajac
+        # wszystkie miejsca kandydatow
+        codes = {KIND_CODES[t] for t in types} if types else None
+        kinds = self._slot_kinds() if codes else None
+        counts = Counter()
+        for i, deltas in enumerate(postings):
+            if len(deltas) > self.common_limit and i >= 2:
+                break
+            slots = accumulate(deltas)
+            counts.update(slots if codes is None else (s for s in slots if kinds[s] in codes))
+
+        # Ranking przed przycieciem; przy rownej liczbie trigramow rozstrzyga hash numeru,
+        # a nie sam numer, ktory faworyzowalby najstarsze dokumenty
+        candidates = heapq.nsmallest(
+            self.max_candidates, counts.items(), key=lambda item: (-item[1], (item[0] * 2654435761) & 0xFFFFFFFF)
+        )
+        results = []
+        for slot, _ in candidates:
+            doc = self._doc(slot)
+            if doc is None:
+                continue
+            doc_terms = trigrams(doc[4])
+            matched = len(terms & doc_terms)
+            coverage = matched / len(terms)
+            if coverage < min_score:
+                continue
+            score = 0.7 * coverage + 0.3 * matched / len(terms | doc_terms)
+            if doc[4].startswith(text):
+                score += 0.1
+            results.append((score, doc))
+        results.sort(key=lambda item: (-item[0], item[1][2]))
+        return [
+            {"type": doc[0], "documentId": doc[1], "name": doc[2], "subtitle": doc[3], "score": round(score, 3)}
+            for score, doc in results[:limit]
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indeks wyszukiwania restauracji, dan i atrybutow")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="katalog indeksu")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="buduje lub aktualizuje indeks ze Strapi")
+    build_cmd.add_argument("--full", action="store_true", help="ignoruje zapisany stan i buduje indeks od nowa")
+    query_cmd = commands.add_parser("query", help="wyszukuje w zbudowanym indeksie")
+    query_cmd.add_argument("text")
+    query_cmd.add_argument("--type", action="append", choices=sorted(COLLECTIONS.values()),
+                           help="ogranicza wyniki do typu (mozna podac kilka razy)")
+    query_cmd.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from strapi_client import StrapiClient
+
+        result = build(StrapiClient(), args.out, args.full)
+        print(f"{'Pełna budowa' if result['full'] else 'Aktualizacja'}: zmienione {result['changed']}, "
+              f"usunięte {result['removed']}, dokumenty {result['docs']}, "
+              f"zapisane shardy {result['shards_written']} ({result['seconds']}s)")
+    else:
+        index = SearchIndex(args.out)
+        start = time.perf_counter()
+        hits = index.search(args.text, limit=args.limit, types=args.type)
+        elapsed = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"{hit['score']:.3f}  [{hit['type']}] {hit['name']}  {hit['subtitle']}")
+        print(f"{len(hits)} wyników ({elapsed:.1f} ms)")
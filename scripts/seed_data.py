@@ -1,37 +1,35 @@
 #!/usr/bin/env python3
-import requests
+"""
+Wypelnia Strapi losowymi daniami i opiniami.
+Zapisy sa wykonywane wspolbieznie z zachowaniem zaleznosci:
+restauracja -> danie -> atrybut dania / opinia -> szczegol opinii.
+
+Uzycie: python seed_data.py --dishes 3 --reviews 3 --seed 42 --workers 8
+"""
+import argparse
 import random
+import threading
 import time
-import os
-from pathlib import Path
-
-# Wczytaj zmienne z .env.local
-env_file = Path(__file__).parent.parent / ".env.local"
-if env_file.exists():
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, value = line.split("=", 1)
-                os.environ[key] = value
-
-READ_TOKEN = os.environ.get("NEXT_PUBLIC_STRAPI_KEY", "")
-WRITE_TOKEN = os.environ.get("STRAPI_KEY", "")
-API = os.environ.get("NEXT_PUBLIC_STRAPI_URL", "https://api-agh.waloszczyk.eu") + "/api"
-
-print(f"API: {API}")
-print(f"READ_TOKEN: {READ_TOKEN[:30]}..." if READ_TOKEN else "READ_TOKEN: BRAK!")
-print(f"WRITE_TOKEN: {WRITE_TOKEN[:30]}..." if WRITE_TOKEN else "WRITE_TOKEN: BRAK!")
-
-read_headers = {
-    "Authorization": f"Bearer {READ_TOKEN}",
-    "Content-Type": "application/json"
-}
-
-write_headers = {
-    "Authorization": f"Bearer {WRITE_TOKEN}",
-    "Content-Type": "application/json"
-}
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from strapi_client import StrapiClient
+
+parser = argparse.ArgumentParser(description="Wypelnia Strapi daniami i opiniami")
+parser.add_argument("--dishes", type=int, default=3, help="liczba dan na restauracje")
+parser.add_argument("--reviews", type=int, default=3, help="liczba opinii na restauracje")
+parser.add_argument("--seed", type=int, default=42, help="ziarno generatora losowego")
+parser.add_argument("--workers", type=int, default=8, help="liczba rownoleglych zapytan")
+parser.add_argument("--limit", type=int, help="maksymalna liczba restauracji")
+args = parser.parse_args()
+
+client = StrapiClient(pool_size=args.workers)
+
+print(f"API: {client.api}")
+print(f"READ_TOKEN: {client.read_token[:30]}..." if client.read_token else "READ_TOKEN: BRAK!")
+print(f"WRITE_TOKEN: {client.write_token[:30]}..." if client.write_token else "WRITE_TOKEN: BRAK!")
 
 # Lista dań do losowego wyboru
 DISHES = [
@@ -79,98 +77,163 @@ ATTRIBUTES = [
     "l655ged5lhxk8mt0nuc4qk0e",  # Swiezosc
 ]
 
-def create_dish(restaurant_id, name, price):
-    """Tworzy danie dla restauracji"""
-    data = {"data": {"name": name, "price": price, "restaurant": restaurant_id}}
+def post(collection, data):
+    """Tworzy wpis i zwraca jego documentId (albo None przy bledzie)."""
     try:
-        r = requests.post(f"{API}/dishes", headers=write_headers, json=data, timeout=10)
+        r = client.create(collection, data)
         if r.status_code == 200 or r.status_code == 201:
             return r.json()["data"]["documentId"]
-        else:
-            print(f"  Błąd dania: {r.status_code} - {r.text[:100]}")
-            return None
+        print(f"  Błąd {collection}: {r.status_code} - {r.text[:100]}")
     except Exception as e:
-        print(f"  Błąd: {e}")
-        return None
+        print(f"  Błąd {collection}: {e}")
+    return None
+
+
+def create_dish(restaurant_id, name, price):
+    """Tworzy danie dla restauracji"""
+    return post("dishes", {"name": name, "price": price, "restaurant": restaurant_id})
+
 
 def create_review(dish_id, rating, comment):
     """Tworzy opinię dla dania"""
-    data = {"data": {"rating": rating, "comment": comment, "dish": dish_id}}
-    try:
-        r = requests.post(f"{API}/reviews", headers=write_headers, json=data, timeout=10)
-        if r.status_code == 200 or r.status_code == 201:
-            return r.json()["data"]["documentId"]
-        else:
-            print(f"  Błąd opinii: {r.status_code}")
-            return None
-    except Exception as e:
-        print(f"  Błąd: {e}")
-        return None
+    return post("reviews", {"rating": rating, "comment": comment, "dish": dish_id})
+
 
 def create_dish_attribute(dish_id, attr_id):
     """Tworzy powiązanie dania z atrybutem"""
-    data = {"data": {"dish": dish_id, "attribute": attr_id}}
-    try:
-        r = requests.post(f"{API}/dish-attributes", headers=write_headers, json=data, timeout=10)
-        return r.status_code == 200 or r.status_code == 201
-    except:
-        return False
+    return post("dish-attributes", {"dish": dish_id, "attribute": attr_id})
+
 
 def create_review_detail(review_id, attr_id, rating):
     """Tworzy szczegół oceny atrybutu"""
-    data = {"data": {"review": review_id, "attribute": attr_id, "rating": rating}}
+    return post("review-details", {"review": review_id, "attribute": attr_id, "rating": rating})
+
+
+def fetch_restaurants(limit=None):
+    """Pobiera documentId wszystkich restauracji, strona po stronie."""
+    ids = []
     try:
-        r = requests.post(f"{API}/review-details", headers=write_headers, json=data, timeout=10)
-        return r.status_code == 200 or r.status_code == 201
-    except:
-        return False
+        for rest in client.iter("restaurants", fields=["documentId"], sort="id"):
+            ids.append(rest["documentId"])
+            if limit and len(ids) >= limit:
+                break
+    except requests.RequestException as e:
+        print(f"Błąd pobierania restauracji: {e}")
+        exit(1)
+    return ids
+
+
+def plan_restaurant(rng, restaurant_id):
+    """
+    Losuje z gory cala zawartosc dla restauracji, zeby wynik zalezal tylko od ziarna,
+    a nie od kolejnosci, w jakiej koncza sie rownolegle zapytania.
+    """
+    dishes = []
+    for name, price in rng.sample(DISHES, min(args.dishes, len(DISHES))):
+        attrs = rng.sample(ATTRIBUTES, rng.randint(1, 2))
+        dishes.append({"name": name, "price": price, "attributes": attrs, "reviews": []})
+    if dishes:
+        for _ in range(args.reviews):
+            rng.choice(dishes)["reviews"].append({
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "comment": rng.choice(COMMENTS),
+                "attribute": rng.choice(ATTRIBUTES),
+                "attribute_rating": rng.randint(3, 5),
+            })
+    return restaurant_id, dishes
+
+
+class Pipeline:
+    """
+    Wykonuje zapisy w puli watkow. Po udanym zapisie uruchamiane sa zapisy od niego
+    zalezne, wiec rozne restauracje (i rozne dania) sa przetwarzane rownolegle.
+    Glowny watek dodaje kolejne dania dopiero, gdy w locie jest najwyzej max_pending
+    zapisow (wait_for_room), wiec pamiec nie rosnie z rozmiarem zbioru. Zapisy zalezne
+    nie czekaja - sa zlecane z watkow puli, a ich liczba na danie jest ograniczona.
+    """
+
+    def __init__(self, workers, max_pending=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = max_pending or 4 * workers
+        self.counts = Counter()
+        self.failed = Counter()
+        self._lock = threading.Lock()
+        self._room = threading.Condition(self._lock)
+        # Jedno zlecenie "trzyma" glowny watek, dopoki nie skonczy dodawac zadan
+        self._pending = 1
+        self._done = threading.Event()
+
+    def submit(self, kind, fn, *args, then=None):
+        with self._lock:
+            self._pending += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._finish(kind, f, then))
+
+    def _finish(self, kind, future, then):
+        try:
+            result = future.result()
+            with self._lock:
+                (self.counts if result else self.failed)[kind] += 1
+            if result and then:
+                then(result)
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            if self._pending <= self.max_pending:
+                self._room.notify()
+            if self._pending == 0:
+                self._done.set()
+
+    def wait_for_room(self):
+        """Blokuje glowny watek, dopoki liczba zapisow w locie przekracza max_pending."""
+        with self._room:
+            while self._pending > self.max_pending:
+                self._room.wait()
+
+    def wait(self):
+        """Czeka na zakonczenie wszystkich zapisow, lacznie z zaleznymi."""
+        self._release()
+        self._done.wait()
+        self.executor.shutdown()
+
+
+def seed_dish(pipeline, restaurant_id, dish):
+    def on_dish(dish_id):
+        for attr in dish["attributes"]:
+            pipeline.submit("dish-attributes", create_dish_attribute, dish_id, attr)
+        for review in dish["reviews"]:
+            pipeline.submit(
+                "reviews", create_review, dish_id, review["rating"], review["comment"],
+                then=lambda review_id, review=review: pipeline.submit(
+                    "review-details", create_review_detail,
+                    review_id, review["attribute"], review["attribute_rating"],
+                ),
+            )
+
+    pipeline.submit("dishes", create_dish, restaurant_id, dish["name"], dish["price"], then=on_dish)
+
 
-# Pobierz listę restauracji
 print("\nPobieram restauracje...")
-r = requests.get(f"{API}/restaurants?pagination[limit]=100", headers=read_headers)
-if r.status_code != 200:
-    print(f"Błąd pobierania restauracji: {r.status_code} - {r.text[:200]}")
-    exit(1)
-restaurants = r.json()["data"]
-print(f"Znaleziono {len(restaurants)} restauracji\n")
-
-# Iteruj przez restauracje
-for rest in restaurants:
-    rest_id = rest["documentId"]
-    rest_name = rest["name"]
-    print(f"=== {rest_name} ===")
-    
-    # Wybierz 3 losowe dania
-    selected_dishes = random.sample(DISHES, 3)
-    dish_ids = []
-    
-    for dish_name, dish_price in selected_dishes:
-        dish_id = create_dish(rest_id, dish_name, dish_price)
-        if dish_id:
-            dish_ids.append(dish_id)
-            print(f"  + Danie: {dish_name}")
-            
-            # Dodaj 1-2 atrybuty do dania
-            for attr in random.sample(ATTRIBUTES, random.randint(1, 2)):
-                create_dish_attribute(dish_id, attr)
-        time.sleep(0.3)  # Małe opóźnienie
-    
-    # Dodaj 2-4 opinie dla różnych dań
-    num_reviews = random.randint(2, 4)
-    for i in range(num_reviews):
-        if dish_ids:
-            dish_id = random.choice(dish_ids)
-            rating = round(random.uniform(3.0, 5.0), 1)
-            comment = random.choice(COMMENTS)
-            review_id = create_review(dish_id, rating, comment)
-            if review_id:
-                print(f"  + Opinia: {rating}★")
-                # Dodaj szczegół oceny atrybutu
-                attr = random.choice(ATTRIBUTES)
-                attr_rating = random.randint(3, 5)
-                create_review_detail(review_id, attr, attr_rating)
-            time.sleep(0.3)
-    
-    print()
-
-print("Gotowe!")
+restaurant_ids = fetch_restaurants(args.limit)
+print(f"Znaleziono {len(restaurant_ids)} restauracji\n")
+
+rng = random.Random(args.seed)
+# Plany powstaja na biezaco (ta sama kolejnosc losowan), a nie wszystkie z gory
+plans = (plan_restaurant(rng, rest_id) for rest_id in restaurant_ids)
+
+start = time.perf_counter()
+pipeline = Pipeline(args.workers)
+for rest_id, dishes in plans:
+    for dish in dishes:
+        pipeline.wait_for_room()
+        seed_dish(pipeline, rest_id, dish)
+pipeline.wait()
+elapsed = time.perf_counter() - start
+
+total = sum(pipeline.counts.values())
+for kind in ("dishes", "dish-attributes", "reviews", "review-details"):
+    print(f"  {kind}: {pipeline.counts[kind]} (błędy: {pipeline.failed[kind]})")
+print(f"Gotowe! {total} zapisów w {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f}/s)")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Wspolny klient REST API Strapi dla skryptow.
+
+- czyta .env.local z katalogu glownego projektu (raz, przy imporcie)
+- uzywa jednej sesji HTTP z pula polaczen
+- buduje parametry fields/populate/filters/sort ze struktur Pythona
+- iteruje po wszystkich stronach kolekcji, pobierajac kolejna strone w tle
+
+Przyklad:
+    client = StrapiClient()
+    for dish in client.iter("dishes", fields=["name"],
+                            populate={"dish_attributes": {"populate": {"attribute": {"fields": ["name"]}}}}):
+        ...
+
+Uruchomiony bezposrednio eksportuje kolekcje do JSONL:
+    python strapi_client.py dishes --fields name,price > dishes.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def load_env():
+    env_file = Path(__file__).parent.parent / ".env.local"
+    if env_file.exists():
+        with open(env_file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, value = line.split("=", 1)
+                    os.environ.setdefault(key, value)
+
+
+load_env()
+
+
+def flatten(prefix, value, out):
+    """Zamienia zagniezdzone slowniki i listy na parametry w notacji nawiasowej Strapi."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flatten(f"{prefix}[{key}]", item, out)
+    elif isinstance(value, (list, tuple)):
+        for i, item in enumerate(value):
+            flatten(f"{prefix}[{i}]", item, out)
+    elif isinstance(value, bool):
+        out[prefix] = "true" if value else "false"
+    else:
+        out[prefix] = str(value)
+    return out
+
+
+def build_query(fields=None, populate=None, filters=None, sort=None):
+    """
+    Buduje parametry zapytania, np.
+    build_query(fields=["name"], populate={"dish": {"fields": ["documentId"]}})
+    -> {"fields[0]": "name", "populate[dish][fields][0]": "documentId"}
+    populate moze byc tez napisem ("*") lub lista nazw relacji.
+    """
+    params = {}
+    if fields:
+        flatten("fields", list(fields), params)
+    if isinstance(populate, str):
+        params["populate"] = populate
+    elif populate:
+        flatten("populate", populate, params)
+    if filters:
+        flatten("filters", filters, params)
+    if sort:
+        flatten("sort", [sort] if isinstance(sort, str) else list(sort), params)
+    return params
+
+
+class StrapiClient:
+    def __init__(self, url=None, token=None, write_token=None, pool_size=8):
+        url = url or os.environ.get("NEXT_PUBLIC_STRAPI_URL", "https://api-agh.waloszczyk.eu")
+        self.api = url.rstrip("/") + "/api"
+        self.read_token = token or os.environ.get("NEXT_PUBLIC_STRAPI_KEY", "")
+        self.write_token = write_token or os.environ.get("STRAPI_KEY", "")
+
+        self.session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _headers(self, write=False):
+        token = self.write_token if write else self.read_token
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    def get(self, path, params=None):
+        r = self.session.get(f"{self.api}/{path}", params=params, headers=self._headers(), timeout=30)
+        r.raise_for_status()
+        return r.json()
+
+    def page(self, collection, page, page_size=100, **query):
+        """Pobiera jedna strone kolekcji; query jak w build_query."""
+        params = build_query(**query)
+        params["pagination[page]"] = page
+        params["pagination[pageSize]"] = page_size
+        return self.get(collection, params)
+
+    def iter(self, collection, page_size=100, **query):
+        """
+        Zwraca wszystkie wpisy kolekcji, strona po stronie.
+        Nastepna strona jest pobierana w tle, gdy biezaca jest jeszcze przetwarzana,
+        a w pamieci sa najwyzej dwie strony naraz.
+        """
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            body = self.page(collection, 1, page_size, **query)
+            page_count = body["meta"]["pagination"]["pageCount"]
+            page = 1
+            while True:
+                upcoming = None
+                if page < page_count:
+                    upcoming = prefetch.submit(self.page, collection, page + 1, page_size, **query)
+                yield from body["data"]
+                if upcoming is None:
+                    return
+                body = upcoming.result()
+                page += 1
+
+    def create(self, collection, data):
+        """Tworzy wpis; zwraca odpowiedz (requests.Response)."""
+        return self.session.post(
+            f"{self.api}/{collection}", headers=self._headers(write=True), json={"data": data}, timeout=30
+        )
+
+    def update(self, collection, document_id, data):
+        """Aktualizuje wybrane pola wpisu; zwraca odpowiedz (requests.Response)."""
+        return self.session.put(
+            f"{self.api}/{collection}/{document_id}", headers=self._headers(write=True),
+            json={"data": data}, timeout=30
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eksport kolekcji Strapi do JSONL (na stdout)")
+    parser.add_argument("collection", help="np. dishes, reviews, restaurants")
+    parser.add_argument("--fields", help="lista pol oddzielona przecinkami")
+    parser.add_argument("--populate", help='JSON z definicja populate, np. {"dish": {"fields": ["name"]}}')
+    args = parser.parse_args()
+
+    client = StrapiClient()
+    query = {
+        "fields": args.fields.split(",") if args.fields else None,
+        "populate": json.loads(args.populate) if args.populate else None,
+    }
+    for entry in client.iter(args.collection, **query):
+        sys.stdout.write(json.dumps(entry, ensure_ascii=False) + "\n")
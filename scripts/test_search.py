@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import tempfile
+
+from search_index import IndexWriter, SearchIndex
+
+# Test filtra typu: restauracje zajmuja wszystkie miejsca kandydatow, a dania i tak musza sie znalezc
+with tempfile.TemporaryDirectory() as out:
+    writer = IndexWriter(out, full=True)
+    for i in range(300):
+        writer.put("restaurant", {"documentId": f"r{i}", "name": f"Pierogi u Babci {i}", "city": "Kraków"})
+    for i in range(5):
+        writer.put("dish", {"documentId": f"d{i}", "name": f"Pierogi {i}", "category": "Pierogi"})
+    writer.put("attribute", {"documentId": "a0", "name": "Pierogi domowe"})
+    writer.save()
+
+    index = SearchIndex(out, max_candidates=20)
+    dishes = index.search("pierogi", limit=10, types=["dish"])
+    print(f'dish: {[hit["documentId"] for hit in dishes]}')
+    assert sorted(hit["documentId"] for hit in dishes) == [f"d{i}" for i in range(5)]
+
+    mixed = index.search("pierogi", limit=10, types=["dish", "attribute"])
+    print(f'dish+attribute: {[hit["documentId"] for hit in mixed]}')
+    assert {hit["type"] for hit in mixed} == {"dish", "attribute"} and len(mixed) == 6
+
+    everything = index.search("pierogi", limit=30)
+    print(f'bez filtra: {len(everything)} wyników')
+    assert {hit["type"] for hit in everything} >= {"restaurant"}
+print("OK")